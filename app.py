@@ -3,11 +3,15 @@ from flask import Flask, render_template, redirect, url_for, request, session
 from datetime import timedelta
 from config import Config
 from models.bootstrap import bootstrap_once
+from models import db_sqlite
+from models.auth.activation import start_activation_token_purger
+from models.auth.revocation import is_session_current
+from utils import assets, fragment_cache, instrumentation, metrics, profiler
 from utils.decorators import login_required
 from utils.current_user import get_current_user
-from models.auth.auth import get_user_by_id
 from flask_wtf import CSRFProtect
 from routes import admin_bp, auth_bp, clinician_bp, auditor_bp
+from commands import register_commands
 
 app = Flask(__name__)
 
@@ -31,7 +35,36 @@ app.register_blueprint(auth_bp, url_prefix="/auth")
 app.register_blueprint(clinician_bp, url_prefix="/clinicians")
 app.register_blueprint(auditor_bp, url_prefix="/auditor")
 
-bootstrap_once()
+# Time SQLite, Mongo, crypto, bcrypt and templates per request; registered
+# first so the other before_request handlers are included
+instrumentation.init_app(app)
+
+# Prometheus latency histograms and the /metrics endpoint
+metrics.init_app(app)
+
+# Sample the stacks of slow or explicitly profiled requests
+profiler.init_app(app)
+
+# {% cache %} tag for template fragments keyed on data generations
+fragment_cache.init_app(app)
+
+# Fingerprinted, precompressed static assets and gzipped HTML
+assets.init_app(app)
+
+# Register CLI commands
+register_commands(app)
+
+# Reuse one SQLite connection per request
+db_sqlite.init_app(app)
+
+# In-process purge of activation tokens, off unless an interval is set;
+# deployments normally run `flask purge-activation-tokens` from cron
+if Config.ACTIVATION_TOKEN_PURGE_INTERVAL_SECONDS:
+    start_activation_token_purger()
+
+# Seeding runs once via `flask --app app bootstrap`; workers only make sure
+# the schema is current, which is a single PRAGMA read when it already is
+db_sqlite.ensure_schema_current()
 
 # Before request handlers to manage sessions and user validity
 @app.before_request
@@ -45,10 +78,8 @@ def ensure_account_still_valid():
     if not user_id:
         return
 
-    user = get_user_by_id(user_id)
-
-    # If the user record has been deleted, force logout
-    if not user:
+    # If the user record has been deleted or edited since login, force logout
+    if not is_session_current(user_id, session.get("auth_epoch")):
         session.clear()
         return redirect(url_for("auth.login_get"))
 
@@ -108,4 +139,5 @@ def index():
 
 
 if __name__ == "__main__":
+    bootstrap_once()
     app.run(debug=True, port=3000)
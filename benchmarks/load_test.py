@@ -0,0 +1,495 @@
+"""
+End-to-end load test of the Flask app.
+
+Virtual clinician, admin and auditor users log in and drive a weighted,
+seeded mix of dashboard, list, search, view, edit and create requests,
+either in-process through the WSGI test client (against a temporary
+SQLite database and an in-memory Mongo stand-in filled with synthetic
+patients) or against a running server. Reports throughput and
+p50/p95/p99 latency per route.
+
+Usage:
+    python -m benchmarks.load_test --patients 10000 --users 500 --duration 30
+    python -m benchmarks.load_test --scenario write-heavy --requests 200 --seed 7
+    python -m benchmarks.load_test --base-url http://localhost:3000 \\
+        --login clinician:drSmith:Secret@123 --login admin:adminUser123:Adminpassword123@
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from config import Config
+
+# Request mixes per role: {role: {action: weight}}, plus how many virtual
+# users of each role run concurrently
+SCENARIOS = {
+    "mixed": {
+        "users": {"clinician": 6, "admin": 1, "auditor": 1},
+        "mix": {
+            "clinician": {"dashboard": 3, "list": 2, "search": 3, "view": 5, "edit": 1, "create": 1},
+            "admin": {"dashboard": 3, "list": 2, "search": 3, "view": 2},
+            "auditor": {"dashboard": 3, "summary": 1},
+        },
+    },
+    "read-heavy": {
+        "users": {"clinician": 8, "admin": 2, "auditor": 1},
+        "mix": {
+            "clinician": {"dashboard": 4, "list": 2, "search": 4, "view": 8},
+            "admin": {"dashboard": 2, "list": 2, "search": 4, "view": 2},
+            "auditor": {"dashboard": 3, "summary": 1},
+        },
+    },
+    "write-heavy": {
+        "users": {"clinician": 8, "admin": 1, "auditor": 1},
+        "mix": {
+            "clinician": {"dashboard": 1, "view": 2, "edit": 4, "create": 4},
+            "admin": {"dashboard": 1, "list": 1},
+            "auditor": {"dashboard": 1, "summary": 1},
+        },
+    },
+}
+
+PASSWORD = "Loadtest@Pass123"
+PATIENT_SEARCH_TERMS = ["an", "em", "smi", "jo", "ta", "da"]
+USER_SEARCH_TERMS = ["load", "clinician", "user 1", "admin"]
+
+_CSRF = re.compile(r'name="csrf_token" value="([^"]+)"|CSRF_TOKEN = \'([^\']+)\'')
+_PATIENT_LINK = re.compile(r"/clinicians/patients/([0-9a-f]{24})")
+_USER_LINK = re.compile(r"/admin/users/(\d+)\b")
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+class WsgiSession:
+    """A browser session against the app through the WSGI test client."""
+
+    def __init__(self, app, remote_addr):
+        self._client = app.test_client()
+        # Distinct addresses keep the per-address login rate limit per user
+        self._environ = {"REMOTE_ADDR": remote_addr}
+
+    def request(self, method, path, data=None):
+        response = self._client.open(path, method=method, data=data, environ_base=self._environ)
+        return response.status_code, response.get_data(as_text=True), response.headers
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Redirects are recorded as responses rather than followed
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HttpSession:
+    """A browser session against a running server."""
+
+    def __init__(self, base_url):
+        self._base_url = base_url.rstrip("/")
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self._base_url + path, data=body, method=method)
+        try:
+            with self._opener.open(req, timeout=60) as response:
+                return response.status, response.read().decode(errors="replace"), response.headers
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode(errors="replace"), e.headers
+
+
+class IdPool:
+    """Patient and user ids the virtual users pick from, shared by all threads."""
+
+    def __init__(self, patient_ids=(), user_ids=()):
+        self.patient_ids = list(patient_ids)
+        self.user_ids = list(user_ids)
+        self._lock = threading.Lock()
+
+    def add_patient(self, patient_id):
+        with self._lock:
+            self.patient_ids.append(patient_id)
+
+    def merge(self, patient_ids=(), user_ids=()):
+        with self._lock:
+            self.patient_ids.extend(i for i in patient_ids if i not in self.patient_ids)
+            self.user_ids.extend(i for i in user_ids if i not in self.user_ids)
+
+
+def _patient_form(rng):
+    dob = f"{rng.randint(1935, 2015)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    return {
+        "first_name": rng.choice(["ada", "ben", "chloe", "daniel", "emma"]),
+        "last_name": rng.choice(["smith", "jones", "taylor", "brown"]),
+        "date_of_birth": dob,
+        "age": str(rng.randint(1, 95)),
+        "gender": rng.choice(["female", "male"]),
+        "ever_married": rng.choice(["yes", "no"]),
+        "work_type": rng.choice(["private", "self-employed", "govt_job"]),
+        "residence_type": rng.choice(["urban", "rural"]),
+        "smoking_status": rng.choice(["never smoked", "smokes", "formerly smoked"]),
+        "hypertension": rng.choice(["0", "1"]),
+        "heart_disease": rng.choice(["0", "1"]),
+        "bmi": f"{rng.uniform(15, 45):.1f}",
+        "avg_glucose_level": f"{rng.uniform(55, 270):.2f}",
+        "stroke": rng.choice(["0", "1"]),
+    }
+
+
+class VirtualUser:
+    """
+    One logged-in user issuing requests from a weighted action mix. Every
+    request is recorded as (route label, seconds, ok).
+    """
+
+    def __init__(self, role, username, password, session, mix, ids, seed):
+        self.role = role
+        self.username = username
+        self.password = password
+        self.session = session
+        self.ids = ids
+        self.rng = random.Random(seed)
+        self.actions = list(mix)
+        self.weights = [mix[action] for action in self.actions]
+        self.csrf_token = None
+        self.samples = []
+
+    def _request(self, label, method, path, data=None, expect=(200, 302)):
+        start = time.perf_counter()
+        status, body, headers = self.session.request(method, path, data)
+        self.samples.append((label, time.perf_counter() - start, status in expect))
+        return status, body, headers
+
+    def login(self):
+        _, body, _ = self.session.request("GET", "/auth/login")
+        self.csrf_token = self._csrf(body)
+
+        for attempt in range(5):
+            status, _, _ = self._request(
+                "auth.login",
+                "POST",
+                "/auth/login",
+                {"csrf_token": self.csrf_token, "username": self.username, "password": self.password},
+                expect=(302,),
+            )
+            if status != 429:
+                break
+            # Rate limited: back off like a person retrying would
+            time.sleep(2 ** attempt)
+        if status != 302:
+            raise RuntimeError(f"Login failed for {self.username} (HTTP {status})")
+
+        # Forms after login carry the session's token
+        _, body, _ = self.session.request("GET", "/")
+        self.csrf_token = self._csrf(body) or self.csrf_token
+
+    def _csrf(self, body):
+        match = _CSRF.search(body or "")
+        return (match.group(1) or match.group(2)) if match else None
+
+    def discover_ids(self):
+        # Collect ids from the pages a real user would start from
+        if self.role == "clinician":
+            _, body, _ = self.session.request("GET", "/clinicians/dashboard")
+            self.ids.merge(patient_ids=_PATIENT_LINK.findall(body))
+        elif self.role == "admin":
+            _, body, _ = self.session.request("GET", "/admin/users")
+            self.ids.merge(user_ids=[int(i) for i in _USER_LINK.findall(body)])
+
+    def step(self):
+        action = self.rng.choices(self.actions, self.weights)[0]
+        getattr(self, f"_{self.role}_{action}")()
+
+    def _pick(self, values):
+        return self.rng.choice(values) if values else None
+
+    # Clinician actions
+    def _clinician_dashboard(self):
+        self._request("clinician.dashboard", "GET", "/clinicians/dashboard")
+
+    def _clinician_list(self):
+        self._request("clinician.list", "GET", "/clinicians/patients")
+
+    def _clinician_search(self):
+        query = urllib.parse.urlencode({"q": self.rng.choice(PATIENT_SEARCH_TERMS)})
+        self._request("clinician.search", "GET", f"/clinicians/patients?{query}")
+
+    def _clinician_view(self):
+        patient_id = self._pick(self.ids.patient_ids)
+        if patient_id:
+            self._request("clinician.view", "GET", f"/clinicians/patients/{patient_id}")
+
+    def _clinician_edit(self):
+        patient_id = self._pick(self.ids.patient_ids)
+        if not patient_id:
+            return
+        path = f"/clinicians/patients/{patient_id}/edit"
+        self._request("clinician.edit_form", "GET", path)
+        form = _patient_form(self.rng)
+        del form["date_of_birth"]
+        self._request("clinician.edit", "POST", path, dict(form, csrf_token=self.csrf_token))
+
+    def _clinician_create(self):
+        form = _patient_form(self.rng)
+        del form["age"]
+        status, _, headers = self._request(
+            "clinician.create",
+            "POST",
+            "/clinicians/patients/new",
+            dict(form, csrf_token=self.csrf_token),
+            expect=(302,),
+        )
+        match = _PATIENT_LINK.search(headers.get("Location", "")) if status == 302 else None
+        if match:
+            self.ids.add_patient(match.group(1))
+
+    # Admin actions
+    def _admin_dashboard(self):
+        self._request("admin.dashboard", "GET", "/admin/dashboard")
+
+    def _admin_list(self):
+        self._request("admin.list", "GET", "/admin/users")
+
+    def _admin_search(self):
+        query = urllib.parse.urlencode({"q": self.rng.choice(USER_SEARCH_TERMS)})
+        self._request("admin.search", "GET", f"/admin/users?{query}")
+
+    def _admin_view(self):
+        user_id = self._pick(self.ids.user_ids)
+        if user_id:
+            self._request("admin.view", "GET", f"/admin/users/{user_id}")
+
+    # Auditor actions
+    def _auditor_dashboard(self):
+        self._request("auditor.dashboard", "GET", "/auditor/dashboard")
+
+    def _auditor_summary(self):
+        self._request("auditor.summary", "GET", "/auditor/summary")
+
+
+def load_scenario(name_or_path):
+    # A built-in scenario name or a JSON file with the same structure
+    if name_or_path in SCENARIOS:
+        return SCENARIOS[name_or_path]
+    with open(name_or_path) as f:
+        return json.load(f)
+
+
+def setup_in_process(patients, users, seed):
+    """
+    Create a temporary SQLite database with one account per virtual user
+    plus `users` extra clinicians, fill an in-memory Mongo stand-in with
+    `patients` synthetic patients and import the app against them.
+    Returns:
+        tuple: (app, IdPool, {role: [usernames]}, temporary directory)
+    """
+    from benchmarks.micro import build_patients
+    from benchmarks.mongo_standin import MemoryClient
+    from models import db_sqlite, mongo_client
+    from models.auth.auth import hash_password
+    from utils.time_formatter import utc_now
+
+    workdir = tempfile.TemporaryDirectory(prefix="loadtest-")
+    Config.DB_PATH = os.path.join(workdir.name, "loadtest.db")
+    Config.METRICS_DIR = ""
+    db_sqlite.init_sqlite_db()
+
+    password_hash = hash_password(PASSWORD)
+    now = utc_now()
+    conn = db_sqlite.get_pool().acquire()
+    role_ids = {}
+    for role in ("admin", "clinician", "auditor"):
+        cur = conn.execute("INSERT INTO roles (name, description) VALUES (?, ?)", (role, role))
+        role_ids[role] = cur.lastrowid
+
+    # Virtual users log in as loadtest_<role>_<n>; extra users fill the admin tables
+    accounts = {role: [f"loadtest_{role}_{i}" for i in range(64)] for role in role_ids}
+    rows = [
+        (username, f"Load Test {role.title()} {chr(65 + i % 26)}", password_hash, role_ids[role], now)
+        for role, usernames in accounts.items()
+        for i, username in enumerate(usernames)
+    ]
+    rows += [
+        (f"clinician_{i}", f"Clinician User {chr(65 + i % 26)}", None, role_ids["clinician"], now)
+        for i in range(users)
+    ]
+    conn.executemany(
+        """
+        INSERT INTO users (username, full_name, password_hash, role_id, is_active, created_at)
+        VALUES (?, ?, ?, ?, 1, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+    user_ids = [
+        row[0]
+        for row in conn.execute("SELECT id FROM users WHERE role_id = ?", (role_ids["clinician"],))
+    ]
+    conn.close()
+
+    client = MemoryClient()
+    docs = build_patients(patients, seed=seed, creators=user_ids[:64])
+    client[Config.MONGO_DB][Config.MONGO_PATIENTS_COL].insert_many(docs)
+    mongo_client._client = client
+
+    from app import app
+
+    ids = IdPool([str(doc["_id"]) for doc in docs], user_ids)
+    return app, ids, accounts, workdir
+
+
+def run(make_session, accounts, scenario, ids, duration, requests, seed):
+    """
+    Log every virtual user in, then run them concurrently until the
+    duration elapses or each has made `requests` requests.
+    Returns:
+        tuple: (samples, elapsed seconds)
+    """
+    virtual_users = []
+    index = 0
+    for role, count in scenario["users"].items():
+        for i in range(count):
+            username, password = accounts[role][i % len(accounts[role])]
+            virtual_users.append(
+                VirtualUser(role, username, password, make_session(index), scenario["mix"][role], ids, seed + index)
+            )
+            index += 1
+
+    # Logins are reported, but happen before the measured run
+    login_samples = []
+    for user in virtual_users:
+        user.login()
+        user.discover_ids()
+        login_samples.extend(user.samples)
+        user.samples = []
+
+    deadline = time.perf_counter() + duration if duration else None
+
+    def drive(user):
+        made = 0
+        while (requests and made < requests) or (not requests and time.perf_counter() < deadline):
+            user.step()
+            made += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=drive, args=(user,)) for user in virtual_users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = [sample for user in virtual_users for sample in user.samples]
+    return samples + login_samples, elapsed
+
+
+def summarize(samples, elapsed):
+    """
+    Per-route throughput and latency percentiles.
+    Returns:
+        list: Report dicts, one per route, then the total.
+    """
+    routes = {}
+    for label, seconds, ok in samples:
+        routes.setdefault(label, []).append((seconds, ok))
+
+    def report(label, entries):
+        latencies = [seconds for seconds, _ in entries]
+        return {
+            "route": label,
+            "requests": len(entries),
+            "errors": sum(1 for _, ok in entries if not ok),
+            "req_per_sec": round(len(entries) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        }
+
+    reports = [report(label, entries) for label, entries in sorted(routes.items())]
+    reports.append(report("total", [entry for entries in routes.values() for entry in entries]))
+    return reports
+
+
+def _parse_logins(values):
+    # ["role:username:password", ...] -> {role: [(username, password)]}
+    accounts = {}
+    for value in values:
+        role, username, password = value.split(":", 2)
+        accounts.setdefault(role, []).append((username, password))
+    return accounts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", default="mixed", help="built-in scenario or JSON file")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--requests", type=int, default=0, help="requests per virtual user instead of --duration")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--patients", type=int, default=1000, help="synthetic patients (in-process)")
+    parser.add_argument("--users", type=int, default=200, help="extra synthetic users (in-process)")
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt rounds for virtual users (in-process)")
+    parser.add_argument("--base-url", help="load test a running server instead of the app in-process")
+    parser.add_argument("--login", action="append", default=[], metavar="ROLE:USERNAME:PASSWORD")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    scenario = load_scenario(args.scenario)
+
+    if args.base_url:
+        accounts = _parse_logins(args.login)
+        missing = [role for role, count in scenario["users"].items() if count and role not in accounts]
+        if missing:
+            parser.error(f"--login needed for: {', '.join(missing)}")
+        ids = IdPool()
+        make_session = lambda index: HttpSession(args.base_url)
+        workdir = None
+    else:
+        Config.BCRYPT_ROUNDS = args.rounds
+        app, ids, usernames, workdir = setup_in_process(args.patients, args.users, args.seed)
+        accounts = {role: [(name, PASSWORD) for name in names] for role, names in usernames.items()}
+        make_session = lambda index: WsgiSession(app, f"10.0.{index // 256}.{index % 256}")
+
+    try:
+        samples, elapsed = run(
+            make_session, accounts, scenario, ids, args.duration, args.requests, args.seed
+        )
+    finally:
+        if workdir is not None:
+            workdir.cleanup()
+
+    reports = summarize(samples, elapsed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"scenario": args.scenario, "elapsed_s": round(elapsed, 2), "routes": reports}, f, indent=2)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    header = f"{'route':<22} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in reports:
+        print(
+            f"{r['route']:<22} {r['requests']:>9} {r['errors']:>7} {r['req_per_sec']:>8} "
+            f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
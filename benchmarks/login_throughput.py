@@ -0,0 +1,125 @@
+"""
+Login throughput benchmark.
+
+Simulates a burst of concurrent logins and compares verifying passwords
+inline (the old behaviour) with the bounded hashing pool. A probe thread
+measures how long unrelated work waits while the burst is running.
+
+Usage:
+    python -m benchmarks.login_throughput --clients 32 --duration 5 --rounds 12
+"""
+
+import argparse
+import json
+import threading
+import time
+import bcrypt
+from config import Config
+from services.hashing_pool import HashingPool, HashingPoolSaturated
+
+PASSWORD = b"Benchmark@Pass123"
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def _probe(stop, delays, interval=0.01):
+    # Unrelated request work: a short sleep that should wake up on time
+    while not stop.is_set():
+        start = time.perf_counter()
+        time.sleep(interval)
+        sum(range(2000))
+        delays.append(time.perf_counter() - start - interval)
+
+
+def run_mode(mode, clients, duration, password_hash, pool_settings):
+    """
+    Run one benchmark mode ("inline" or "pool").
+    Returns a dict with throughput, latency percentiles and rejections.
+    """
+    pool = HashingPool(*pool_settings) if mode == "pool" else None
+    latencies = []
+    rejected = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if pool:
+                    pool.run(bcrypt.checkpw, PASSWORD, password_hash)
+                else:
+                    bcrypt.checkpw(PASSWORD, password_hash)
+            except HashingPoolSaturated:
+                with lock:
+                    rejected[0] += 1
+                # A rejected client backs off like a browser retry would
+                time.sleep(0.05)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    stop = threading.Event()
+    probe_delays = []
+    probe = threading.Thread(target=_probe, args=(stop, probe_delays))
+    probe.start()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stop.set()
+    probe.join()
+
+    return {
+        "mode": mode,
+        "logins": len(latencies),
+        "logins_per_sec": round(len(latencies) / duration, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "rejected": rejected[0],
+        "probe_p99_delay_ms": round(_percentile(probe_delays, 99) * 1000, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=Config.BCRYPT_ROUNDS)
+    parser.add_argument("--workers", type=int, default=Config.BCRYPT_WORKERS)
+    parser.add_argument("--max-queue", type=int, default=Config.BCRYPT_MAX_QUEUE)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    password_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds=args.rounds))
+    pool_settings = (args.workers, args.max_queue, Config.BCRYPT_TIMEOUT_SECONDS)
+
+    reports = [
+        run_mode(mode, args.clients, args.duration, password_hash, pool_settings)
+        for mode in ("inline", "pool")
+    ]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    header = f"{'mode':<8} {'logins/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'rejected':>9} {'probe p99 ms':>13}"
+    print(header)
+    print("-" * len(header))
+    for r in reports:
+        print(
+            f"{r['mode']:<8} {r['logins_per_sec']:>9} {r['p50_ms']:>9} {r['p99_ms']:>9} "
+            f"{r['rejected']:>9} {r['probe_p99_delay_ms']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Microbenchmarks for the crypto, decryption and patient statistics hot paths.
+
+Every benchmark runs against synthetic datasets of the requested sizes
+held in an in-memory Mongo stand-in, so results measure the application
+code rather than the database or the network. Password hashing does not
+depend on the dataset and runs once at a fixed count.
+
+Usage:
+    python -m benchmarks.micro --sizes 1000,100000,1000000 --output results.json
+    python -m benchmarks.micro --compare baseline.json results.json --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from bson import ObjectId
+from config import Config
+from benchmarks.mongo_standin import MemoryCollection
+from models.auth.auth import hash_password
+from models.patients.helpers import dob_to_age
+from models.patients.mongo_models import (
+    get_all_patients,
+    get_patient_clinician_stats,
+    search_patient,
+)
+from services.decrypt_doc import decrypt_patient_doc
+from services.encryption_service import decrypt_value, encrypt_value
+
+DEFAULT_SIZES = "1000,100000,1000000"
+
+FIRST_NAMES = ["Ada", "Ben", "Chloe", "Daniel", "Emma", "Farah", "George", "Hana", "Ivan", "Julia"]
+LAST_NAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Davies", "Evans"]
+SEARCH_TERM = "an"
+
+# Distinct ciphertexts per medical field; documents share them, which keeps
+# generating a million documents fast without changing the decryption work
+CIPHERTEXT_POOL_SIZE = 500
+
+
+def _medical_values(rng):
+    return {
+        "hypertension": rng.choice(["0", "1"]),
+        "heart_disease": rng.choice(["0", "1"]),
+        "stroke": rng.choice(["0", "0", "0", "1"]),
+        "bmi": f"{rng.uniform(15, 45):.1f}",
+        "avg_glucose_level": f"{rng.uniform(55, 270):.2f}",
+    }
+
+
+def build_patients(size, seed=42, creators=None):
+    """
+    Build `size` patient documents shaped like those written by
+    create_patient, with encrypted medical fields.
+    Args:
+        creators (list, optional): SQLite user ids to use as created_by.
+    """
+    creators = creators or list(range(1, 21))
+    rng = random.Random(seed)
+    pool = [
+        {field: encrypt_value(value) for field, value in _medical_values(rng).items()}
+        for _ in range(min(size, CIPHERTEXT_POOL_SIZE))
+    ]
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    docs = []
+    for i in range(size):
+        doc = {
+            "_id": ObjectId(),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "gender": rng.choice(["male", "female"]),
+            "age": rng.randint(1, 95),
+            "ever_married": rng.choice(["yes", "no"]),
+            "work_type": rng.choice(["private", "self-employed", "govt_job", "children"]),
+            "smoking_status": rng.choice(["never smoked", "formerly smoked", "smokes"]),
+            "residence_type": rng.choice(["urban", "rural"]),
+            "created_by": rng.choice(creators),
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": None,
+        }
+        doc.update(pool[i % len(pool)])
+        docs.append(doc)
+    return docs
+
+
+def write_stroke_csv(directory, size, seed=42):
+    # Synthetic healthcare_stroke_data.csv in the Kaggle column layout
+    rng = random.Random(seed)
+    path = os.path.join(directory, "healthcare_stroke_data.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "id", "gender", "age", "hypertension", "heart_disease", "ever_married",
+            "work_type", "Residence_type", "avg_glucose_level", "bmi", "smoking_status", "stroke",
+        ])
+        for i in range(size):
+            values = _medical_values(rng)
+            writer.writerow([
+                i, rng.choice(["Male", "Female"]), rng.randint(1, 95),
+                values["hypertension"], values["heart_disease"], rng.choice(["Yes", "No"]),
+                "Private", rng.choice(["Urban", "Rural"]), values["avg_glucose_level"],
+                rng.choice([values["bmi"], "N/A"]), "never smoked", values["stroke"],
+            ])
+    return path
+
+
+def _time_runs(fn, repeat):
+    # Wall time of each run
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _result(name, size, ops, durations):
+    median = statistics.median(durations)
+    return {
+        "name": name,
+        "size": size,
+        "ops": ops,
+        "runs": len(durations),
+        "min_s": round(min(durations), 6),
+        "median_s": round(median, 6),
+        "mean_s": round(statistics.mean(durations), 6),
+        "ops_per_sec": round(ops / median, 1) if median else None,
+    }
+
+
+def _run_importer(directory, repeat):
+    # seed_stroke_dataset needs a fresh collection per run, so only the import is timed
+    from models.patients.import_stroke_data import seed_stroke_dataset
+
+    durations = []
+    original_path = Config.DATASET_PATH
+    Config.DATASET_PATH = directory
+    try:
+        for _ in range(repeat):
+            collection = MemoryCollection()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                seed_stroke_dataset(created_by=1, collection=collection)
+                durations.append(time.perf_counter() - start)
+    finally:
+        Config.DATASET_PATH = original_path
+    return durations
+
+
+def run_size(size, repeat, only=None):
+    """
+    Run every dataset benchmark for one dataset size.
+    Returns:
+        list: Result dicts.
+    """
+    selected = lambda name: not only or name in only
+    docs = build_patients(size)
+    collection = MemoryCollection(docs)
+    ciphertexts = [doc["bmi"] for doc in docs]
+    rng = random.Random(size)
+    dobs = [
+        (date(1930, 1, 1) + timedelta(days=rng.randint(0, 34000))).isoformat()
+        for _ in range(size)
+    ]
+
+    benchmarks = [
+        ("encrypt_value", lambda: [encrypt_value("27.4") for _ in range(size)]),
+        ("decrypt_value", lambda: [decrypt_value(ct) for ct in ciphertexts]),
+        ("decrypt_patient_doc", lambda: [decrypt_patient_doc(doc) for doc in docs]),
+        ("dob_to_age", lambda: [dob_to_age(dob) for dob in dobs]),
+        ("get_patient_clinician_stats", lambda: get_patient_clinician_stats(collection=collection)),
+        ("get_all_patients", lambda: get_all_patients(collection=collection)),
+        ("search_patient", lambda: search_patient(SEARCH_TERM, collection=collection)),
+    ]
+
+    results = []
+    for name, fn in benchmarks:
+        if selected(name):
+            results.append(_result(name, size, size, _time_runs(fn, repeat)))
+
+    if selected("import_stroke_dataset"):
+        with tempfile.TemporaryDirectory() as directory:
+            write_stroke_csv(directory, size)
+            results.append(
+                _result("import_stroke_dataset", size, size, _run_importer(directory, repeat))
+            )
+    return results
+
+
+def run_hashing(count, rounds, repeat):
+    durations = _time_runs(
+        lambda: [hash_password("Benchmark@Pass123", rounds=rounds) for _ in range(count)], repeat
+    )
+    return _result("hash_password", None, count, durations)
+
+
+def compare(baseline, current, threshold):
+    """
+    Compare the median time of every benchmark present in both runs.
+    Returns:
+        list: (name, size, baseline median, current median, change, regressed)
+    """
+    previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = previous.get((result["name"], result["size"]))
+        if before is None or not before["median_s"]:
+            continue
+        change = result["median_s"] / before["median_s"] - 1
+        rows.append((
+            result["name"],
+            result["size"],
+            before["median_s"],
+            result["median_s"],
+            change,
+            change > threshold,
+        ))
+    return rows
+
+
+def _print_comparison(rows, threshold):
+    header = f"{'benchmark':<30} {'size':>8} {'before s':>10} {'after s':>10} {'change':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, size, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<30} {size or '-':>8} {before:>10.4f} {after:>10.4f} {change:>+8.1%}{flag}")
+
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+def _print_results(results):
+    header = f"{'benchmark':<30} {'size':>8} {'median s':>10} {'min s':>10} {'ops/s':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['name']:<30} {r['size'] or '-':>8} {r['median_s']:>10.4f} "
+            f"{r['min_s']:>10.4f} {r['ops_per_sec'] or 0:>12.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated dataset sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="comma separated benchmark names to run")
+    parser.add_argument("--hash-count", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=Config.BCRYPT_ROUNDS)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="median slowdown counted as a regression (0.10 = 10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        regressions = _print_comparison(compare(baseline, current, args.threshold), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    only = set(args.only.split(",")) if args.only else None
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        results.extend(run_size(size, args.repeat, only))
+    if not only or "hash_password" in only:
+        results.append(run_hashing(args.hash_count, args.rounds, args.repeat))
+
+    report = {
+        "meta": {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "bcrypt_rounds": args.rounds,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+In-memory stand-in for MongoDB collections, used by the benchmarks.
+
+Supports the subset of the pymongo collection API the models use: find
+with equality, $or/$and, $regex, $in and range filters, sort, limit,
+find_one, count_documents, insert, update_one ($set/$inc), delete_one,
+create_index and bulk_write of UpdateOne upserts. Documents are copied
+on read like decoded BSON would be, so callers may mutate what they get,
+and datetimes come back as naive UTC like pymongo's default.
+"""
+
+import re
+import threading
+from datetime import timezone
+from types import SimpleNamespace
+from bson import ObjectId
+
+
+def _operator_matcher(operator, operand, options=""):
+    if operator == "$regex":
+        pattern = re.compile(operand, re.IGNORECASE if "i" in options else 0)
+        return lambda value: isinstance(value, str) and pattern.search(value) is not None
+    if operator == "$in":
+        values = list(operand)
+        return lambda value: value in values
+    if operator == "$ne":
+        return lambda value: value != operand
+    if operator == "$eq":
+        return lambda value: value == operand
+
+    comparisons = {
+        "$gt": lambda value: value > operand,
+        "$gte": lambda value: value >= operand,
+        "$lt": lambda value: value < operand,
+        "$lte": lambda value: value <= operand,
+    }
+    if operator not in comparisons:
+        raise NotImplementedError(f"Unsupported operator: {operator}")
+    compare = comparisons[operator]
+    return lambda value: value is not None and compare(value)
+
+
+def compile_filter(query):
+    # Build a predicate once per query instead of interpreting it per document
+    predicates = []
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            branches = [compile_filter(branch) for branch in condition]
+            predicates.append(lambda doc, branches=branches: any(b(doc) for b in branches))
+        elif key == "$and":
+            branches = [compile_filter(branch) for branch in condition]
+            predicates.append(lambda doc, branches=branches: all(b(doc) for b in branches))
+        elif isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            options = condition.get("$options", "")
+            matchers = [
+                _operator_matcher(operator, operand, options)
+                for operator, operand in condition.items()
+                if operator != "$options"
+            ]
+            predicates.append(
+                lambda doc, key=key, matchers=matchers: all(m(doc.get(key)) for m in matchers)
+            )
+        else:
+            predicates.append(lambda doc, key=key, condition=condition: doc.get(key) == condition)
+
+    return lambda doc: all(p(doc) for p in predicates)
+
+
+def _stored(value):
+    # BSON dates are UTC milliseconds without a timezone
+    if getattr(value, "tzinfo", None) is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _sort_key(value):
+    # Mongo orders None before every other value
+    return (value is not None, value)
+
+
+class MemoryCursor:
+    def __init__(self, docs, projection=None):
+        self._docs = docs
+        self._projection = projection
+        self._sort = None
+        self._limit = 0
+
+    def sort(self, key, direction=1):
+        self._sort = (key, direction)
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def _project(self, doc):
+        if not self._projection:
+            return dict(doc)
+        included = [key for key, flag in self._projection.items() if flag]
+        output = {key: doc[key] for key in included if key in doc}
+        if self._projection.get("_id", 1) and "_id" in doc:
+            output["_id"] = doc["_id"]
+        return output
+
+    def __iter__(self):
+        docs = self._docs
+        if self._sort is not None:
+            key, direction = self._sort
+            docs = sorted(docs, key=lambda d: _sort_key(d.get(key)), reverse=direction < 0)
+        if self._limit:
+            docs = docs[: self._limit]
+        return (self._project(doc) for doc in docs)
+
+
+class MemoryCollection:
+    def __init__(self, docs=None):
+        self._docs = []
+        self._by_id = {}
+        self._lock = threading.Lock()
+        if docs:
+            self.insert_many(docs)
+
+    def _matching(self, query):
+        if not query:
+            return list(self._docs)
+        if set(query) == {"_id"} and not isinstance(query["_id"], dict):
+            doc = self._by_id.get(query["_id"])
+            return [doc] if doc is not None else []
+        predicate = compile_filter(query)
+        return [doc for doc in self._docs if predicate(doc)]
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(self._matching(query), projection)
+
+    def find_one(self, query=None, projection=None):
+        return next(iter(self.find(query, projection).limit(1)), None)
+
+    def count_documents(self, query):
+        return len(self._matching(query))
+
+    def insert_one(self, doc):
+        doc.setdefault("_id", ObjectId())
+        for key, value in doc.items():
+            doc[key] = _stored(value)
+        with self._lock:
+            self._docs.append(doc)
+            self._by_id[doc["_id"]] = doc
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    def insert_many(self, docs, ordered=True):
+        ids = [self.insert_one(doc).inserted_id for doc in docs]
+        return SimpleNamespace(inserted_ids=ids)
+
+    def _apply_update(self, doc, update):
+        for key, value in update.get("$set", {}).items():
+            doc[key] = _stored(value)
+        for key, value in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+
+    def update_one(self, query, update, upsert=False):
+        with self._lock:
+            matches = self._matching(query)
+            if matches:
+                self._apply_update(matches[0], update)
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if not upsert:
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+        doc = {key: value for key, value in query.items() if not key.startswith("$")}
+        doc.update(update.get("$setOnInsert", {}))
+        self._apply_update(doc, update)
+        self.insert_one(doc)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+
+    def bulk_write(self, requests, ordered=True):
+        # Only UpdateOne operations are used by the models
+        for op in requests:
+            self.update_one(op._filter, op._doc, upsert=op._upsert)
+        return SimpleNamespace(acknowledged=True)
+
+    def delete_one(self, query):
+        with self._lock:
+            matches = self._matching(query)
+            if not matches:
+                return SimpleNamespace(deleted_count=0)
+            self._docs.remove(matches[0])
+            self._by_id.pop(matches[0]["_id"], None)
+        return SimpleNamespace(deleted_count=1)
+
+    def delete_many(self, query):
+        with self._lock:
+            matches = {id(doc) for doc in self._matching(query)}
+            self._docs = [doc for doc in self._docs if id(doc) not in matches]
+            self._by_id = {doc["_id"]: doc for doc in self._docs}
+        return SimpleNamespace(deleted_count=len(matches))
+
+    def create_index(self, keys, **kwargs):
+        return kwargs.get("name", "")
+
+
+class MemoryClient:
+    """Stand-in for MongoClient: client[db][collection], created on first use."""
+
+    def __init__(self):
+        self._databases = {}
+
+    def __getitem__(self, name):
+        return self._databases.setdefault(name, MemoryDatabase())
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        return self._collections.setdefault(name, MemoryCollection())
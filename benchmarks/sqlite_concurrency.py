@@ -0,0 +1,260 @@
+"""
+Concurrent SQLite access benchmark.
+
+Runs reader and writer processes against the users and activation_tokens
+tables for each pragma configuration and reports throughput, latency and
+time lost to lock contention. Workers run with busy_timeout = 0 and retry
+"database is locked" themselves, so every wait for a lock is measured
+rather than absorbed by SQLite's busy handler.
+
+Usage:
+    python -m benchmarks.sqlite_concurrency --readers 4 --writers 2 --duration 5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import secrets
+import sqlite3
+import tempfile
+import time
+from config import Config
+from models.db_sqlite import _connect, get_pool, init_sqlite_db, sqlite_pragmas
+from models.auth.activation import hash_token
+from utils.time_formatter import utc_now
+
+# Pragma sets compared by the benchmark; "tuned" follows Config
+CONFIGURATIONS = {
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "foreign_keys": "OFF",
+    },
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "foreign_keys": "OFF",
+    },
+    "tuned": None,
+}
+
+
+def _seed(db_path, users):
+    # Create the schema and a population of users with activation tokens
+    Config.DB_PATH = db_path
+    init_sqlite_db()
+    get_pool(db_path).close_all()
+
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    cur.execute("INSERT INTO roles (name, description) VALUES ('clinician', '')")
+    role_id = cur.lastrowid
+    now = utc_now()
+
+    cur.executemany(
+        """
+        INSERT INTO users (username, full_name, password_hash, role_id, is_active, created_at)
+        VALUES (?, ?, NULL, ?, 1, ?)
+        """,
+        [(f"user_{i}", f"User Number {i}", role_id, now) for i in range(users)],
+    )
+    cur.executemany(
+        """
+        INSERT INTO activation_tokens (user_id, token_hash, expires_at, used_at, created_at)
+        VALUES (?, ?, ?, NULL, ?)
+        """,
+        [(i + 1, hash_token(f"token-{i}"), now, now) for i in range(users)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _timed(cur, conn, statements, write):
+    """
+    Run one operation, retrying on "database is locked".
+    Returns (latency, lock_wait, failed_attempts); lock_wait is the time
+    spent in attempts that failed with SQLITE_BUSY and the pauses after
+    them, which with busy_timeout = 0 is all of the time lost to locks.
+    """
+    start = time.perf_counter()
+    lock_wait = 0.0
+    failures = 0
+
+    while True:
+        attempt = time.perf_counter()
+        try:
+            for sql, params in statements:
+                cur.execute(sql, params)
+                if not write:
+                    cur.fetchall()
+            if write:
+                conn.commit()
+            return time.perf_counter() - start, lock_wait, failures
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            if conn.in_transaction:
+                conn.rollback()
+            failures += 1
+            time.sleep(0.001)
+            lock_wait += time.perf_counter() - attempt
+
+
+def _worker(role, db_path, pragmas, users, duration, seed, results):
+    # Reader or writer loop; pushes a summary dict onto the results queue
+    rng = random.Random(seed)
+    # Fail fast on locks so the retry loop in _timed can measure the waits
+    pragmas = dict(sqlite_pragmas() if pragmas is None else pragmas, busy_timeout=0)
+    conn = _connect(db_path, pragmas=pragmas)
+    cur = conn.cursor()
+
+    latencies = []
+    lock_wait = 0.0
+    failures = 0
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        user_id = rng.randint(1, users)
+
+        if role == "reader":
+            statements = [
+                (
+                    """
+                    SELECT users.*, roles.name AS role_name
+                    FROM users JOIN roles ON users.role_id = roles.id
+                    WHERE users.id = ?
+                    """,
+                    (user_id,),
+                ),
+                (
+                    "SELECT user_id, expires_at, used_at FROM activation_tokens WHERE token_hash = ?",
+                    (hash_token(f"token-{user_id - 1}"),),
+                ),
+            ]
+        else:
+            now = utc_now()
+            statements = [
+                ("UPDATE users SET updated_at = ? WHERE id = ?", (now, user_id)),
+                (
+                    """
+                    INSERT INTO activation_tokens (user_id, token_hash, expires_at, used_at, created_at)
+                    VALUES (?, ?, ?, NULL, ?)
+                    """,
+                    (user_id, hash_token(secrets.token_urlsafe(16)), now, now),
+                ),
+            ]
+
+        latency, waited, failed = _timed(cur, conn, statements, role == "writer")
+        latencies.append(latency)
+        lock_wait += waited
+        failures += failed
+
+    conn.close_physical()
+    results.put(
+        {
+            "role": role,
+            "ops": len(latencies),
+            "latencies": latencies,
+            "lock_wait": lock_wait,
+            "lock_failures": failures,
+        }
+    )
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_configuration(name, pragmas, readers, writers, duration, users):
+    """
+    Benchmark one pragma configuration on a fresh database file.
+    Returns a dict of per-role throughput and lock statistics.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, f"bench_{name}.db")
+        _seed(db_path, users)
+
+        # Journal mode is persistent, so set it once before the workers start
+        if pragmas is not None:
+            _connect(db_path, pragmas=pragmas).close_physical()
+
+        results = multiprocessing.Queue()
+        procs = []
+        for i in range(readers + writers):
+            role = "reader" if i < readers else "writer"
+            proc = multiprocessing.Process(
+                target=_worker,
+                args=(role, db_path, pragmas, users, duration, i, results),
+            )
+            proc.start()
+            procs.append(proc)
+
+        collected = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+    report = {"configuration": name}
+    for role in ("reader", "writer"):
+        rows = [r for r in collected if r["role"] == role]
+        latencies = [lat for r in rows for lat in r["latencies"]]
+        ops = sum(r["ops"] for r in rows)
+        report[role] = {
+            "ops": ops,
+            "ops_per_sec": round(ops / duration, 1),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+            "max_ms": round(max(latencies, default=0) * 1000, 3),
+            "lock_wait_ms": round(sum(r["lock_wait"] for r in rows) * 1000, 1),
+            "lock_failures": sum(r["lock_failures"] for r in rows),
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per configuration")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument(
+        "--config",
+        action="append",
+        choices=list(CONFIGURATIONS),
+        help="configuration to run (repeatable, default: all)",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    reports = [
+        run_configuration(
+            name, CONFIGURATIONS[name], args.readers, args.writers, args.duration, args.users
+        )
+        for name in args.config or CONFIGURATIONS
+    ]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    header = f"{'config':<10} {'role':<7} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'lock wait ms':>13} {'lock errs':>10}"
+    print(header)
+    print("-" * len(header))
+    for report in reports:
+        for role in ("reader", "writer"):
+            r = report[role]
+            print(
+                f"{report['configuration']:<10} {role:<7} {r['ops_per_sec']:>10} {r['p50_ms']:>9} "
+                f"{r['p99_ms']:>9} {r['max_ms']:>9} {r['lock_wait_ms']:>13} {r['lock_failures']:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
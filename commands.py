@@ -0,0 +1,74 @@
+import click
+from flask import current_app
+from models.auditor.audit_rollups import backfill_rollups
+from models.auditor.audit_export import EXPORT_FORMATS, build_log_filter, export_logs
+from models.auth.activation import purge_stale_activation_tokens
+from models.bootstrap import bootstrap_once
+from models.db_sqlite import get_db
+from models.migrations import apply_migrations, get_schema_version
+from utils.assets import build_assets
+
+
+def register_commands(app):
+    # Register maintenance commands on the `flask` CLI
+
+    @app.cli.command("bootstrap")
+    def bootstrap():
+        """Create the schema, seed roles, the admin user and patient data."""
+        bootstrap_once()
+
+    @app.cli.command("build-assets")
+    def build_static_assets():
+        """Fingerprint and precompress the static CSS and JS files."""
+        manifest = build_assets(current_app.static_folder)
+        click.echo(f"Built {len(manifest)} assets.")
+
+    @app.cli.command("backfill-audit-rollups")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def backfill_audit_rollups(batch_size):
+        """Rebuild the auditor summary rollups from existing log events."""
+        total = backfill_rollups(batch_size=batch_size)
+        click.echo(f"Replayed {total} log events into the audit rollups.")
+
+    @app.cli.command("export-audit-logs")
+    @click.option(
+        "--format", "fmt", type=click.Choice(list(EXPORT_FORMATS)), default="ndjson"
+    )
+    @click.option("--gzip", "compress", is_flag=True, help="Gzip-compress the output.")
+    @click.option("--action", default=None, help="Only export this action.")
+    @click.option("--user-id", default=None, help="Only export this user's events.")
+    @click.option("--start", default=None, help="First day to include (YYYY-MM-DD).")
+    @click.option("--end", default=None, help="Last day to include (YYYY-MM-DD).")
+    @click.option("--batch-size", default=1000, show_default=True)
+    @click.option("--output", "-o", default="-", help="Output file, stdout by default.")
+    def export_audit_logs(fmt, compress, action, user_id, start, end, batch_size, output):
+        """Stream audit log events as NDJSON or CSV."""
+        try:
+            query = build_log_filter(action, user_id, start, end)
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+
+        with click.open_file(output, "wb") as out:
+            for chunk in export_logs(
+                fmt, compress=compress, query=query, batch_size=batch_size
+            ):
+                out.write(chunk)
+
+    @app.cli.command("purge-activation-tokens")
+    @click.option("--batch-size", default=None, type=int)
+    def purge_activation_tokens(batch_size):
+        """Delete expired and used activation tokens in small batches."""
+        deleted = purge_stale_activation_tokens(batch_size=batch_size)
+        click.echo(f"Deleted {deleted} stale activation tokens.")
+
+    @app.cli.command("migrate-db")
+    def migrate_db():
+        """Apply pending SQLite schema migrations."""
+        conn = get_db()
+        applied = apply_migrations(conn)
+        version = get_schema_version(conn)
+        conn.close()
+
+        for name in applied:
+            click.echo(f"Applied migration {name}")
+        click.echo(f"Schema is at version {version}.")
@@ -10,6 +10,17 @@ class Config:
     ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD")
     BASE_DIR = os.getcwd()
     DB_PATH = os.path.join(BASE_DIR, "healthcare_system.db")
+    # Idle SQLite connections kept open for reuse per process
+    SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", 5))
+
+    # SQLite tuning applied to every new connection
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    # Negative values are KiB, so -16000 is roughly a 16 MB page cache
+    SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", -16000))
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 64 * 1024 * 1024))
+    SQLITE_FOREIGN_KEYS = os.environ.get("SQLITE_FOREIGN_KEYS", "1") == "1"
     DATASET_PATH = os.path.join(BASE_DIR, "dataset")
     USERNAME_PATTERN = re.compile(r"^[a-zA-Z0-9_]{3,20}$")
     FULLNAME_PATTERN = re.compile(r"^[A-Za-z]+(?:[ '-][A-Za-z]+)+$")
@@ -25,12 +36,121 @@ class Config:
         re.VERBOSE,
     )
 
+    # Password hashing: bcrypt cost and the bounded hashing pool
+    BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+    BCRYPT_WORKERS = int(os.environ.get("BCRYPT_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+    BCRYPT_MAX_QUEUE = int(os.environ.get("BCRYPT_MAX_QUEUE", 16))
+    BCRYPT_TIMEOUT_SECONDS = float(os.environ.get("BCRYPT_TIMEOUT_SECONDS", 5))
+
+    # Login rate limiting (token buckets per username and client address).
+    # "memory" keeps buckets per process; "sqlite" shares them across the
+    # worker processes on one host through RATE_LIMIT_DB_PATH.
+    LOGIN_RATE_LIMIT_BACKEND = os.environ.get("LOGIN_RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_DB_PATH = os.path.join(BASE_DIR, "rate_limits.db")
+    LOGIN_USER_BUCKET_CAPACITY = 5
+    LOGIN_USER_REFILL_PER_MINUTE = 5
+    LOGIN_IP_BUCKET_CAPACITY = 20
+    LOGIN_IP_REFILL_PER_MINUTE = 30
+    LOGIN_RATE_LIMIT_MAX_KEYS = 10000
+
+    # Expired and used activation tokens are purged by the
+    # `purge-activation-tokens` command (e.g. hourly from cron). A positive
+    # interval also runs the purge in a thread in every app process.
+    ACTIVATION_TOKEN_PURGE_INTERVAL_SECONDS = int(
+        os.environ.get("ACTIVATION_TOKEN_PURGE_INTERVAL_SECONDS", 0)
+    )
+    ACTIVATION_TOKEN_PURGE_BATCH_SIZE = 500
+
+    # Users shown per page in the admin user list
+    ADMIN_USERS_PAGE_SIZE = 25
+    # Recent users shown on the admin dashboard
+    ADMIN_DASHBOARD_RECENT_USERS = 5
+    # Upper bound on how stale cached admin stats can be in other workers
+    ADMIN_STATS_CACHE_SECONDS = 30
+    # Upper bound on how stale cached patient stats can be in other workers
+    PATIENT_STATS_CACHE_SECONDS = 30
+    # Roles are cached per process; this bounds how long other workers
+    # take to see a role added elsewhere
+    ROLE_REGISTRY_CACHE_SECONDS = 300
+
+    # Rendered template fragments ({% cache %}), keyed on data generations.
+    # The age limit bounds how stale fragments can be in other workers.
+    FRAGMENT_CACHE_ENABLED = os.environ.get("FRAGMENT_CACHE_ENABLED", "1") == "1"
+    FRAGMENT_CACHE_SECONDS = int(os.environ.get("FRAGMENT_CACHE_SECONDS", 30))
+    FRAGMENT_CACHE_MAX_ENTRIES = 256
+    FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get("FRAGMENT_CACHE_MAX_BYTES", 4 * 1024 * 1024))
+
+    # Search-as-you-type JSON endpoints: default and largest page size
+    SEARCH_PAGE_SIZE = 20
+    SEARCH_MAX_PAGE_SIZE = 50
+
+    # Streamed listings: patients are read from Mongo in batches of this
+    # size and HTML is sent in chunks of at least this many characters
+    PATIENT_LIST_BATCH_SIZE = 500
+    STREAM_BUFFER_BYTES = 8192
+
+    # Static assets: CSS and JS are copied to the build directory under
+    # content-hashed names with gzip/brotli variants and served as immutable.
+    # HTML responses larger than the threshold are gzipped on the fly.
+    ASSETS_BUILD_DIR = os.environ.get("ASSETS_BUILD_DIR", os.path.join(BASE_DIR, "build", "assets"))
+    ASSETS_EXTENSIONS = (".css", ".js")
+    ASSETS_MAX_AGE = 365 * 24 * 3600
+    HTML_COMPRESSION_ENABLED = os.environ.get("HTML_COMPRESSION_ENABLED", "1") == "1"
+    HTML_COMPRESS_MIN_BYTES = int(os.environ.get("HTML_COMPRESS_MIN_BYTES", 1024))
+    HTML_COMPRESS_LEVEL = 6
+
+    # Per-request Server-Timing header for admin sessions; the JSON timing
+    # log (logger "request_timing") is always written
+    SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "1") == "1"
+
+    # Prometheus metrics: /metrics is served to admins and to these scraper
+    # addresses (none by default: behind a local proxy every request comes
+    # from 127.0.0.1). Under a multi-process server set METRICS_DIR to a
+    # directory shared by the workers; each writes a snapshot there.
+    METRICS_ALLOWED_ADDRS = [
+        a.strip() for a in os.environ.get("METRICS_ALLOWED_ADDRS", "").split(",") if a.strip()
+    ]
+    METRICS_DIR = os.environ.get("METRICS_DIR")
+    METRICS_FLUSH_SECONDS = int(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+
+    # Slow-query log: statements slower than the threshold are kept in a
+    # per-process ring buffer; slow Mongo reads are explained once per
+    # shape per interval in the background
+    SLOW_QUERY_THRESHOLD_MS = int(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 100))
+    SLOW_QUERY_LOG_SIZE = 500
+    SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "1") == "1"
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = 600
+
+    # Sampling profiler: when enabled, PROFILER_SAMPLE_RATE of requests are
+    # sampled every PROFILER_INTERVAL_MS and kept if slower than
+    # PROFILER_SLOW_REQUEST_MS; any other request still running at that
+    # threshold is sampled from then on and kept. Admin requests sending the
+    # debug header are always profiled.
+    PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "0") == "1"
+    PROFILER_SAMPLE_RATE = float(os.environ.get("PROFILER_SAMPLE_RATE", 0.1))
+    PROFILER_INTERVAL_MS = int(os.environ.get("PROFILER_INTERVAL_MS", 5))
+    PROFILER_SLOW_REQUEST_MS = int(os.environ.get("PROFILER_SLOW_REQUEST_MS", 1000))
+    PROFILER_DEBUG_HEADER = "X-Debug-Profile"
+    PROFILER_DIR = os.environ.get("PROFILER_DIR", os.path.join(BASE_DIR, "profiles"))
+    PROFILER_MAX_PROFILES = int(os.environ.get("PROFILER_MAX_PROFILES", 50))
+
+    # Largest CSV accepted by bulk user provisioning
+    BULK_PROVISION_MAX_ROWS = int(os.environ.get("BULK_PROVISION_MAX_ROWS", 500))
+
+    # How long a worker may rely on its in-memory revocation epochs before
+    # reloading them; bounds how late a deleted or edited account is logged out
+    AUTH_EPOCH_REFRESH_SECONDS = int(os.environ.get("AUTH_EPOCH_REFRESH_SECONDS", 15))
+
     # Mongo
     MONGO_URI = os.environ.get("MONGO_URI")
     MONGO_DB = "healthcare_system_db"
     MONGO_LOGS_COL = "logs"
+    MONGO_LOG_ROLLUPS_COL = "log_rollups"
     MONGO_PATIENTS_COL = "patients"
-    
+
+    # Number of days covered by the auditor summary view
+    AUDIT_SUMMARY_DAYS = 14
+
     # Fields to encrypt/decrypt
     MEDICAL_FIELDS = [
         "hypertension",
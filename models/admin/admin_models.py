@@ -1,79 +1,172 @@
+import re
+import sqlite3
+from config import Config
 from models.db_sqlite import get_db
+from utils.cache import GenerationCache
 
 
-def get_user_admin_stats():
-    # Get users stats for admin dashboard view
+_user_stats_cache = GenerationCache("users", ttl=Config.ADMIN_STATS_CACHE_SECONDS)
+_recent_users_cache = GenerationCache("users", ttl=Config.ADMIN_STATS_CACHE_SECONDS)
+
+
+def _compute_user_admin_stats():
+    # Count total, active and inactive users in a single scan
     conn = get_db()
     cur = conn.cursor()
 
-    cur.execute("SELECT COUNT(*) FROM users")
-    total = cur.fetchone()[0]
+    cur.execute(
+        """
+        SELECT
+            COUNT(*) AS total,
+            COALESCE(SUM(is_active = 1), 0) AS active,
+            COALESCE(SUM(is_active = 0), 0) AS inactive
+        FROM users
+        """
+    )
+    row = cur.fetchone()
 
-    cur.execute("SELECT COUNT(*) FROM users WHERE is_active = 1")
-    active = cur.fetchone()[0]
+    conn.close()
+    return {"total": row["total"], "active": row["active"], "inactive": row["inactive"]}
 
-    cur.execute("SELECT COUNT(*) FROM users WHERE is_active = 0")
-    inactive = cur.fetchone()[0]
 
-    conn.close()
-    return {"total": total, "active": active, "inactive": inactive}
+def get_user_admin_stats():
+    # Get users stats for admin dashboard view, cached until users change
+    return _user_stats_cache.get(_compute_user_admin_stats)
 
 
-def get_all_users():
-    # Fetch all users from the database for admin management
-    conn = get_db()
-    cur = conn.cursor()
+def get_recent_users(limit=None):
+    # Most recently created users for the admin dashboard table; the
+    # default page is cached until users change
+    if limit is None:
+        return _recent_users_cache.get(
+            lambda: get_recent_users(Config.ADMIN_DASHBOARD_RECENT_USERS)
+        )
+
+    users, _ = get_users_page(limit=limit)
+    return users
+
+
+USER_LIST_COLUMNS = """
+    users.id AS user_id,
+    users.username,
+    users.full_name,
+    users.is_active,
+    users.created_at AS user_created_at,
+    roles.name AS role_name
+"""
+
+
+def encode_user_cursor(row):
+    # Keyset cursor for the row after which the next page starts
+    return f"{row['user_created_at']}|{row['user_id']}"
+
+
+def decode_user_cursor(cursor):
+    """
+    Parse a "created_at|id" cursor.
+    Returns:
+        tuple | None: (created_at, id), or None for a missing or malformed cursor.
+    """
+    if not cursor:
+        return None
 
+    created_at, _, user_id = cursor.rpartition("|")
+    if not created_at or not user_id.isdigit():
+        return None
+    return created_at, int(user_id)
+
+
+def _fts_query(search_query):
+    # Turn free text into an FTS5 prefix query: every token must match
+    tokens = re.findall(r"[^\W_]+", search_query.lower())
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _fetch_user_page(cur, joins, where, params, after, limit):
+    # Run a users query newest first, starting after the keyset cursor
+    position = decode_user_cursor(after)
+    if position:
+        where.append("(users.created_at, users.id) < (?, ?)")
+        params.extend(position)
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
     cur.execute(
-        """
-				SELECT 
-						users.id AS user_id,
-						users.username,
-						users.full_name,
-						users.is_active,
-						users.created_at AS user_created_at,
-						roles.name AS role_name
-				FROM users
-				JOIN roles ON users.role_id = roles.id
-				ORDER BY users.created_at DESC
-				"""
+        f"""
+        SELECT {USER_LIST_COLUMNS}
+        FROM {joins}
+        {where_sql}
+        ORDER BY users.created_at DESC, users.id DESC
+        LIMIT ?
+        """,
+        (*params, limit + 1),
     )
 
     rows = cur.fetchall()
-    users = rows if rows else []
+    next_cursor = encode_user_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def get_users_page(after=None, limit=None):
+    """
+    Fetch one page of users, newest first, using keyset pagination on
+    (created_at, id) so every page costs the same however deep it is.
+    Args:
+        after (str, optional): Cursor returned with the previous page.
+        limit (int, optional): Page size, defaults to Config.ADMIN_USERS_PAGE_SIZE.
+    Returns:
+        tuple: (users, next_cursor); next_cursor is None on the last page.
+    """
+    limit = limit or Config.ADMIN_USERS_PAGE_SIZE
+    conn = get_db()
+    cur = conn.cursor()
+
+    page = _fetch_user_page(
+        cur, "users JOIN roles ON users.role_id = roles.id", [], [], after, limit
+    )
 
     conn.close()
-    return users
+    return page
 
 
-def search_user(search_query=None):
-    # Search for user by full_name or username
-    if search_query:
-        conn = get_db()
-        cur = conn.cursor()
+def search_user(search_query=None, after=None, limit=None):
+    """
+    Search users by full name or username with FTS5 prefix matching,
+    paginated like get_users_page.
+    Returns:
+        tuple: (users, next_cursor).
+    """
+    fts_query = _fts_query(search_query) if search_query else ""
+    if not fts_query:
+        return get_users_page(after=after, limit=limit)
 
-        search_pattern = f"%{search_query}%"
-        cur.execute(
+    limit = limit or Config.ADMIN_USERS_PAGE_SIZE
+    conn = get_db()
+    cur = conn.cursor()
+
+    try:
+        page = _fetch_user_page(
+            cur,
             """
-            SELECT 
-								users.id AS user_id,
-								users.username,
-								users.full_name,
-								users.is_active,
-								users.created_at AS user_created_at,
-								roles.name AS role_name
-						FROM users
-						JOIN roles ON users.role_id = roles.id
-            WHERE full_name LIKE ?
-            OR username LIKE ?
-						ORDER BY users.created_at DESC
+            users_fts
+            JOIN users ON users.id = users_fts.rowid
+            JOIN roles ON users.role_id = roles.id
             """,
-            (search_pattern, search_pattern),
+            ["users_fts MATCH ?"],
+            [fts_query],
+            after,
+            limit,
+        )
+    except sqlite3.OperationalError:
+        # No FTS5 table available; fall back to a substring scan
+        search_pattern = f"%{search_query}%"
+        page = _fetch_user_page(
+            cur,
+            "users JOIN roles ON users.role_id = roles.id",
+            ["(users.full_name LIKE ? OR users.username LIKE ?)"],
+            [search_pattern, search_pattern],
+            after,
+            limit,
         )
-        rows = cur.fetchall()
-        users = rows if rows else []
-        conn.close()
-    else:
-        users = get_all_users()
 
-    return users
+    conn.close()
+    return page
@@ -0,0 +1,195 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, timedelta
+from models.mongo_client import get_logs_collection
+from models.users.user_model import get_usernames_by_ids
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = ["id", "ts", "action", "user_id", "username", "action_on", "details"]
+
+
+def build_log_filter(action=None, user_id=None, start=None, end=None):
+    """
+    Build a Mongo filter for the log export.
+    Args:
+        action (str, optional): Exact action name.
+        user_id (int | str, optional): SQLite id of the acting user.
+        start (str, optional): First day to include (YYYY-MM-DD).
+        end (str, optional): Last day to include (YYYY-MM-DD).
+    Raises:
+        ValueError: If a filter value is malformed.
+    """
+    query = {}
+
+    if action:
+        query["action"] = action
+
+    if user_id not in (None, ""):
+        try:
+            query["user_id"] = int(user_id)
+        except (TypeError, ValueError):
+            raise ValueError("User id must be a number.")
+
+    # Log timestamps are ISO 8601 strings, so day bounds compare lexically
+    ts_range = {}
+    try:
+        if start:
+            ts_range["$gte"] = date.fromisoformat(start).isoformat()
+        if end:
+            ts_range["$lt"] = (date.fromisoformat(end) + timedelta(days=1)).isoformat()
+    except ValueError:
+        raise ValueError("Dates must use the YYYY-MM-DD format.")
+
+    if ts_range:
+        query["ts"] = ts_range
+
+    return query
+
+
+_log_indexes_ensured = False
+
+
+def ensure_log_indexes(collection=None):
+    """
+    Index the log timestamps, so exports read events in ts order from the
+    index instead of sorting every matching event in memory. Also serves
+    the day range filters.
+    """
+    global _log_indexes_ensured
+    collection = collection or get_logs_collection()
+    collection.create_index([("ts", 1)], name="idx_logs_ts")
+    _log_indexes_ensured = True
+
+
+def iter_log_events(query, batch_size=1000, collection=None):
+    # Stream matching log events oldest first from a batched cursor
+    if collection is None and not _log_indexes_ensured:
+        ensure_log_indexes()
+
+    collection = collection or get_logs_collection()
+    cursor = (
+        collection.find(query).sort("ts", 1).batch_size(batch_size)
+    )
+    for event in cursor:
+        yield event
+
+
+def with_usernames(events, batch_size=1000, lookup=get_usernames_by_ids):
+    """
+    Attach a `username` to each event.
+    Events are buffered per batch so unknown user ids are resolved with one
+    SQLite lookup per batch; resolved names are cached for the whole export.
+    """
+    cache = {}
+    batch = []
+
+    def resolve(batch):
+        missing = {e.get("user_id") for e in batch} - cache.keys()
+        if missing:
+            found = lookup(missing)
+            for user_id in missing:
+                cache[user_id] = found.get(user_id)
+
+        for event in batch:
+            event["username"] = cache.get(event.get("user_id"))
+            yield event
+
+    for event in events:
+        batch.append(event)
+        if len(batch) >= batch_size:
+            yield from resolve(batch)
+            batch = []
+
+    yield from resolve(batch)
+
+
+def _export_record(event):
+    # Flatten a log event into JSON-friendly export fields
+    details = event.get("details") or {}
+    return {
+        "id": str(event.get("_id", "")),
+        "ts": event.get("ts"),
+        "action": event.get("action"),
+        "user_id": event.get("user_id"),
+        "username": event.get("username"),
+        "action_on": details.get("action_on"),
+        "details": details,
+    }
+
+
+def serialize_ndjson(events):
+    # One JSON document per line
+    for event in events:
+        yield json.dumps(_export_record(event), default=str) + "\n"
+
+
+def serialize_csv(events):
+    # CSV with a header row; details are kept as a JSON column
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+
+    for event in events:
+        record = _export_record(event)
+        record["details"] = json.dumps(record["details"], default=str)
+        writer.writerow(record)
+
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def encode_chunks(chunks, compress=False, flush_size=64 * 1024):
+    """
+    Encode text chunks to bytes, optionally as a single gzip stream.
+    Small chunks are coalesced so each yielded block is close to
+    `flush_size` bytes.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending = []
+    pending_size = 0
+
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        pending.append(data)
+        pending_size += len(data)
+
+        if pending_size >= flush_size:
+            block = b"".join(pending)
+            pending, pending_size = [], 0
+            if compressor:
+                block = compressor.compress(block)
+            if block:
+                yield block
+
+    block = b"".join(pending)
+    if compressor:
+        block = compressor.compress(block) + compressor.flush()
+    if block:
+        yield block
+
+
+def export_logs(fmt="ndjson", compress=False, query=None, batch_size=1000, collection=None):
+    """
+    Stream filtered log events as NDJSON or CSV bytes without loading the
+    result set into memory.
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'.")
+
+    events = iter_log_events(query or {}, batch_size=batch_size, collection=collection)
+    events = with_usernames(events, batch_size=batch_size)
+
+    serializer = serialize_csv if fmt == "csv" else serialize_ndjson
+    return encode_chunks(serializer(events), compress=compress)
@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta, timezone
+from config import Config
+from models.mongo_client import get_logs_collection, get_log_rollups_collection
+from utils.time_formatter import utc_now
+
+# Rollup granularities mapped to the ISO 8601 prefix length of a period,
+# e.g. "2025-01-31T09" for an hour and "2025-01-31" for a day
+ROLLUP_GRANULARITIES = {"hour": 13, "day": 10}
+
+
+def _rollup_id(granularity, period, action, user_id):
+    # Deterministic id so every event upserts into the same rollup document
+    return f"{granularity}|{period}|{action}|{user_id}"
+
+
+def _rollup_updates(action, user_id, ts, count=1):
+    """
+    Build the upsert operations that add `count` events to the hourly
+    and daily rollup documents of an action/user pair.
+    """
+    from pymongo import UpdateOne
+
+    updates = []
+    for granularity, length in ROLLUP_GRANULARITIES.items():
+        period = ts[:length]
+        updates.append(
+            UpdateOne(
+                {"_id": _rollup_id(granularity, period, action, user_id)},
+                {
+                    "$inc": {"count": count},
+                    "$setOnInsert": {
+                        "granularity": granularity,
+                        "period": period,
+                        "action": action,
+                        "user_id": user_id,
+                    },
+                },
+                upsert=True,
+            )
+        )
+    return updates
+
+
+def record_rollup(action, user_id, ts, collection=None):
+    """
+    Incrementally update the rollup documents for a single log event.
+    Args:
+        action (str): The logged action name.
+        user_id (int): SQLite id of the user who performed the action.
+        ts (str): ISO 8601 timestamp of the event.
+    """
+    collection = collection or get_log_rollups_collection()
+    collection.bulk_write(_rollup_updates(action, user_id, ts), ordered=False)
+
+
+def record_rollups(events, collection=None):
+    """
+    Update the rollup documents for a batch of log events with a single
+    bulk write; events in the same hour are counted together.
+    Args:
+        events (list): Log documents with action, user_id and ts.
+    """
+    pending = {}
+    for event in events:
+        key = (event["action"], event["user_id"], event["ts"][:13])
+        pending[key] = pending.get(key, 0) + 1
+
+    _flush_backfill(pending, collection or get_log_rollups_collection())
+
+
+def ensure_rollup_indexes(collection=None):
+    # Summary queries filter on granularity and a period range
+    collection = collection or get_log_rollups_collection()
+    collection.create_index(
+        [("granularity", 1), ("period", 1)],
+        name="idx_rollups_granularity_period",
+    )
+
+
+def backfill_rollups(batch_size=1000, logs=None, collection=None, staging=None):
+    """
+    Rebuild the rollup documents from the existing log events.
+    The rollups are rebuilt into a staging collection, which then replaces
+    the live one, so summaries keep reading complete rollups during the
+    rebuild. Events are read with a batched cursor and their counts are
+    written with one bulk upsert per batch.
+    Returns:
+        int: Number of log events replayed.
+    """
+    logs = logs or get_logs_collection()
+    collection = collection or get_log_rollups_collection()
+    staging = staging or collection.database[f"{collection.name}_staging"]
+
+    # Events from the cutoff on are counted by log_action in the live rollups
+    cutoff = utc_now()
+    staging.drop()
+    total = _replay(logs, {"ts": {"$lt": cutoff}}, staging, batch_size)
+    ensure_rollup_indexes(staging)
+
+    # Events logged during the rebuild were counted in the collection being
+    # replaced; replay them into the new one. Only a log_action in flight
+    # across the rename itself can still be counted twice or missed.
+    swapped_at = utc_now()
+    staging.rename(collection.name, dropTarget=True)
+    total += _replay(
+        logs, {"ts": {"$gte": cutoff, "$lt": swapped_at}}, collection, batch_size
+    )
+    return total
+
+
+def _replay(logs, query, collection, batch_size):
+    # Count the matching log events into the rollups of `collection`
+    cursor = logs.find(
+        query, {"action": 1, "user_id": 1, "ts": 1, "_id": 0}
+    ).batch_size(batch_size)
+
+    total = 0
+    pending = {}
+    for event in cursor:
+        if not event.get("ts"):
+            continue
+
+        key = (event.get("action"), event.get("user_id"), event["ts"][:13])
+        pending[key] = pending.get(key, 0) + 1
+        total += 1
+
+        if total % batch_size == 0:
+            _flush_backfill(pending, collection)
+            pending = {}
+
+    _flush_backfill(pending, collection)
+    return total
+
+
+def _flush_backfill(pending, collection):
+    # Write a batch of (action, user_id, hour) counts into the rollups
+    updates = []
+    for (action, user_id, hour), count in pending.items():
+        updates.extend(_rollup_updates(action, user_id, hour, count))
+
+    if updates:
+        collection.bulk_write(updates, ordered=False)
+
+
+def get_rollup_summary(days=None, collection=None):
+    """
+    Summarise audit activity from the daily and hourly rollups.
+    Only rollup documents are read, so the cost depends on the number of
+    distinct actions and users rather than the number of log events.
+    Args:
+        days (int, optional): Number of days to summarise.
+    Returns:
+        dict with totals per action, per user, per day and per hour.
+    """
+    collection = collection or get_log_rollups_collection()
+    days = days or Config.AUDIT_SUMMARY_DAYS
+
+    now = datetime.now(timezone.utc)
+    day_start = (now - timedelta(days=days - 1)).isoformat()[:10]
+    hour_start = (now - timedelta(hours=23)).isoformat()[:13]
+
+    action_totals = {}
+    user_totals = {}
+    user_actions = {}
+    daily = {}
+
+    for doc in collection.find({"granularity": "day", "period": {"$gte": day_start}}):
+        action = doc["action"]
+        user_id = doc["user_id"]
+        count = doc["count"]
+
+        action_totals[action] = action_totals.get(action, 0) + count
+        user_totals[user_id] = user_totals.get(user_id, 0) + count
+
+        per_user = user_actions.setdefault(user_id, {})
+        per_user[action] = per_user.get(action, 0) + count
+
+        per_day = daily.setdefault(doc["period"], {})
+        per_day[action] = per_day.get(action, 0) + count
+
+    hourly = {}
+    for doc in collection.find(
+        {"granularity": "hour", "period": {"$gte": hour_start}}
+    ):
+        hourly[doc["period"]] = hourly.get(doc["period"], 0) + doc["count"]
+
+    return {
+        "days": days,
+        "total": sum(action_totals.values()),
+        "action_totals": sorted(
+            action_totals.items(), key=lambda item: item[1], reverse=True
+        ),
+        "user_totals": sorted(
+            user_totals.items(), key=lambda item: item[1], reverse=True
+        ),
+        "user_actions": user_actions,
+        "daily": sorted(daily.items(), reverse=True),
+        "hourly": sorted(hourly.items(), reverse=True),
+    }
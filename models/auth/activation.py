@@ -1,9 +1,14 @@
 import secrets
 import hashlib
+import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta, timezone
+from config import Config
 from models.auth.auth import hash_password
 from models.db_sqlite import get_db
 from utils.time_formatter import utc_now
+from utils.cache import bump_generation
 
 
 def hash_token(raw_token: str) -> str:
@@ -11,19 +16,29 @@ def hash_token(raw_token: str) -> str:
     return hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
 
 
-def generate_activation_token(user_id: int, hours_valid: int = 24) -> str:
+def new_activation_token(hours_valid: int = 24):
     """
-    Creates a secure, one-time activation token for a user.
-    Returns the RAW token (for URL), stores only the hash in SQLite.
+    Create a raw activation token with its hash and expiry.
+    Returns:
+        tuple: (raw_token, token_hash, expires_at ISO string)
     """
-
     # long safe random token
     raw_token = secrets.token_urlsafe(32)
-    token_hash = hash_token(raw_token)
 
     time = datetime.now(timezone.utc)
     expires_at = time + timedelta(hours=hours_valid)
 
+    return raw_token, hash_token(raw_token), expires_at.isoformat()
+
+
+def generate_activation_token(user_id: int, hours_valid: int = 24) -> str:
+    """
+    Creates a secure, one-time activation token for a user.
+    Returns the RAW token (for URL), stores only the hash in SQLite.
+    """
+
+    raw_token, token_hash, expires_at = new_activation_token(hours_valid)
+
     conn = get_db()
     cur = conn.cursor()
 
@@ -43,7 +58,7 @@ def generate_activation_token(user_id: int, hours_valid: int = 24) -> str:
         INSERT INTO activation_tokens (user_id, token_hash, expires_at, used_at, created_at)
         VALUES (?, ?, ?, NULL, ?)
         """,
-        (user_id, token_hash, expires_at.isoformat(), utc_now()),
+        (user_id, token_hash, expires_at, utc_now()),
     )
 
     conn.commit()
@@ -141,5 +156,77 @@ def update_user_activation(user_id, new_password, db=None):
     )
 
     conn.commit()
+    bump_generation("users")
     if db is None:
         conn.close()
+
+
+def purge_stale_activation_tokens(batch_size=None, pause=0.05, db=None):
+    """
+    Delete expired and used activation tokens in small batches.
+    Each batch is its own short transaction, with a pause in between, so
+    the purge never holds the write lock for long.
+    Returns:
+        int: Number of tokens deleted.
+    """
+    batch_size = batch_size or Config.ACTIVATION_TOKEN_PURGE_BATCH_SIZE
+    now = utc_now()
+    total = 0
+
+    while True:
+        conn = db or get_db()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            DELETE FROM activation_tokens
+            WHERE id IN (
+                SELECT id FROM activation_tokens
+                WHERE used_at IS NOT NULL OR expires_at < ?
+                LIMIT ?
+            )
+            """,
+            (now, batch_size),
+        )
+        deleted = cur.rowcount
+        conn.commit()
+        if db is None:
+            conn.close()
+
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+        time.sleep(pause)
+
+
+_purger = None
+
+
+def start_activation_token_purger(interval_seconds=None):
+    """
+    Start a daemon thread that purges stale activation tokens periodically.
+    Does nothing if the purger is already running or the interval is 0.
+    """
+    global _purger
+    interval_seconds = (
+        Config.ACTIVATION_TOKEN_PURGE_INTERVAL_SECONDS
+        if interval_seconds is None
+        else interval_seconds
+    )
+
+    if _purger is not None or interval_seconds <= 0:
+        return
+
+    def run():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                purge_stale_activation_tokens()
+            except sqlite3.Error:
+                # Try again on the next cycle
+                pass
+
+    _purger = threading.Thread(
+        target=run, name="activation-token-purger", daemon=True
+    )
+    _purger.start()
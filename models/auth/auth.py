@@ -1,25 +1,46 @@
 import bcrypt
+from config import Config
 from models.db_sqlite import get_db
+from services.hashing_pool import get_hashing_pool, HashingPoolSaturated
 from utils.time_formatter import utc_now
 
 """Authentication utility functions."""
 
 
-def hash_password(plain_password: str) -> str:
+def hash_password(plain_password: str, rounds: int | None = None) -> str:
     """
-    Hash user's plain text password using bcrypt.
+    Hash user's plain text password using bcrypt on the hashing pool.
 
     Args:
         plain_password (str): The plain text password entered by the user during registration.
+        rounds (int, optional): bcrypt work factor, defaults to Config.BCRYPT_ROUNDS.
     Returns:
         str: password in a string format.
+    Raises:
+        HashingPoolSaturated: If the hashing pool cannot take more work.
     """
     password_bytes = plain_password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password_bytes, salt)
+    salt = bcrypt.gensalt(rounds=rounds or Config.BCRYPT_ROUNDS)
+    hashed_password = get_hashing_pool().run(bcrypt.hashpw, password_bytes, salt)
     return hashed_password.decode("utf-8")
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """
+    Check whether a stored hash was made with a different work factor.
+
+    Args:
+        password_hash (str): A bcrypt hash such as "$2b$12$...".
+    Returns:
+        bool: True if the cost differs from Config.BCRYPT_ROUNDS.
+    """
+    try:
+        cost = int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return False
+    return cost != Config.BCRYPT_ROUNDS
+
+
 def verify_password(plain_password: str, password_hash: str) -> bool:
     """
     Compare a stored password hash with a user-provided password.
@@ -33,7 +54,27 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
 
     if not (password_hash and plain_password):
         return False
-    return bcrypt.checkpw(plain_password.encode("utf-8"), password_hash.encode("utf-8"))
+    return get_hashing_pool().run(
+        bcrypt.checkpw, plain_password.encode("utf-8"), password_hash.encode("utf-8")
+    )
+
+
+def rehash_password(user_id: int, plain_password: str, old_hash: str) -> None:
+    """
+    Replace a user's password hash with one at the current work factor.
+    The update only applies if the stored hash is unchanged, so a concurrent
+    password change is never overwritten.
+    """
+    new_hash = hash_password(plain_password)
+
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute(
+        "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+        (new_hash, user_id, old_hash),
+    )
+    conn.commit()
+    conn.close()
 
 
 def authenticate_user(username: str, plain_password: str) -> dict | None:
@@ -45,6 +86,8 @@ def authenticate_user(username: str, plain_password: str) -> dict | None:
          plain_password (str): The user's plaintext password to verify.
      Returns:
          dict | None: The user dict from the database if credentials are correct, otherwise None.
+     Raises:
+         HashingPoolSaturated: If the hashing pool cannot take more work.
     """
 
     conn = get_db()
@@ -65,6 +108,13 @@ def authenticate_user(username: str, plain_password: str) -> dict | None:
 
     if not (verify_password(plain_password, user["password_hash"])):
         return None
+
+    # Transparently upgrade hashes made with an old work factor
+    if password_needs_rehash(user["password_hash"]):
+        try:
+            rehash_password(user["id"], plain_password, user["password_hash"])
+        except HashingPoolSaturated:
+            pass
     return user
 
 
@@ -0,0 +1,92 @@
+import threading
+import time
+from config import Config
+from models.db_sqlite import get_db
+
+"""
+Per-user revocation epochs.
+
+Every user row carries an `auth_epoch` that is bumped when the account is
+edited. The epoch is stored in the session at login and compared on each
+request against a compact in-memory map of user id -> epoch, so the
+account check is a dict lookup instead of a users/roles JOIN. Deleted
+users map to None. The map is reloaded every AUTH_EPOCH_REFRESH_SECONDS,
+which bounds how long another worker process can miss a change.
+"""
+
+_epochs = {}
+_loaded_at = None
+_lock = threading.Lock()
+
+
+def _reload_epochs(db=None):
+    # Replace the map with the epochs of every existing user
+    global _epochs, _loaded_at
+    conn = db or get_db()
+    rows = conn.execute("SELECT id, auth_epoch FROM users").fetchall()
+    if db is None:
+        conn.close()
+
+    _epochs = {row[0]: row[1] for row in rows}
+    _loaded_at = time.monotonic()
+
+
+def _lookup_epoch(user_id, db=None):
+    # Single-row read for users created since the last reload
+    conn = db or get_db()
+    row = conn.execute(
+        "SELECT auth_epoch FROM users WHERE id = ?", (user_id,)
+    ).fetchone()
+    if db is None:
+        conn.close()
+    return row[0] if row else None
+
+
+def get_auth_epoch(user_id, db=None):
+    """
+    Return the current auth epoch of a user.
+    Returns:
+        int | None: The epoch, or None if the user does not exist.
+    """
+    if _loaded_at is None or time.monotonic() - _loaded_at >= Config.AUTH_EPOCH_REFRESH_SECONDS:
+        with _lock:
+            if _loaded_at is None or time.monotonic() - _loaded_at >= Config.AUTH_EPOCH_REFRESH_SECONDS:
+                _reload_epochs(db)
+
+    epochs = _epochs
+    if user_id not in epochs:
+        epochs[user_id] = _lookup_epoch(user_id, db)
+    return epochs[user_id]
+
+
+def is_session_current(user_id, session_epoch, db=None):
+    """
+    Check that a session was issued for the user's current auth epoch.
+    Sessions created before epochs existed carry none and count as epoch 0.
+    """
+    session_epoch = session_epoch or 0
+    epoch = get_auth_epoch(user_id, db)
+
+    # A newer epoch than the cached one means this process missed a change
+    # made elsewhere (e.g. an edit followed by a new login); read the row
+    # rather than logging out a session issued for the current epoch
+    if epoch is not None and session_epoch > epoch:
+        epoch = _epochs[user_id] = _lookup_epoch(user_id, db)
+
+    return epoch is not None and epoch == session_epoch
+
+
+def forget_auth_epoch(user_id):
+    # Drop a user's cached epoch so the next check reads the new one
+    _epochs.pop(user_id, None)
+
+
+def revoke_auth_epoch(user_id):
+    # Mark a deleted user in this process without waiting for a reload
+    _epochs[user_id] = None
+
+
+def reset_auth_epochs():
+    # Force a full reload on the next check
+    global _loaded_at
+    _loaded_at = None
@@ -4,7 +4,8 @@ from config import Config
 from models.users.user_model import get_all_user_roles
 
 
-def validate_registration_form(username, full_name, role_name):
+def validate_user_fields(username, full_name, role_name):
+    # Format checks that need no database access
     if not (username and full_name and role_name):
         raise ValueError("All fields are required.")
 
@@ -20,6 +21,10 @@ def validate_registration_form(username, full_name, role_name):
             "Full name is invalid. Must contain atleast 2 separate names"
         )
 
+
+def validate_registration_form(username, full_name, role_name):
+    validate_user_fields(username, full_name, role_name)
+
     # Check that role exists
     if role_name not in get_all_user_roles():
         raise ValueError("Invalid role selected.")
@@ -4,13 +4,15 @@ from models.auth.auth import hash_password
 from config import Config
 from utils.services_logging import log_action
 from utils.time_formatter import utc_now
-from models.patients.import_stroke_data import seed_stroke_dataset
+from models.users.role_registry import get_role_id, get_roles, invalidate_roles
 
 
 def bootstrap_once():
     """
     Creates database tables, seeds the roles,
     and creates the default admin user if none exists.
+    Run once per deployment with `flask --app app bootstrap`, not on
+    every worker start.
     """
 
     try:
@@ -19,10 +21,7 @@ def bootstrap_once():
         cur = conn.cursor()
 
         # Seed roles for admin and clinician
-        cur.execute("SELECT COUNT(1) FROM roles")
-        roles_exist = cur.fetchone()[0] > 0
-
-        if not roles_exist:
+        if not get_roles():
             cur.execute(
                 "INSERT INTO roles (name, description) VALUES (?, ?)",
                 ("admin", "System Administrator with full privileges"),
@@ -35,13 +34,13 @@ def bootstrap_once():
                 "INSERT INTO roles (name, description) VALUES (?, ?)",
                 ("auditor", "Auditor who audits logs"),
             )
+            conn.commit()
+            invalidate_roles()
             print("Seeded roles: admin, clinician, auditor")
 
         # Check if an admin user already exists
-        cur.execute(
-            "SELECT COUNT(1) FROM users JOIN roles ON users.role_id = roles.id WHERE roles.name = ?",
-            ("admin",),
-        )
+        admin_role_id = get_role_id("admin")
+        cur.execute("SELECT COUNT(1) FROM users WHERE role_id = ?", (admin_role_id,))
 
         has_admin = cur.fetchone()[0] > 0
 
@@ -63,10 +62,6 @@ def bootstrap_once():
 
             password_hash = hash_password(admin_password)
 
-            # Get admin role ID
-            cur.execute("SELECT id FROM roles WHERE name = 'admin'")
-            role_id = cur.fetchone()["id"]
-
             # Insert admin user
             cur.execute(
                 """
@@ -77,7 +72,7 @@ def bootstrap_once():
                     admin_username.strip(),
                     "System Admin",
                     password_hash,
-                    role_id,
+                    admin_role_id,
                     1,  # 1 means admin is auto-activated
                     utc_now(),
                 ),
@@ -98,6 +93,8 @@ def bootstrap_once():
 
             # Seed patient dataset in MongoDB
             try:
+                from models.patients.import_stroke_data import seed_stroke_dataset
+
                 seed_stroke_dataset(admin_id)
                 log_action(
                     action="PATIENT DATA SEEDED",
@@ -110,6 +107,14 @@ def bootstrap_once():
             except Exception:
                 print("Fail to seed patient data in mongodb")
 
+        # Audit log index used by the exports
+        try:
+            from models.auditor.audit_export import ensure_log_indexes
+
+            ensure_log_indexes()
+        except Exception:
+            print("Fail to create audit log indexes in mongodb")
+
     except ValueError as e:
         print(f"{e}")
     except (Exception, sqlite3.Error):
@@ -1,69 +1,282 @@
+import re
 import sqlite3
+import threading
+import time
+from queue import LifoQueue, Empty, Full
+from flask import g, has_app_context
 from config import Config
+from models.migrations import LATEST_VERSION, apply_migrations, get_schema_version
+from utils.instrumentation import record
 
 
-def get_db():
-    conn = sqlite3.connect(Config.DB_PATH)
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that reports the time spent on each statement, executing it and
+    fetching its rows, to the request instrumentation as a single sample.
+    A statement is reported once its rows are exhausted, the next statement
+    runs or the cursor is closed. Iterating the cursor directly is not
+    timed, which keeps per-row overhead out of large scans.
+    """
+
+    _sql = None
+    _elapsed = 0.0
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def _begin(self, sql):
+        self._finish()
+        self._sql = sql
+        self._elapsed = 0.0
+
+    def _finish(self):
+        # Report the current statement, if it has not been reported yet
+        if self._sql is not None:
+            sql, self._sql = self._sql, None
+            record("sqlite", self._elapsed, sql)
+
+    def _executed(self, method, sql, parameters):
+        self._begin(sql)
+        try:
+            return self._timed(method, sql, parameters)
+        finally:
+            # Statements without result rows are complete once executed
+            if self.description is None:
+                self._finish()
+
+    def execute(self, sql, parameters=()):
+        return self._executed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._executed(super().executemany, sql, seq_of_parameters)
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        try:
+            return self._timed(super().fetchall)
+        finally:
+            self._finish()
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Cursors that were iterated directly are reported when discarded
+        self._finish()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    SQLite connection handed out by get_db().
+
+    close() keeps the existing `conn.close()` calls in the models working
+    without tearing down the connection: any open transaction is rolled
+    back (as a real close would), then request-scoped connections stay
+    open until the app context ends and pooled ones go back to the pool.
+    """
+
+    pool = None
+    request_scoped = False
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+        if self.request_scoped:
+            return
+
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+    def close_physical(self):
+        # Really close the underlying SQLite handle
+        super().close()
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # sqlite3's shortcut methods bypass cursor().execute, so route them
+    # through a timed cursor explicitly
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ConnectionPool:
+    """
+    Small thread-safe pool of SQLite connections for one database file.
+    Idle connections are kept in a LIFO queue so the most recently used
+    (and warmest) connection is reused first.
+    """
+
+    def __init__(self, db_path, size):
+        self.db_path = db_path
+        self._idle = LifoQueue(maxsize=size)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            return _connect(self.db_path, pool=self)
+
+    def release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except Full:
+            conn.close_physical()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close_physical()
+            except Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Pragmas the tuning layer is allowed to set, in the order they are applied
+TUNABLE_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "foreign_keys",
+)
+_PRAGMA_VALUE_PATTERN = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+
+def sqlite_pragmas():
+    # Connection pragmas built from Config
+    return {
+        "journal_mode": Config.SQLITE_JOURNAL_MODE,
+        "synchronous": Config.SQLITE_SYNCHRONOUS,
+        "busy_timeout": Config.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": Config.SQLITE_CACHE_SIZE,
+        "mmap_size": Config.SQLITE_MMAP_SIZE,
+        "foreign_keys": "ON" if Config.SQLITE_FOREIGN_KEYS else "OFF",
+    }
+
+
+def apply_pragmas(conn, pragmas):
+    """
+    Apply tuning pragmas to a freshly opened connection.
+    Pragma values cannot be bound as parameters, so names are restricted to
+    TUNABLE_PRAGMAS and values to plain words or integers.
+    """
+    for name in TUNABLE_PRAGMAS:
+        value = pragmas.get(name)
+        if value is None:
+            continue
+
+        if not _PRAGMA_VALUE_PATTERN.fullmatch(str(value)):
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def _connect(db_path, pool=None, pragmas=None):
+    # Connections may be released from a different thread than they were
+    # opened in, so SQLite's same-thread check is disabled
+    conn = sqlite3.connect(
+        db_path, factory=PooledConnection, check_same_thread=False
+    )
+    conn.pool = pool
 
     # returns rows as dict-like objects
     conn.row_factory = sqlite3.Row
+
+    apply_pragmas(conn, sqlite_pragmas() if pragmas is None else pragmas)
     return conn
 
 
-def init_sqlite_db():
-    """Initialize creation of sqlite tables needed"""
-    conn = get_db()
-    cur = conn.cursor()
-
-    # Roles table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS roles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            description TEXT
-        );
-        """
-    )
+def get_pool(db_path=None):
+    # Return the connection pool for a database file, creating it once
+    db_path = db_path or Config.DB_PATH
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = ConnectionPool(db_path, Config.SQLITE_POOL_SIZE)
+                _pools[db_path] = pool
+    return pool
 
-    # Users table
-    cur.execute(
-        """ 
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            role_id INTEGER NOT NULL,
-            username TEXT NOT NULL UNIQUE,
-            full_name TEXT NOT NULL,
-            password_hash TEXT,
-            is_active BOOLEAN NOT NULL DEFAULT 0,
-            created_at TEXT NOT NULL,
-            updated_at TEXT,
-            FOREIGN KEY (role_id) REFERENCES roles(id)
-        );
-    		"""
-    )
 
-    # Index for fast username lookups
-    cur.execute(
-        """ 
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username_unique ON users(username);
-    		"""
-    )
+def get_db():
+    """
+    Return a SQLite connection.
+    Inside an app context the same connection is reused for the whole
+    request and released by close_db(); elsewhere (bootstrap, CLI,
+    background jobs) a connection is borrowed from the pool and returned
+    when the caller closes it.
+    """
+    if has_app_context():
+        conn = g.get("_sqlite_conn")
+        if conn is None:
+            conn = get_pool().acquire()
+            conn.request_scoped = True
+            g._sqlite_conn = conn
+        return conn
 
-    # Activation tokens table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS activation_tokens (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            token_hash TEXT NOT NULL,
-            expires_at TEXT NOT NULL,
-            used_at TEXT,
-            created_at TEXT NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-        """
-    )
+    return get_pool().acquire()
+
+
+def close_db(exception=None):
+    # Release the request-scoped connection at the end of the app context
+    conn = g.pop("_sqlite_conn", None)
+    if conn is not None:
+        conn.request_scoped = False
+        conn.close()
 
-    conn.commit()
+
+def init_app(app):
+    # Register the SQLite teardown with the Flask app
+    app.teardown_appcontext(close_db)
+
+
+def init_sqlite_db():
+    """Bring the sqlite schema up to date by applying pending migrations"""
+    conn = get_db()
+    apply_migrations(conn)
     conn.close()
+
+
+def ensure_schema_current():
+    """
+    Cheap startup check: read PRAGMA user_version and only run the
+    migrations when the schema is behind the code.
+    Returns:
+        bool: True if migrations were applied.
+    """
+    conn = get_pool().acquire()
+    try:
+        if get_schema_version(conn) >= LATEST_VERSION:
+            return False
+        apply_migrations(conn)
+        return True
+    finally:
+        conn.close()
@@ -0,0 +1,231 @@
+import sqlite3
+from collections import namedtuple
+
+"""
+Versioned SQLite schema migrations.
+
+The schema version is stored in `PRAGMA user_version`. Each migration is a
+list of steps (SQL strings or functions taking a cursor) applied in order.
+Regular migrations run in a single transaction together with the version
+bump. Online migrations (long index builds) run each step in its own short
+transaction so the write lock is released between steps; their steps must
+be idempotent (IF NOT EXISTS) so an interrupted run can resume.
+"""
+
+Migration = namedtuple("Migration", ["version", "name", "steps", "online"])
+
+
+def _create_users_fts(cur):
+    """
+    Create the users_fts FTS5 table, the triggers that keep it in sync with
+    users, and index the existing rows. Skipped if SQLite was built without
+    FTS5 (user search then falls back to LIKE).
+    """
+    try:
+        cur.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+                full_name,
+                username,
+                content='users',
+                content_rowid='id'
+            );
+            """
+        )
+    except sqlite3.OperationalError:
+        return
+
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS users_fts_after_insert AFTER INSERT ON users BEGIN
+            INSERT INTO users_fts(rowid, full_name, username)
+            VALUES (new.id, new.full_name, new.username);
+        END;
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS users_fts_after_delete AFTER DELETE ON users BEGIN
+            INSERT INTO users_fts(users_fts, rowid, full_name, username)
+            VALUES ('delete', old.id, old.full_name, old.username);
+        END;
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS users_fts_after_update
+        AFTER UPDATE OF full_name, username ON users BEGIN
+            INSERT INTO users_fts(users_fts, rowid, full_name, username)
+            VALUES ('delete', old.id, old.full_name, old.username);
+            INSERT INTO users_fts(rowid, full_name, username)
+            VALUES (new.id, new.full_name, new.username);
+        END;
+        """
+    )
+
+    # Index users created before the FTS table existed
+    cur.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild');")
+
+
+MIGRATIONS = [
+    # Tables use IF NOT EXISTS so databases created before versioning
+    # (user_version 0) adopt the baseline without changes
+    Migration(
+        1,
+        "initial_schema",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS roles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                description TEXT
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                role_id INTEGER NOT NULL,
+                username TEXT NOT NULL UNIQUE,
+                full_name TEXT NOT NULL,
+                password_hash TEXT,
+                is_active BOOLEAN NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                updated_at TEXT,
+                FOREIGN KEY (role_id) REFERENCES roles(id)
+            );
+            """,
+            # Index for fast username lookups
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username_unique ON users(username);
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS activation_tokens (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                token_hash TEXT NOT NULL,
+                expires_at TEXT NOT NULL,
+                used_at TEXT,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            );
+            """,
+        ],
+        False,
+    ),
+    # Activation token lookups by hash and by user, and expiry for the purge
+    Migration(
+        2,
+        "activation_token_indexes",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS idx_activation_tokens_token_hash
+            ON activation_tokens(token_hash);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_activation_tokens_user_id
+            ON activation_tokens(user_id);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_activation_tokens_expires_at
+            ON activation_tokens(expires_at);
+            """,
+        ],
+        True,
+    ),
+    # Keyset pagination for the admin user list
+    Migration(
+        3,
+        "users_created_at_index",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS idx_users_created_at_id
+            ON users(created_at, id);
+            """,
+        ],
+        True,
+    ),
+    # Full-text search over user names
+    Migration(4, "users_fts", [_create_users_fts], False),
+    # Per-user revocation epoch compared against the session on each request
+    Migration(
+        5,
+        "users_auth_epoch",
+        [
+            """
+            ALTER TABLE users ADD COLUMN auth_epoch INTEGER NOT NULL DEFAULT 0;
+            """,
+        ],
+        False,
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn):
+    # Schema version recorded in the database header
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _run_step(cur, step):
+    if callable(step):
+        step(cur)
+    else:
+        cur.execute(step)
+
+
+def _run_in_transaction(conn, migration, steps, set_version):
+    """
+    Run steps inside one BEGIN IMMEDIATE transaction.
+    Returns False without changes if another process already applied the
+    migration while this one waited for the write lock.
+    """
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        if get_schema_version(conn) >= migration.version:
+            conn.rollback()
+            return False
+
+        for step in steps:
+            _run_step(cur, step)
+
+        if set_version:
+            cur.execute(f"PRAGMA user_version = {int(migration.version)}")
+
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def apply_migration(conn, migration):
+    # Apply one migration; returns True if it was applied by this call
+    if not migration.online:
+        return _run_in_transaction(conn, migration, migration.steps, True)
+
+    for step in migration.steps:
+        if not _run_in_transaction(conn, migration, [step], False):
+            return False
+    return _run_in_transaction(conn, migration, [], True)
+
+
+def apply_migrations(conn, target=None):
+    """
+    Apply all pending migrations up to `target` (default: latest).
+    Returns:
+        list: Names of the migrations applied by this call.
+    """
+    target = LATEST_VERSION if target is None else target
+    applied = []
+
+    for migration in MIGRATIONS:
+        if migration.version > target:
+            break
+        if migration.version <= get_schema_version(conn):
+            continue
+        if apply_migration(conn, migration):
+            applied.append(migration.name)
+
+    return applied
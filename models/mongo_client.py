@@ -0,0 +1,44 @@
+"""
+Shared, lazily created MongoDB client.
+
+pymongo is only imported and the client only created the first time a
+collection is needed, so importing the app (e.g. in every WSGI worker)
+does not open Mongo connections or start monitor threads.
+"""
+
+import threading
+from config import Config
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_mongo_client():
+    # One MongoClient per process; it is thread-safe and pools connections
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from pymongo import MongoClient
+                from utils.mongo_listeners import MongoTimingListener, SlowQueryListener
+
+                _client = MongoClient(
+                    Config.MONGO_URI, event_listeners=[MongoTimingListener(), SlowQueryListener()]
+                )
+    return _client
+
+
+def get_collection(name):
+    return get_mongo_client()[Config.MONGO_DB][name]
+
+
+def get_logs_collection():
+    return get_collection(Config.MONGO_LOGS_COL)
+
+
+def get_log_rollups_collection():
+    return get_collection(Config.MONGO_LOG_ROLLUPS_COL)
+
+
+def get_patients_collection():
+    return get_collection(Config.MONGO_PATIENTS_COL)
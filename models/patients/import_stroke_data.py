@@ -1,21 +1,16 @@
 import os
 import csv
-from faker import Faker
-from pymongo import MongoClient
 from bson import ObjectId
 from dotenv import load_dotenv
 from datetime import datetime, timezone
 from config import Config
+from models.mongo_client import get_patients_collection
 from services.encryption_service import encrypt_value
+from utils.cache import bump_generation
 
 load_dotenv() # Load env variables
-fake = Faker() # Generate Random fake data e.g person's first name
 
-_client = MongoClient(Config.MONGO_URI)
-_mdb = _client[Config.MONGO_DB]
-patients_collection = _mdb[Config.MONGO_PATIENTS_COL]
-
-def seed_stroke_dataset(created_by=None):
+def seed_stroke_dataset(created_by=None, collection=None):
     # Seeds initial stroke data from csv dataset
     dataset_dir = Config.DATASET_PATH
     filename = "healthcare_stroke_data.csv"
@@ -30,10 +25,16 @@ def seed_stroke_dataset(created_by=None):
     if not filename.lower().endswith(".csv"):
         print(f"Not a CSV file: {filename}")
         return
+    patients_collection = collection or get_patients_collection()
     if patients_collection.count_documents({"source": "stroke_dataset"}) > 0:
         print("Stroke dataset already imported. Skipping...")
         return
 
+    # Faker is slow to import and only needed for this one-off seed
+    from faker import Faker
+
+    fake = Faker() # Generate Random fake data e.g person's first name
+
     print(f"Importing stroke dataset from: {file_path}")
 
     with open(file_path, newline="") as csvfile:
@@ -86,4 +87,5 @@ def seed_stroke_dataset(created_by=None):
 
         if records:
             patients_collection.insert_many(records, ordered=False)
+            bump_generation("patients")
         print("Stroke dataset imported successfully!")
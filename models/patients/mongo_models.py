@@ -1,21 +1,24 @@
-from pymongo import MongoClient
+import re
 from config import Config
 from bson import ObjectId
 from datetime import datetime, timezone
 from services.decrypt_doc import decrypt_patient_doc
 from services.encryption_service import encrypt_value
 from models.patients.helpers import dob_to_age, to_object_id
+from utils.cache import GenerationCache, bump_generation
 
-_client = MongoClient(Config.MONGO_URI)
-_mdb = _client[Config.MONGO_DB]
-patients_collection = _mdb[Config.MONGO_PATIENTS_COL]
+from models.mongo_client import get_patients_collection
+
+_admin_stats_cache = GenerationCache("patients", ttl=Config.PATIENT_STATS_CACHE_SECONDS)
+_clinician_stats_cache = GenerationCache("patients", ttl=Config.PATIENT_STATS_CACHE_SECONDS)
+_first_patients_cache = GenerationCache("patients", ttl=Config.PATIENT_STATS_CACHE_SECONDS)
 
 
 def create_patient(clinician_id, data, collection=None):
     """
     Create a new patient record with encrypted medical fields and insert into MongoDB.
     """
-    collection = collection or patients_collection
+    collection = collection or get_patients_collection()
 
     # Normalize names and compute age from dob
     age = dob_to_age(data["date_of_birth"])
@@ -46,25 +49,35 @@ def create_patient(clinician_id, data, collection=None):
             patient[field] = None
 
     collection.insert_one(patient)
+    bump_generation("patients")
     return str(patient["_id"])
 
 
-def get_patient_admin_stats():
-    # Return the total number of patients in the collection
-    total = patients_collection.count_documents({})
+def get_patient_admin_stats(collection=None):
+    # Return the total number of patients, cached until patients change
+    if collection is None:
+        return _admin_stats_cache.get(lambda: get_patient_admin_stats(get_patients_collection()))
+
+    total = collection.count_documents({})
     return {"total": total if total else 0}
 
 
-def get_patient_clinician_stats():
+def get_patient_clinician_stats(collection=None):
     """
     Compute and aggregates patient data to provide an overview of key metrics
     relevant for clinician dashboard. It decrypts medical fields as necessary and computes
     statistics such as counts, distributions, and averages.
+    The result for the shared collection is cached until patients change.
     """
+    if collection is None:
+        return _clinician_stats_cache.get(
+            lambda: get_patient_clinician_stats(get_patients_collection())
+        )
+
     stats = {}
 
     # Fetch all patients
-    all_docs = patients_collection.find()
+    all_docs = collection.find()
     patients = [decrypt_patient_doc(d) for d in all_docs]
 
     stats["total"] = len(patients)
@@ -116,15 +129,16 @@ def get_patient_clinician_stats():
     return stats
 
 
-def get_all_patients(created_by=None):
+def get_all_patients(created_by=None, collection=None):
     """
     Fetch and decrypt all patient records.
     """
+    collection = collection or get_patients_collection()
     query = {}
     if created_by is not None:
         query["created_by"] = created_by
 
-    cursor = patients_collection.find(query).sort("created_at", -1)
+    cursor = collection.find(query).sort("created_at", -1)
 
     results = []
     for doc in cursor:
@@ -136,21 +150,29 @@ def get_all_patients(created_by=None):
     return results
 
 
-def get_first_10_patients(created_by=None):
+def get_first_10_patients(created_by=None, collection=None):
     """
     Fetch first 10 patient records for use in the clinician dashboard.
+    The unfiltered list from the shared collection is cached until
+    patients change.
     Args:
         created_by (int, optional): SQLite user_id of the clinician who created the patients.
         If None, fetches all 10 patients.
     Returns:
         List of patient documents.
     """
+    if created_by is None and collection is None:
+        return _first_patients_cache.get(
+            lambda: get_first_10_patients(collection=get_patients_collection())
+        )
+
+    collection = collection or get_patients_collection()
     query = {}
     if created_by is not None:
         query["created_by"] = created_by
 
     # Fetch only first 10 records, newest first
-    patients_cursor = patients_collection.find(query).sort("created_at", -1).limit(10)
+    patients_cursor = collection.find(query).sort("created_at", -1).limit(10)
 
     # convert Mongo ObjectId to string
     formatted = []
@@ -171,7 +193,9 @@ def delete_patient(patient_id):
         bool: True if deleted, False if not found or unauthorized.
     """
     query = {"_id": to_object_id(patient_id)}
-    result = patients_collection.delete_one(query)
+    result = get_patients_collection().delete_one(query)
+    if result.deleted_count:
+        bump_generation("patients")
 
     return result.deleted_count > 0
 
@@ -184,7 +208,7 @@ def get_patient_by_id(patient_id):
     Returns:
         dict or None
     """
-    doc = patients_collection.find_one({"_id": to_object_id(patient_id)})
+    doc = get_patients_collection().find_one({"_id": to_object_id(patient_id)})
 
     if not doc:
         return None
@@ -222,32 +246,87 @@ def update_patient(patient_id, data, clinician_id):
         else:
             document[field] = None
 
-    result = patients_collection.update_one(
+    result = get_patients_collection().update_one(
         {"_id": to_object_id(patient_id)}, {"$set": document}
     )
 
+    bump_generation("patients")
+
     return result.modified_count == 1
 
 
-def search_patient(search_query=None):
-    if search_query:
-        cursor = patients_collection.find(
-            {
-                "$or": [
-                    {"first_name": {"$regex": search_query, "$options": "i"}},
-                    {"last_name": {"$regex": search_query, "$options": "i"}},
-                ]
-            }
-        )
+def _name_filter(search_query):
+    # Case-insensitive literal match on first or last name
+    if not search_query:
+        return {}
+    pattern = re.escape(search_query)
+    return {
+        "$or": [
+            {"first_name": {"$regex": pattern, "$options": "i"}},
+            {"last_name": {"$regex": pattern, "$options": "i"}},
+        ]
+    }
+
+
+def iter_patients(search_query=None, collection=None):
+    """
+    Yield decrypted patients one at a time while reading the cursor in
+    batches, so listing memory does not grow with the number of patients.
+    Args:
+        search_query (str, optional): Literal text matched against first or
+        last name; without it every patient is listed. Newest first.
+    """
+    collection = collection or get_patients_collection()
+    # Same filter and order as search_patients_page, so the live search
+    # results continue the server-rendered list
+    cursor = collection.find(_name_filter(search_query)).sort("_id", -1)
+
+    for doc in cursor.batch_size(Config.PATIENT_LIST_BATCH_SIZE):
+        patient = decrypt_patient_doc(doc)
+        patient["id"] = str(doc["_id"])
+        del patient["_id"]
+        yield patient
+
+
+# Fields returned by the search-as-you-type endpoint
+SEARCH_FIELDS = {"first_name": 1, "last_name": 1, "gender": 1, "age": 1, "stroke": 1}
+
+
+def search_patients_page(search_query=None, after=None, limit=None, collection=None):
+    """
+    One page of patients matching a name fragment, newest first, with
+    only the fields a search result row shows. Pages are keyed on _id so
+    each costs the same however deep it is.
+    Args:
+        search_query (str, optional): Literal text matched against first or last name.
+        after (str, optional): Cursor returned with the previous page.
+        limit (int, optional): Page size, defaults to Config.SEARCH_PAGE_SIZE.
+    Returns:
+        tuple: (patients, next_cursor); next_cursor is None on the last page.
+    Raises:
+        bson.errors.InvalidId: If the cursor is malformed.
+    """
+    collection = collection or get_patients_collection()
+    limit = limit or Config.SEARCH_PAGE_SIZE
+
+    query = _name_filter(search_query)
+    if after:
+        query["_id"] = {"$lt": to_object_id(after)}
+
+    cursor = collection.find(query, SEARCH_FIELDS).sort("_id", -1).limit(limit + 1)
+    docs = list(cursor)
+
+    patients = []
+    for doc in docs[:limit]:
+        # Only stroke is encrypted among the projected fields
+        patient = decrypt_patient_doc(doc)
+        patient["id"] = str(patient.pop("_id"))
+        patients.append(patient)
 
-        results = []
-        for doc in cursor:
-            patient = decrypt_patient_doc(doc)
-            patient["id"] = str(doc["_id"])
-            del patient["_id"]
-            results.append(patient)
+    next_cursor = patients[-1]["id"] if len(docs) > limit else None
+    return patients, next_cursor
 
-        return results
 
-    # If no search term provided return all patients
-    return get_all_patients()
+def search_patient(search_query=None, collection=None):
+    # All matching patients as a list; see iter_patients
+    return list(iter_patients(search_query, collection))
@@ -0,0 +1,175 @@
+import csv
+import io
+import sqlite3
+from config import Config
+from models.db_sqlite import get_db
+from models.auth.activation import new_activation_token
+from models.auth.validations import validate_user_fields
+from models.users.role_registry import get_roles
+from utils.cache import bump_generation
+from utils.time_formatter import utc_now
+
+# Columns expected in an uploaded users CSV
+CSV_FIELDS = ("username", "full_name", "role_name")
+
+
+def parse_users_csv(text):
+    """
+    Parse an uploaded users CSV.
+    Args:
+        text (str): CSV content with a username,full_name,role_name header.
+    Returns:
+        list: (line number, row dict) pairs; blank lines are skipped.
+    Raises:
+        ValueError: If columns are missing, there are no rows or too many.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    missing = set(CSV_FIELDS) - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}.")
+
+    rows = []
+    for row in reader:
+        values = {field: (row.get(field) or "").strip() for field in CSV_FIELDS}
+        if not any(values.values()):
+            continue
+
+        rows.append((reader.line_num, values))
+        if len(rows) > Config.BULK_PROVISION_MAX_ROWS:
+            raise ValueError(
+                f"A CSV file may contain at most {Config.BULK_PROVISION_MAX_ROWS} users."
+            )
+
+    if not rows:
+        raise ValueError("The CSV file contains no users.")
+    return rows
+
+
+def _existing_usernames(conn, usernames, chunk_size=500):
+    # Which of the given usernames are already taken, in a few IN queries
+    usernames = list(usernames)
+    existing = set()
+    for i in range(0, len(usernames), chunk_size):
+        chunk = usernames[i : i + chunk_size]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT username FROM users WHERE username IN ({placeholders})", chunk
+        )
+        existing.update(row["username"] for row in rows)
+    return existing
+
+
+def validate_bulk_users(rows, db=None):
+    """
+    Validate every CSV row in one pass against preloaded roles and the
+    usernames already taken, instead of querying per row.
+    Returns:
+        list: Error messages prefixed with their CSV line; empty if valid.
+    """
+    role_ids = get_roles(db)
+    conn = db or get_db()
+    taken = _existing_usernames(conn, {values["username"] for _, values in rows})
+    if db is None:
+        conn.close()
+
+    errors = []
+    seen = set()
+    for line, values in rows:
+        username = values["username"]
+        try:
+            validate_user_fields(username, values["full_name"], values["role_name"])
+
+            if values["role_name"] not in role_ids:
+                raise ValueError("Invalid role selected.")
+            if values["role_name"] == "admin":
+                raise ValueError("Admin accounts cannot be created in bulk.")
+            if username in taken:
+                raise ValueError("A user with this username already exists.")
+            if username in seen:
+                raise ValueError("Username appears more than once in the file.")
+        except ValueError as e:
+            errors.append(f"Line {line}: {e}")
+
+        seen.add(username)
+
+    return errors
+
+
+def provision_users(rows, hours_valid=24, db=None):
+    """
+    Create validated users and their activation tokens in one transaction.
+    Args:
+        rows (list): (line number, row dict) pairs from parse_users_csv.
+        hours_valid (int): Lifetime of the activation tokens.
+    Returns:
+        list: Dicts with user_id, username, full_name, role_name and the raw token.
+    Raises:
+        ValueError: If a username was taken concurrently; nothing is created.
+    """
+    role_ids = get_roles(db)
+    conn = db or get_db()
+    now = utc_now()
+
+    created = []
+    tokens = []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for _, values in rows:
+            cur = conn.execute(
+                """
+                INSERT INTO users (username, full_name, password_hash, role_id, is_active, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    values["username"],
+                    values["full_name"].title(),
+                    None,
+                    role_ids[values["role_name"]],
+                    0,
+                    now,
+                ),
+            )
+
+            raw_token, token_hash, expires_at = new_activation_token(hours_valid)
+            tokens.append((cur.lastrowid, token_hash, expires_at, now))
+            created.append(
+                {
+                    "user_id": cur.lastrowid,
+                    "username": values["username"],
+                    "full_name": values["full_name"].title(),
+                    "role_name": values["role_name"],
+                    "token": raw_token,
+                }
+            )
+
+        conn.executemany(
+            """
+            INSERT INTO activation_tokens (user_id, token_hash, expires_at, used_at, created_at)
+            VALUES (?, ?, ?, NULL, ?)
+            """,
+            tokens,
+        )
+        conn.commit()
+    except sqlite3.IntegrityError:
+        conn.rollback()
+        raise ValueError(
+            "A username in the file was taken while importing. No users were created."
+        )
+    finally:
+        if db is None:
+            conn.close()
+
+    bump_generation("users")
+    return created
+
+
+def build_activation_csv(users):
+    # CSV of the created users and their activation links for download
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["username", "full_name", "role_name", "activation_link"])
+    for user in users:
+        writer.writerow(
+            [user["username"], user["full_name"], user["role_name"], user["activation_link"]]
+        )
+    return buffer.getvalue()
@@ -0,0 +1,86 @@
+import threading
+from config import Config
+from models.db_sqlite import get_db
+from utils.cache import GenerationCache, bump_generation
+
+"""
+Process-wide registry of roles.
+
+Roles almost never change, so the id <-> name maps are loaded once per
+database and reused until the "roles" generation is bumped (by this
+process) or ROLE_REGISTRY_CACHE_SECONDS pass (for changes made by other
+processes). Passing `db` reads that connection directly instead, for
+callers inside their own transaction or working on another database.
+"""
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _load_roles(conn):
+    # Role name -> id for every role
+    return {row["name"]: row["id"] for row in conn.execute("SELECT id, name FROM roles")}
+
+
+def _read_roles():
+    conn = get_db()
+    roles = _load_roles(conn)
+    conn.close()
+    return roles
+
+
+def _cache():
+    # One cache per database file, like the connection pools
+    cache = _caches.get(Config.DB_PATH)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(
+                Config.DB_PATH,
+                GenerationCache("roles", Config.ROLE_REGISTRY_CACHE_SECONDS),
+            )
+    return cache
+
+
+def get_roles(db=None):
+    """
+    Return the role name -> id map.
+    Args:
+        db (sqlite3.Connection, optional): Read roles from this connection
+            instead of the cached registry.
+    """
+    if db is not None:
+        return _load_roles(db)
+    return _cache().get(_read_roles)
+
+
+def get_role_id(role_name, db=None):
+    """
+    Resolve a role name to its id.
+    An unknown name reloads the registry once in case the role was added
+    by another process since it was cached.
+    Returns:
+        int | None: The role id, or None if no such role exists.
+    """
+    role_id = get_roles(db).get(role_name)
+    if role_id is None and db is None:
+        _cache().clear()
+        role_id = get_roles().get(role_name)
+    return role_id
+
+
+def get_role_name(role_id, db=None):
+    # Resolve a role id to its name, or None
+    for name, known_id in get_roles(db).items():
+        if known_id == role_id:
+            return name
+    return None
+
+
+def get_role_names(db=None):
+    # All role names
+    return list(get_roles(db))
+
+
+def invalidate_roles():
+    # Call after inserting, renaming or deleting roles
+    bump_generation("roles")
@@ -1,20 +1,19 @@
 from models.db_sqlite import get_db
 from utils.time_formatter import utc_now
 from models.auth.auth import get_user_by_id
+from utils.cache import bump_generation
+from models.auth.revocation import forget_auth_epoch, revoke_auth_epoch
+from models.users.role_registry import get_role_id, get_role_names
 
 
 def create_user(username, full_name, role_name, db=None):
     # Create a new user with the given username, full name, and role; sets account as inactive initially
-    conn = db or get_db()
-    cur = conn.cursor()
-
-    cur.execute("SELECT id FROM roles WHERE name = ?", (role_name,))
-    row = cur.fetchone()
-
-    if not row:
+    role_id = get_role_id(role_name, db)
+    if role_id is None:
         raise ValueError(f"Role '{role_name}' does not exist.")
 
-    role_id = row["id"]
+    conn = db or get_db()
+    cur = conn.cursor()
     time = utc_now()
     normalized_full_name = full_name.title()
 
@@ -29,6 +28,7 @@ def create_user(username, full_name, role_name, db=None):
     new_user_id = cur.lastrowid
 
     conn.commit()
+    bump_generation("users")
 
     if db is None:
         conn.close()
@@ -37,14 +37,8 @@ def create_user(username, full_name, role_name, db=None):
 
 
 def get_all_user_roles():
-    # Retrieve a list of all role names from the roles table
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("SELECT name FROM roles")
-    rows = cur.fetchall()
-    conn.close()
-    return [row["name"] for row in rows] if rows else []
+    # Retrieve a list of all role names from the role registry
+    return get_role_names()
 
 
 def update_user(user_id, data):
@@ -60,7 +54,7 @@ def update_user(user_id, data):
     cur.execute(
         """
 						UPDATE users 
-						SET full_name = ?, username = ?
+						SET full_name = ?, username = ?, auth_epoch = auth_epoch + 1
 						WHERE id = ?
 						""",
         (full_name, username, user_id),
@@ -68,6 +62,9 @@ def update_user(user_id, data):
 
     conn.commit()
     conn.close()
+    bump_generation("users")
+    # Sessions issued before the edit are logged out on their next request
+    forget_auth_epoch(user_id)
 
 
 def delete_user_service(user_id):
@@ -87,6 +84,9 @@ def delete_user_service(user_id):
     conn = get_db()
     cur = conn.cursor()
 
+    # Remove the user's activation tokens first so foreign keys stay valid
+    cur.execute("DELETE FROM activation_tokens WHERE user_id = ?", (user_id,))
+
     cur.execute(
         """
         DELETE FROM users
@@ -98,5 +98,36 @@ def delete_user_service(user_id):
     conn.commit()
     deleted = cur.rowcount == 1
     conn.close()
+    bump_generation("users")
+    revoke_auth_epoch(user_id)
 
     return deleted
+
+
+def get_usernames_by_ids(user_ids, db=None):
+    """
+    Resolve a batch of user ids to usernames with one query per chunk.
+    Returns a dict mapping user id to username; unknown ids are omitted.
+    """
+    ids = list({user_id for user_id in user_ids if isinstance(user_id, int)})
+    if not ids:
+        return {}
+
+    conn = db or get_db()
+    cur = conn.cursor()
+
+    usernames = {}
+    # Stay well below SQLite's bound-parameter limit
+    for start in range(0, len(ids), 500):
+        chunk = ids[start : start + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        cur.execute(
+            f"SELECT id, username FROM users WHERE id IN ({placeholders})", chunk
+        )
+        for row in cur.fetchall():
+            usernames[row["id"]] = row["username"]
+
+    if db is None:
+        conn.close()
+
+    return usernames
@@ -6,8 +6,13 @@ from flask import (
     flash,
     session,
     Blueprint,
+    Response,
+    abort,
+    jsonify,
 )
+import base64
 import sqlite3
+from config import Config
 from utils.time_formatter import utc_now
 from models.users.user_model import (
     create_user,
@@ -15,12 +20,25 @@ from models.users.user_model import (
     delete_user_service,
 )
 from utils.decorators import admin_required, login_required
-from utils.services_logging import log_action
+from utils.services_logging import log_action, log_actions
 from models.auth.validations import validate_registration_form
 from models.auth.activation import generate_activation_token
-from models.admin.admin_models import get_user_admin_stats, get_all_users, search_user
+from models.users.bulk_provisioning import (
+    build_activation_csv,
+    parse_users_csv,
+    provision_users,
+    validate_bulk_users,
+)
+from models.admin.admin_models import (
+    get_user_admin_stats,
+    get_recent_users,
+    search_user,
+)
 from models.patients.mongo_models import get_patient_admin_stats
 from models.auth.auth import get_user_by_id
+from utils.slow_queries import recent_slow_queries, slow_query_report
+from utils.profiler import list_profiles, load_folded
+from utils.streaming import stream_page
 
 admin_bp = Blueprint("admin", __name__)
 
@@ -32,7 +50,7 @@ admin_bp = Blueprint("admin", __name__)
 def dashboard():
     patient_stats = get_patient_admin_stats()
     user_stats = get_user_admin_stats()
-    users = get_all_users()
+    users = get_recent_users()
 
     return render_template(
         "admin/dashboard.html",
@@ -98,6 +116,65 @@ def create_user_post():
         )
 
 
+@admin_bp.route("/users/bulk", methods=["GET"])
+@login_required
+@admin_required
+def bulk_create_users_get():
+    return render_template("admin/users/bulk.html", errors=[])
+
+
+@admin_bp.route("/users/bulk", methods=["POST"])
+@login_required
+@admin_required
+def bulk_create_users_post():
+    upload = request.files.get("users_csv")
+
+    try:
+        if not upload or not upload.filename:
+            raise ValueError("Please choose a CSV file to upload.")
+
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValueError("The CSV file must be UTF-8 encoded.")
+
+        rows = parse_users_csv(text)
+        errors = validate_bulk_users(rows)
+        if errors:
+            flash("No users were created. Fix the errors below and upload the file again.", "danger")
+            return render_template("admin/users/bulk.html", errors=errors)
+
+        users = provision_users(rows)
+        for user in users:
+            user["activation_link"] = url_for(
+                "auth.activate_account_get", token=user.pop("token"), _external=True
+            )
+
+        # One audit write for the whole import
+        log_actions(
+            [
+                (
+                    "INVITE_USER",
+                    session.get("user_id"),
+                    {"action_on": user["user_id"], "action_at": utc_now()},
+                )
+                for user in users
+            ]
+        )
+
+        # Raw tokens are never stored, so the download is built into the page
+        csv_data = base64.b64encode(build_activation_csv(users).encode("utf-8")).decode("ascii")
+
+        flash(f"Created {len(users)} users.", "success")
+        return render_template("admin/users/bulk_result.html", users=users, csv_data=csv_data)
+    except ValueError as e:
+        flash(str(e), "danger")
+        return render_template("admin/users/bulk.html", errors=[])
+    except sqlite3.Error:
+        flash("An error occurred", "danger")
+        return render_template("admin/users/bulk.html", errors=[])
+
+
 @admin_bp.route("/users/activation-link", methods=["GET"])
 def activation_link():
     activation_link = request.args.get("activation_link")
@@ -112,10 +189,78 @@ def activation_link():
 @admin_required
 def view_users():
     search_query = request.args.get("q", "").strip()
-    users = search_user(search_query)
+    after = request.args.get("after")
+    users, next_cursor = search_user(search_query, after=after)
+
+    return stream_page(
+        "admin/users/list.html",
+        users=users,
+        search_query=search_query,
+        after=after,
+        next_cursor=next_cursor,
+    )
+
+
+@admin_bp.route("/users/search", methods=["GET"])
+@login_required
+@admin_required
+def search_users_json():
+    # Search-as-you-type results: a page of ids, names, role and status
+    search_query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", Config.SEARCH_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, Config.SEARCH_MAX_PAGE_SIZE))
 
+    users, next_cursor = search_user(search_query, after=request.args.get("after"), limit=limit)
+    results = [
+        {
+            "id": u["user_id"],
+            "username": u["username"],
+            "full_name": u["full_name"],
+            "role_name": u["role_name"],
+            "is_active": bool(u["is_active"]),
+            "url": url_for("admin.view_user", user_id=u["user_id"]),
+        }
+        for u in users
+    ]
+    return jsonify({"results": results, "next": next_cursor})
+
+
+@admin_bp.route("/slow-queries", methods=["GET"])
+@login_required
+@admin_required
+def slow_queries():
     return render_template(
-        "admin/users/list.html", users=users, search_query=search_query
+        "admin/slow_queries.html",
+        report=slow_query_report(),
+        entries=recent_slow_queries(),
+        threshold_ms=Config.SLOW_QUERY_THRESHOLD_MS,
+    )
+
+
+@admin_bp.route("/profiles", methods=["GET"])
+@login_required
+@admin_required
+def profiles():
+    return render_template(
+        "admin/profiles.html",
+        profiles=list_profiles(),
+        debug_header=Config.PROFILER_DEBUG_HEADER,
+    )
+
+
+@admin_bp.route("/profiles/<profile_id>.folded", methods=["GET"])
+@login_required
+@admin_required
+def download_profile(profile_id):
+    try:
+        folded = load_folded(profile_id)
+    except (ValueError, FileNotFoundError):
+        abort(404)
+
+    return Response(
+        folded,
+        mimetype="text/plain",
+        headers={"Content-Disposition": f"attachment; filename={profile_id}.folded"},
     )
 
 
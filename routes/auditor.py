@@ -1,6 +1,19 @@
-from flask import Blueprint, render_template
+from flask import (
+    Blueprint,
+    Response,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    stream_with_context,
+)
 from utils.decorators import login_required, auditor_required
+from utils.time_formatter import utc_now
 from models.auditor.auditor_model import get_logs
+from models.auditor.audit_rollups import get_rollup_summary
+from models.auditor.audit_export import EXPORT_FORMATS, build_log_filter, export_logs
+from models.users.user_model import get_usernames_by_ids
 
 
 auditor_bp = Blueprint("auditor", __name__)
@@ -13,3 +26,46 @@ auditor_bp = Blueprint("auditor", __name__)
 def dashboard():
     logs = get_logs()
     return render_template("auditor/dashboard.html", logs=logs)
+
+
+@auditor_bp.route("/summary", methods=["GET"])
+@login_required
+@auditor_required
+def summary():
+    summary = get_rollup_summary()
+    usernames = get_usernames_by_ids(summary["user_actions"].keys())
+    return render_template(
+        "auditor/summary.html", summary=summary, usernames=usernames
+    )
+
+
+@auditor_bp.route("/logs/export", methods=["GET"])
+@login_required
+@auditor_required
+def export_logs_get():
+    fmt = request.args.get("format", "ndjson").strip().lower()
+    compress = request.args.get("gzip") in ("1", "true", "on")
+
+    try:
+        query = build_log_filter(
+            action=request.args.get("action", "").strip(),
+            user_id=request.args.get("user_id", "").strip(),
+            start=request.args.get("start", "").strip(),
+            end=request.args.get("end", "").strip(),
+        )
+        chunks = export_logs(fmt, compress=compress, query=query)
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for("auditor.dashboard"))
+
+    filename = f"audit-logs-{utc_now()[:10]}.{fmt}"
+    mimetype = EXPORT_FORMATS[fmt]
+    if compress:
+        filename += ".gz"
+        mimetype = "application/gzip"
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
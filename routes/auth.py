@@ -2,6 +2,8 @@ import sqlite3
 from utils.time_formatter import utc_now
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from models.auth.auth import authenticate_user, get_user_by_id
+from services.hashing_pool import HashingPoolSaturated
+from utils.rate_limiter import allow_login_attempt
 from utils.services_logging import log_action
 from models.auth.validations import validate_login_form, validate_activation_passwords
 from models.auth.activation import (
@@ -33,6 +35,16 @@ def login_post():
     try:
         validate_login_form(username, password)
 
+        # Reject floods before they reach bcrypt
+        if not allow_login_attempt(username, request.remote_addr):
+            flash("Too many login attempts. Please wait a moment and try again.", "danger")
+            return (
+                render_template(
+                    "auth/login.html", form_data={"username": username, "password": ""}
+                ),
+                429,
+            )
+
         user = authenticate_user(username, password)
         if not user:
             raise ValueError("Invalid username or password.")
@@ -46,6 +58,7 @@ def login_post():
         session["user_id"] = full_user["id"]
         session["role_name"] = full_user["role_name"]
         session["role_id"] = full_user["role_id"]
+        session["auth_epoch"] = full_user["auth_epoch"]
 
         log_action(
             "USER LOGIN",
@@ -64,6 +77,14 @@ def login_post():
         return render_template(
             "auth/login.html", form_data={"username": username, "password": ""}
         )
+    except HashingPoolSaturated:
+        flash("The server is busy. Please try again in a moment.", "warning")
+        return (
+            render_template(
+                "auth/login.html", form_data={"username": username, "password": ""}
+            ),
+            503,
+        )
 
 
 @auth_bp.route("/logout", methods=["POST"])
@@ -113,6 +134,9 @@ def activate_account_post(token):
     except ValueError as e:
         flash(str(e), "danger")
         return redirect(url_for("auth.activate_account_get", token=token))
+    except HashingPoolSaturated:
+        flash("The server is busy. Please try again in a moment.", "warning")
+        return redirect(url_for("auth.activate_account_get", token=token))
     except (Exception, sqlite3.Error):
         flash("An unexpected error occurred.", "danger")
         return redirect(url_for("auth.activate_account_get", token=token))
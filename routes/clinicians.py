@@ -1,9 +1,13 @@
 import sqlite3
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from bson.errors import InvalidId
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from config import Config
 from utils.time_formatter import utc_now
 from utils.decorators import login_required, clinician_required
+from utils.current_user import get_current_user
 from models.auth.auth import get_user_by_id
 from utils.services_logging import log_action
+from utils.streaming import stream_page
 from models.patients.mongo_models import (
     create_patient,
     get_patient_clinician_stats,
@@ -11,7 +15,8 @@ from models.patients.mongo_models import (
     delete_patient,
     update_patient,
     get_patient_by_id,
-    search_patient,
+    iter_patients,
+    search_patients_page,
 )
 from models.patients.helpers import validate_form_presence
 
@@ -147,7 +152,14 @@ def edit_patient_post(patient_id):
 @clinician_required
 def view_patient(patient_id):
     patient = get_patient_by_id(patient_id)
-    user = get_user_by_id(patient.get("created_by"))
+
+    # Reuse the memoized current user when they created the record
+    current_user = get_current_user()
+    creator_id = patient.get("created_by")
+    if current_user and current_user["id"] == creator_id:
+        user = current_user
+    else:
+        user = get_user_by_id(creator_id)
     patient_creator = user["full_name"] if user else "Unknown"
 
     role_name = session.get("role_name")
@@ -165,13 +177,36 @@ def view_patient(patient_id):
 @clinician_required
 def view_patients():
     search_query = request.args.get("q", "").strip()
-    patients = search_patient(search_query)
-    return render_template(
+
+    # Rows are decrypted and sent as the cursor is read
+    return stream_page(
         "clinicians/patients/list.html",
-        patients=patients,
+        patients=iter_patients(search_query),
+        search_query=search_query,
     )
 
 
+@clinician_bp.route("/patients/search", methods=["GET"])
+@login_required
+@clinician_required
+def search_patients_json():
+    # Search-as-you-type results: a page of ids, names and a few fields
+    search_query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", Config.SEARCH_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, Config.SEARCH_MAX_PAGE_SIZE))
+
+    try:
+        patients, next_cursor = search_patients_page(
+            search_query, after=request.args.get("after"), limit=limit
+        )
+    except InvalidId:
+        return jsonify({"error": "Invalid cursor."}), 400
+
+    for patient in patients:
+        patient["url"] = url_for("clinician.view_patient", patient_id=patient["id"])
+    return jsonify({"results": patients, "next": next_cursor})
+
+
 @clinician_bp.route("/patients/<string:patient_id>/delete", methods=["POST"])
 @login_required
 @clinician_required
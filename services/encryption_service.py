@@ -4,6 +4,7 @@ import re
 import hashlib
 from dotenv import load_dotenv
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from utils.instrumentation import timed_call
 
 # Load env variables
 load_dotenv()
@@ -32,6 +33,7 @@ def _derive_key_from_env(env_key_name="STROKE_APP_SECRET_KEY"):
 SECRET_KEY = _derive_key_from_env()
 
 
+@timed_call("crypto")
 def encrypt_value(value):
     """
     AES-256-GCM encrypt a string value.
@@ -49,6 +51,7 @@ def encrypt_value(value):
     }
 
 
+@timed_call("crypto")
 def decrypt_value(enc_obj):
     """
     Decrypt dict produced by encrypt_value. Returns plaintext string.
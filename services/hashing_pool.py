@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from config import Config
+from utils.instrumentation import timed
+
+
+class HashingPoolSaturated(RuntimeError):
+    """Raised when password hashing work is rejected because the pool is full."""
+
+
+class HashingPool:
+    """
+    Bounded executor for bcrypt work.
+
+    At most `workers` hashes run at once and at most `max_pending` more may
+    wait in the queue; anything beyond that is rejected immediately instead
+    of piling up behind a login burst. bcrypt releases the GIL while it
+    hashes, so other request threads keep running in the meantime.
+    """
+
+    def __init__(self, workers, max_pending, timeout):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def depth(self):
+        # Number of hashing jobs running or queued
+        return self._in_flight
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def run(self, fn, *args):
+        """
+        Run `fn(*args)` on the pool and wait for the result.
+        Raises:
+            HashingPoolSaturated: If the queue is full or the job times out.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolSaturated("Password hashing queue is full.")
+
+        with self._lock:
+            self._in_flight += 1
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+
+        # Timed on the calling thread, so queue wait counts towards bcrypt
+        with timed("bcrypt"):
+            try:
+                return future.result(timeout=self.timeout)
+            except TimeoutError:
+                raise HashingPoolSaturated("Password hashing timed out.")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    # Process-wide hashing pool, created on first use
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    Config.BCRYPT_WORKERS,
+                    Config.BCRYPT_MAX_QUEUE,
+                    Config.BCRYPT_TIMEOUT_SECONDS,
+                )
+    return _pool
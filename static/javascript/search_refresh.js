@@ -1,9 +1,169 @@
 const searchInput = document.getElementById('searchInput');
 const clearBtn = document.getElementById('clearBtn');
 
+// Wait this long after the last keystroke before searching
+const SEARCH_DEBOUNCE_MS = 250;
+
+function badge(className, text) {
+	const span = document.createElement('span');
+	span.className = `badge ${className}`;
+	span.textContent = text;
+	return span;
+}
+
+function cell(content, className) {
+	const td = document.createElement('td');
+	if (className) td.className = className;
+	if (content instanceof Node) {
+		td.appendChild(content);
+	} else {
+		td.textContent = content ?? '';
+	}
+	return td;
+}
+
+function manageLink(url) {
+	const a = document.createElement('a');
+	a.href = url;
+	a.className = 'btn btn-sm btn-outline-primary';
+	a.textContent = 'Manage';
+	return a;
+}
+
+// Row builders mirror the server-rendered rows of each list page
+const rowBuilders = {
+	patients(patient) {
+		const tr = document.createElement('tr');
+		tr.append(
+			cell(patient.first_name),
+			cell(patient.last_name),
+			cell(patient.gender),
+			cell(patient.age),
+			cell(patient.stroke ? badge('bg-danger', 'Yes') : badge('bg-success', 'No')),
+			cell(manageLink(patient.url))
+		);
+		return tr;
+	},
+	users(user) {
+		const tr = document.createElement('tr');
+
+		const link = document.createElement('a');
+		link.href = user.url;
+		link.className = 'text-decoration-none text-dark d-flex align-items-center';
+		const name = document.createElement('div');
+		name.className = 'fw-semibold';
+		name.textContent = user.full_name;
+		const username = document.createElement('small');
+		username.className = 'text-muted';
+		username.textContent = `@${user.username}`;
+		const wrapper = document.createElement('div');
+		wrapper.append(name, username);
+		link.appendChild(wrapper);
+
+		const role = user.role_name
+			? user.role_name.charAt(0).toUpperCase() + user.role_name.slice(1)
+			: 'N/A';
+
+		tr.append(
+			cell(link),
+			cell(role, 'text-muted small'),
+			cell(user.is_active ? badge('bg-success', 'Activated') : badge('bg-secondary', 'Inactive')),
+			cell(manageLink(user.url))
+		);
+		return tr;
+	},
+};
+
+function emptyRow(kind) {
+	const tr = document.createElement('tr');
+	const td = cell(kind === 'patients' ? 'No patients found' : 'No users found', 'text-center');
+	td.colSpan = 6;
+	tr.appendChild(td);
+	return tr;
+}
+
+function liveSearch() {
+	const tbody = document.getElementById('searchResults');
+	const loadMoreBtn = document.getElementById('loadMoreBtn');
+	const url = searchInput && searchInput.dataset.searchUrl;
+	const kind = searchInput && searchInput.dataset.searchKind;
+	if (!url || !tbody || !rowBuilders[kind]) return;
+
+	let timer = null;
+	let controller = null;
+	let nextCursor = null;
+
+	async function fetchPage(append) {
+		// Only the latest request may update the table
+		if (controller) controller.abort();
+		controller = new AbortController();
+
+		const params = new URLSearchParams({ q: searchInput.value.trim() });
+		if (append && nextCursor) params.set('after', nextCursor);
+
+		let data;
+		try {
+			const response = await fetch(`${url}?${params}`, {
+				headers: { Accept: 'application/json' },
+				signal: controller.signal,
+			});
+			if (!response.ok) return;
+			data = await response.json();
+		} catch (error) {
+			if (error.name !== 'AbortError') console.error(error);
+			return;
+		}
+
+		const rows = data.results.map(rowBuilders[kind]);
+		if (append) {
+			tbody.append(...rows);
+		} else {
+			tbody.replaceChildren(...(rows.length ? rows : [emptyRow(kind)]));
+		}
+
+		nextCursor = data.next;
+		if (loadMoreBtn) loadMoreBtn.classList.toggle('d-none', !nextCursor);
+
+		// The server-rendered page links no longer match the results
+		const pagination = document.getElementById('serverPagination');
+		if (pagination) pagination.classList.add('d-none');
+
+		// Keep the query in the address bar so reloads show the same results
+		const pageParams = new URLSearchParams(window.location.search);
+		pageParams.delete('after');
+		if (params.get('q')) {
+			pageParams.set('q', params.get('q'));
+		} else {
+			pageParams.delete('q');
+		}
+		const query = pageParams.toString();
+		window.history.replaceState(null, '', query ? `?${query}` : window.location.pathname);
+	}
+
+	searchInput.addEventListener('input', () => {
+		clearTimeout(timer);
+		timer = setTimeout(() => fetchPage(false), SEARCH_DEBOUNCE_MS);
+	});
+
+	searchInput.form.addEventListener('submit', (event) => {
+		event.preventDefault();
+		clearTimeout(timer);
+		fetchPage(false);
+	});
+
+	if (loadMoreBtn) loadMoreBtn.addEventListener('click', () => fetchPage(true));
+
+	return () => {
+		clearTimeout(timer);
+		fetchPage(false);
+	};
+}
+
 function searchfRefresh() {
 	if (!searchInput || !clearBtn) return;
 
+	const refreshResults = liveSearch();
+
 	function toggleClearIcon() {
 		if (searchInput.value.trim() !== '') {
 			clearBtn.style.display = 'block';
@@ -22,8 +182,12 @@ function searchfRefresh() {
 		toggleClearIcon();
 		searchInput.focus();
 
-		// Redirect to base URL to clear search
-		window.location.href = window.location.pathname;
+		if (refreshResults) {
+			refreshResults();
+		} else {
+			// Redirect to base URL to clear search
+			window.location.href = window.location.pathname;
+		}
 	});
 }
 
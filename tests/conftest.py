@@ -1,6 +1,6 @@
 import pytest
 import sqlite3
-import pytest
+from models.migrations import apply_migrations
 
 
 @pytest.fixture
@@ -13,52 +13,8 @@ def sqlite_test_db():
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
 
-    # Initialize tables
-    cur.execute(
-        """
-        CREATE TABLE roles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            description TEXT
-        );
-    """
-    )
-    
-    cur.execute(
-        """
-        CREATE TABLE users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            role_id INTEGER NOT NULL,
-            username TEXT NOT NULL UNIQUE,
-            full_name TEXT NOT NULL,
-            password_hash TEXT,
-            is_active BOOLEAN NOT NULL DEFAULT 0,
-            created_at TEXT NOT NULL,
-            updated_at TEXT,
-            FOREIGN KEY (role_id) REFERENCES roles(id)
-        );
-    """
-    )
-    
-    cur.execute(
-        """
-        CREATE UNIQUE INDEX idx_users_username_unique ON users(username);
-    """
-    )
-    
-    cur.execute(
-        """
-        CREATE TABLE activation_tokens (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            token_hash TEXT NOT NULL,
-            expires_at TEXT NOT NULL,
-            used_at TEXT,
-            created_at TEXT NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-    """
-    )
+    # Build the schema from the same migrations as the application
+    apply_migrations(conn)
 
     # Seed default role
     cur.execute(
@@ -0,0 +1,93 @@
+import pytest
+from config import Config
+from models.db_sqlite import get_db, init_sqlite_db
+from models.admin.admin_models import (
+    get_recent_users,
+    get_user_admin_stats,
+    get_users_page,
+    search_user,
+)
+from models.users.user_model import create_user, update_user
+
+
+@pytest.fixture
+def user_db(tmp_path, monkeypatch):
+    """
+    File-backed database built by init_sqlite_db, so the FTS table and its
+    triggers exist, seeded with a handful of users.
+    """
+    monkeypatch.setattr(Config, "DB_PATH", str(tmp_path / "users.db"))
+    init_sqlite_db()
+
+    conn = get_db()
+    conn.execute("INSERT INTO roles (name, description) VALUES ('clinician', '')")
+    conn.commit()
+    conn.close()
+
+    for username, full_name in [
+        ("mary_jones", "Mary Jones"),
+        ("john_smith", "John Smith"),
+        ("jo_brown", "Joanna Brown"),
+        ("peter_pan", "Peter Pan"),
+        ("anna_bell", "Anna Bell"),
+    ]:
+        create_user(username, full_name, "clinician")
+
+
+def test_users_page_keyset_pagination(user_db):
+    # Test that pages follow each other without gaps or duplicates
+    first, cursor = get_users_page(limit=2)
+    second, cursor = get_users_page(after=cursor, limit=2)
+    third, cursor = get_users_page(after=cursor, limit=2)
+
+    usernames = [u["username"] for u in first + second + third]
+    assert usernames == ["anna_bell", "peter_pan", "jo_brown", "john_smith", "mary_jones"]
+    assert cursor is None
+
+
+def test_search_user_prefix_tokens(user_db):
+    # Test that each token is prefix-matched against names and usernames
+    users, _ = search_user("jo")
+    assert {u["username"] for u in users} == {"john_smith", "jo_brown", "mary_jones"}
+
+    users, _ = search_user("Jo Sm")
+    assert [u["username"] for u in users] == ["john_smith"]
+
+
+def test_search_index_follows_updates(user_db):
+    # Test that the FTS triggers keep the index in sync with user edits
+    users, _ = search_user("peter")
+    update_user(users[0]["user_id"], {"username": "wendy", "full_name": "Wendy Darling"})
+
+    assert search_user("peter")[0] == []
+    assert [u["username"] for u in search_user("wendy")[0]] == ["wendy"]
+
+
+def test_user_admin_stats_cached_until_users_change(user_db):
+    # Test single-pass counts and invalidation from create_user
+    stats = get_user_admin_stats()
+    assert stats == {"total": 5, "active": 0, "inactive": 5}
+
+    conn = get_db()
+    conn.execute("UPDATE users SET is_active = 1 WHERE username = 'anna_bell'")
+    conn.commit()
+    conn.close()
+    assert get_user_admin_stats() == stats  # cached, no user-model write yet
+
+    create_user("new_user", "New User", "clinician")
+    assert get_user_admin_stats() == {"total": 6, "active": 1, "inactive": 5}
+
+
+def test_recent_users_cached_until_users_change(user_db):
+    # Test that the dashboard list is not queried again until a user write
+    recent = get_recent_users()
+    assert recent[0]["username"] == "anna_bell"
+
+    conn = get_db()
+    conn.execute("DELETE FROM users WHERE username = 'anna_bell'")
+    conn.commit()
+    conn.close()
+    assert get_recent_users() is recent  # cached, no user-model write yet
+
+    create_user("new_user", "New User", "clinician")
+    assert get_recent_users()[0]["username"] == "new_user"
@@ -0,0 +1,75 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from unittest.mock import MagicMock
+from models.auditor.audit_export import (
+    build_log_filter,
+    encode_chunks,
+    ensure_log_indexes,
+    serialize_csv,
+    serialize_ndjson,
+    with_usernames,
+)
+
+
+def _events():
+    return [
+        {"_id": 1, "action": "USER LOGIN", "user_id": 1, "ts": "2025-01-01T10:00:00", "details": {"action_on": 1}},
+        {"_id": 2, "action": "USER LOGIN", "user_id": 2, "ts": "2025-01-01T11:00:00", "details": {"action_on": 2}},
+        {"_id": 3, "action": "PATIENT DELETED", "user_id": 1, "ts": "2025-01-01T12:00:00", "details": {"action_on": "abc"}},
+    ]
+
+
+def test_with_usernames_batches_and_caches_lookups():
+    # Test that user ids are resolved once per batch and cached across batches
+    calls = []
+
+    def lookup(user_ids):
+        calls.append(set(user_ids))
+        return {1: "alice", 2: "bob"}
+
+    events = list(with_usernames(iter(_events()), batch_size=2, lookup=lookup))
+
+    assert [e["username"] for e in events] == ["alice", "bob", "alice"]
+    assert calls == [{1, 2}]
+
+
+def test_serialize_ndjson_one_document_per_line():
+    lines = list(serialize_ndjson(_events()))
+    assert len(lines) == 3
+    assert json.loads(lines[2])["action"] == "PATIENT DELETED"
+
+
+def test_serialize_csv_gzip_round_trip():
+    # Test that compressed CSV output decompresses to the expected rows
+    data = b"".join(encode_chunks(serialize_csv(_events()), compress=True))
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(data).decode("utf-8"))))
+
+    assert len(rows) == 3
+    assert rows[0]["action"] == "USER LOGIN"
+    assert rows[2]["action_on"] == "abc"
+
+
+def test_build_log_filter_day_range():
+    query = build_log_filter(action="USER LOGIN", user_id="4", start="2025-01-01", end="2025-01-31")
+    assert query == {
+        "action": "USER LOGIN",
+        "user_id": 4,
+        "ts": {"$gte": "2025-01-01", "$lt": "2025-02-01"},
+    }
+
+
+def test_build_log_filter_rejects_bad_dates():
+    with pytest.raises(ValueError, match="YYYY-MM-DD"):
+        build_log_filter(start="01/01/2025")
+
+
+def test_ensure_log_indexes_creates_ts_index():
+    # Test that exports are backed by an index on the timestamp they sort by
+    mock_collection = MagicMock()
+
+    ensure_log_indexes(collection=mock_collection)
+
+    mock_collection.create_index.assert_called_once_with([("ts", 1)], name="idx_logs_ts")
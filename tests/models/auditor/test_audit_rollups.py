@@ -0,0 +1,85 @@
+from unittest.mock import MagicMock
+from models.auditor.audit_rollups import (
+    backfill_rollups,
+    get_rollup_summary,
+    record_rollup,
+    record_rollups,
+)
+from utils.time_formatter import utc_now
+
+
+def test_record_rollup_upserts_hour_and_day():
+    # Test that a single event increments both the hourly and daily rollups
+    mock_collection = MagicMock()
+
+    record_rollup("USER LOGIN", 3, "2025-01-31T09:15:00+00:00", collection=mock_collection)
+
+    mock_collection.bulk_write.assert_called_once()
+    updates = mock_collection.bulk_write.call_args[0][0]
+    ids = sorted(u._filter["_id"] for u in updates)
+
+    assert ids == ["day|2025-01-31|USER LOGIN|3", "hour|2025-01-31T09|USER LOGIN|3"]
+    assert all(u._doc["$inc"] == {"count": 1} for u in updates)
+
+
+def test_get_rollup_summary_aggregates_daily_rollups():
+    # Test that the summary is built from rollup documents only
+    today = utc_now()[:10]
+    hour = utc_now()[:13]
+    day_docs = [
+        {"period": today, "action": "USER LOGIN", "user_id": 1, "count": 4},
+        {"period": today, "action": "PATIENT DELETED", "user_id": 2, "count": 2},
+        {"period": today, "action": "USER LOGIN", "user_id": 2, "count": 1},
+    ]
+    hour_docs = [{"period": hour, "action": "USER LOGIN", "user_id": 1, "count": 4}]
+
+    mock_collection = MagicMock()
+    mock_collection.find.side_effect = [day_docs, hour_docs]
+
+    summary = get_rollup_summary(days=7, collection=mock_collection)
+
+    assert summary["total"] == 7
+    assert summary["action_totals"][0] == ("USER LOGIN", 5)
+    assert summary["user_actions"][2] == {"PATIENT DELETED": 2, "USER LOGIN": 1}
+    assert summary["daily"] == [(today, {"USER LOGIN": 5, "PATIENT DELETED": 2})]
+    assert summary["hourly"] == [(hour, 4)]
+
+
+def test_record_rollups_counts_a_batch_in_one_write():
+    # Test that a batch of events in the same hour is one bulk write with summed counts
+    mock_collection = MagicMock()
+    ts = "2025-01-31T09:15:00+00:00"
+    events = [{"action": "INVITE_USER", "user_id": 1, "ts": ts} for _ in range(3)]
+
+    record_rollups(events, collection=mock_collection)
+
+    mock_collection.bulk_write.assert_called_once()
+    updates = mock_collection.bulk_write.call_args[0][0]
+    assert len(updates) == 2
+    assert all(u._doc["$inc"] == {"count": 3} for u in updates)
+
+
+def test_backfill_rollups_rebuilds_into_staging_then_swaps():
+    # Test that the live rollups are only replaced once the rebuild is complete
+    ts = "2025-01-31T09:15:00+00:00"
+    mock_logs = MagicMock()
+    mock_logs.find.return_value.batch_size.side_effect = [
+        [{"action": "USER LOGIN", "user_id": 1, "ts": ts}] * 2,
+        [{"action": "USER LOGIN", "user_id": 1, "ts": ts}],
+    ]
+    mock_collection = MagicMock()
+    mock_collection.name = "log_rollups"
+    mock_staging = MagicMock()
+
+    total = backfill_rollups(logs=mock_logs, collection=mock_collection, staging=mock_staging)
+
+    assert total == 3
+    mock_collection.delete_many.assert_not_called()
+    mock_staging.drop.assert_called_once()
+    mock_staging.rename.assert_called_once_with("log_rollups", dropTarget=True)
+
+    # The full replay goes to staging, the catch-up after the swap to the live collection
+    rebuild_query, catch_up_query = (c.args[0] for c in mock_logs.find.call_args_list)
+    assert catch_up_query["ts"]["$gte"] == rebuild_query["ts"]["$lt"]
+    assert mock_staging.bulk_write.call_args[0][0][0]._doc["$inc"] == {"count": 2}
+    assert mock_collection.bulk_write.call_args[0][0][0]._doc["$inc"] == {"count": 1}
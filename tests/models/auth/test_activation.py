@@ -1,5 +1,5 @@
 from models.users.user_model import create_user
-from models.auth.activation import update_user_activation
+from models.auth.activation import update_user_activation, purge_stale_activation_tokens
 
 
 def test_update_user_activation(sqlite_test_db):
@@ -17,3 +17,30 @@ def test_update_user_activation(sqlite_test_db):
 
     assert user is not None
     assert user["is_active"] == 1
+
+
+def test_purge_stale_activation_tokens(sqlite_test_db):
+    # Test that expired and used tokens are purged in batches and valid ones kept
+    cur = sqlite_test_db.cursor()
+    user_id = create_user("janedoe", "Jane Doe", "admin", db=sqlite_test_db)
+
+    tokens = [
+        ("expired", "2000-01-01T00:00:00+00:00", None),
+        ("used", "2999-01-01T00:00:00+00:00", "2024-01-01T00:00:00+00:00"),
+        ("valid", "2999-01-01T00:00:00+00:00", None),
+    ]
+    for token_hash, expires_at, used_at in tokens:
+        cur.execute(
+            """
+            INSERT INTO activation_tokens (user_id, token_hash, expires_at, used_at, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (user_id, token_hash, expires_at, used_at, "2024-01-01T00:00:00+00:00"),
+        )
+    sqlite_test_db.commit()
+
+    deleted = purge_stale_activation_tokens(batch_size=1, pause=0, db=sqlite_test_db)
+
+    cur.execute("SELECT token_hash FROM activation_tokens")
+    assert deleted == 2
+    assert [row["token_hash"] for row in cur.fetchall()] == ["valid"]
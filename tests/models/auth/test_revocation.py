@@ -0,0 +1,75 @@
+import pytest
+from config import Config
+from models.db_sqlite import get_db, init_sqlite_db
+from models.auth.revocation import get_auth_epoch, is_session_current, reset_auth_epochs
+from models.users.user_model import create_user, delete_user_service, update_user
+
+
+@pytest.fixture
+def epoch_db(tmp_path, monkeypatch):
+    # File-backed database with one clinician and a fresh epoch map
+    monkeypatch.setattr(Config, "DB_PATH", str(tmp_path / "epochs.db"))
+    init_sqlite_db()
+
+    conn = get_db()
+    conn.execute("INSERT INTO roles (name, description) VALUES ('clinician', '')")
+    conn.commit()
+    conn.close()
+
+    reset_auth_epochs()
+    yield create_user("jane_doe", "Jane Doe", "clinician")
+    reset_auth_epochs()
+
+
+def test_session_current_until_user_is_edited(epoch_db):
+    # Test that editing a user invalidates sessions issued before the edit
+    user_id = epoch_db
+    assert is_session_current(user_id, None)
+
+    update_user(user_id, {"username": "jane_d", "full_name": "Jane D"})
+
+    assert not is_session_current(user_id, 0)
+    assert is_session_current(user_id, get_auth_epoch(user_id))
+
+
+def test_deleted_user_is_revoked_immediately(epoch_db):
+    # Test that deleting a user revokes it in this process without a reload
+    user_id = epoch_db
+    assert is_session_current(user_id, 0)
+
+    delete_user_service(user_id)
+    assert not is_session_current(user_id, 0)
+
+
+def test_other_workers_catch_up_after_refresh(epoch_db):
+    # Test that a change made elsewhere is seen once the map is reloaded
+    user_id = epoch_db
+    assert is_session_current(user_id, 0)
+
+    conn = get_db()
+    conn.execute("UPDATE users SET auth_epoch = auth_epoch + 1 WHERE id = ?", (user_id,))
+    conn.commit()
+    conn.close()
+
+    # Within the refresh window the cached epoch is still used
+    assert is_session_current(user_id, 0)
+
+    # Expiring the refresh window reloads the map from the database
+    reset_auth_epochs()
+    assert not is_session_current(user_id, 0)
+
+
+def test_newer_session_epoch_is_checked_against_the_database(epoch_db):
+    # Test that a session issued after a change made in another worker stays current
+    user_id = epoch_db
+    assert is_session_current(user_id, 0)
+
+    conn = get_db()
+    conn.execute("UPDATE users SET auth_epoch = auth_epoch + 1 WHERE id = ?", (user_id,))
+    conn.commit()
+    conn.close()
+
+    # The map still holds epoch 0, but the session carries the new epoch 1
+    assert is_session_current(user_id, 1)
+    assert not is_session_current(user_id, 0)
+    assert not is_session_current(user_id, 2)
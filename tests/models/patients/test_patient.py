@@ -1,8 +1,9 @@
 from unittest.mock import MagicMock
 from bson import ObjectId
-from models.patients.mongo_models import create_patient
+from models.patients.mongo_models import create_patient, iter_patients, search_patients_page
 from models.patients.helpers import dob_to_age
 from services.decrypt_doc import decrypt_patient_doc
+from services.encryption_service import encrypt_value
 
 
 def test_create_patient_with_mock():
@@ -54,3 +55,39 @@ def test_create_patient_with_mock():
     decrypted_doc = decrypt_patient_doc(inserted_doc)
     assert decrypted_doc["stroke"] == 0
 
+
+def test_search_patients_page_escapes_query_and_pages():
+    """Test search_patients_page matches literally and returns a next cursor."""
+    docs = [
+        {"_id": ObjectId(), "first_name": "Al.ce", "stroke": encrypt_value("1")}
+        for _ in range(3)
+    ]
+    mock_collection = MagicMock()
+    mock_collection.find.return_value.sort.return_value.limit.return_value = docs
+
+    patients, next_cursor = search_patients_page("al.", limit=2, collection=mock_collection)
+
+    query = mock_collection.find.call_args[0][0]
+    assert query["$or"][0]["first_name"]["$regex"] == r"al\."
+    mock_collection.find.return_value.sort.return_value.limit.assert_called_once_with(3)
+
+    assert [p["id"] for p in patients] == [str(d["_id"]) for d in docs[:2]]
+    assert patients[0]["stroke"] == 1
+    assert next_cursor == patients[-1]["id"]
+
+
+def test_patient_list_and_search_share_filter_and_order():
+    """Test the streamed list queries like the JSON search it is replaced by."""
+    mock_collection = MagicMock()
+    mock_collection.find.return_value.sort.return_value.batch_size.return_value = []
+    mock_collection.find.return_value.sort.return_value.limit.return_value = []
+
+    list(iter_patients("al.", collection=mock_collection))
+    search_patients_page("al.", collection=mock_collection)
+
+    list_call, search_call = mock_collection.find.call_args_list
+    assert list_call.args[0] == search_call.args[0]
+    assert mock_collection.find.return_value.sort.call_args_list == [
+        (("_id", -1),),
+        (("_id", -1),),
+    ]
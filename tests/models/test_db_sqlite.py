@@ -0,0 +1,72 @@
+import pytest
+from flask import Flask
+from config import Config
+from models import db_sqlite
+from models.db_sqlite import get_db, get_pool
+
+
+def _app():
+    app = Flask(__name__)
+    db_sqlite.init_app(app)
+    return app
+
+
+def test_get_db_reuses_connection_within_app_context(tmp_path, monkeypatch):
+    # Test that every get_db() call in one request returns the same connection
+    monkeypatch.setattr(Config, "DB_PATH", str(tmp_path / "reuse.db"))
+    app = _app()
+
+    with app.app_context():
+        conn = get_db()
+        conn.close()  # model functions close eagerly; this must be a no-op
+        assert get_db() is conn
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+
+    # After teardown the connection is back in the pool
+    assert get_db() is conn
+
+
+def test_close_rolls_back_uncommitted_work(tmp_path, monkeypatch):
+    # Test that closing a pooled connection discards an open transaction
+    monkeypatch.setattr(Config, "DB_PATH", str(tmp_path / "rollback.db"))
+
+    conn = get_db()
+    conn.execute("CREATE TABLE t (id INTEGER)")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+
+    conn = get_db()
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    conn.close()
+
+
+def test_pool_is_bounded(tmp_path, monkeypatch):
+    # Test that connections beyond the pool size are closed on release
+    monkeypatch.setattr(Config, "DB_PATH", str(tmp_path / "bounded.db"))
+    monkeypatch.setattr(Config, "SQLITE_POOL_SIZE", 2)
+
+    conns = [get_db() for _ in range(3)]
+    for conn in conns:
+        conn.close()
+
+    assert get_pool()._idle.qsize() == 2
+
+
+def test_connections_are_tuned_from_config(tmp_path, monkeypatch):
+    # Test that new connections get WAL, the busy timeout and foreign keys
+    monkeypatch.setattr(Config, "DB_PATH", str(tmp_path / "tuned.db"))
+    monkeypatch.setattr(Config, "SQLITE_BUSY_TIMEOUT_MS", 1234)
+
+    conn = get_db()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    conn.close()
+
+
+def test_apply_pragmas_rejects_unsafe_values(tmp_path):
+    conn = db_sqlite._connect(str(tmp_path / "unsafe.db"), pragmas={})
+    with pytest.raises(ValueError):
+        db_sqlite.apply_pragmas(conn, {"synchronous": "OFF; DROP TABLE users"})
+    conn.close_physical()
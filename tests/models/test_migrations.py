@@ -0,0 +1,56 @@
+import sqlite3
+import pytest
+from models import migrations
+from models.migrations import Migration, apply_migrations, get_schema_version, LATEST_VERSION
+
+
+def _memory_db():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _objects(conn):
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")
+    return {row["name"] for row in rows}
+
+
+def test_fresh_database_migrates_to_latest():
+    # Test that an empty database gets every migration and the latest version
+    conn = _memory_db()
+    applied = apply_migrations(conn)
+
+    assert applied == [m.name for m in migrations.MIGRATIONS]
+    assert get_schema_version(conn) == LATEST_VERSION
+    assert {"users", "roles", "activation_tokens", "idx_activation_tokens_token_hash"} <= _objects(conn)
+
+    # Re-running is a no-op
+    assert apply_migrations(conn) == []
+
+
+def test_unversioned_database_adopts_migrations():
+    # Test that a pre-versioning database (tables, user_version 0) upgrades cleanly
+    conn = _memory_db()
+    apply_migrations(conn, target=1)
+    conn.execute("PRAGMA user_version = 0")
+
+    assert apply_migrations(conn)[0] == "initial_schema"
+    assert get_schema_version(conn) == LATEST_VERSION
+
+
+def test_failed_migration_rolls_back(monkeypatch):
+    # Test that a failing migration leaves neither its changes nor a version bump
+    conn = _memory_db()
+    broken = Migration(
+        LATEST_VERSION + 1,
+        "broken",
+        ["CREATE TABLE half_done (id INTEGER)", "THIS IS NOT SQL"],
+        False,
+    )
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [broken])
+
+    with pytest.raises(sqlite3.OperationalError):
+        apply_migrations(conn, target=broken.version)
+
+    assert get_schema_version(conn) == LATEST_VERSION
+    assert "half_done" not in _objects(conn)
@@ -0,0 +1,84 @@
+import pytest
+from models.users.bulk_provisioning import (
+    parse_users_csv,
+    provision_users,
+    validate_bulk_users,
+)
+from models.users.user_model import create_user
+
+CSV = """username,full_name,role_name
+jane_doe,Jane Doe,clinician
+
+john_roe,john roe,clinician
+"""
+
+
+@pytest.fixture
+def bulk_db(sqlite_test_db):
+    # Test database with a clinician role and one existing user
+    sqlite_test_db.execute("INSERT INTO roles (name, description) VALUES ('clinician', '')")
+    sqlite_test_db.commit()
+    create_user("taken_name", "Taken Name", "clinician", db=sqlite_test_db)
+    return sqlite_test_db
+
+
+def test_parse_users_csv_skips_blank_lines():
+    # Test that rows keep their CSV line numbers and blank lines are ignored
+    rows = parse_users_csv(CSV)
+    assert [(line, values["username"]) for line, values in rows] == [
+        (2, "jane_doe"),
+        (4, "john_roe"),
+    ]
+
+
+def test_parse_users_csv_requires_columns():
+    # Test that a CSV without the expected header is rejected
+    with pytest.raises(ValueError) as exc:
+        parse_users_csv("username,full_name\njane_doe,Jane Doe\n")
+    assert "role_name" in str(exc.value)
+
+
+def test_validate_bulk_users_reports_every_bad_row(bulk_db):
+    # Test that all problems are reported in one pass with their lines
+    rows = parse_users_csv(
+        "username,full_name,role_name\n"
+        "taken_name,Some One,clinician\n"
+        "new_user,New User,nurse\n"
+        "dup_user,Dup User,clinician\n"
+        "dup_user,Dup Again,clinician\n"
+        "x,Short Name,clinician\n"
+    )
+    errors = validate_bulk_users(rows, db=bulk_db)
+
+    assert errors == [
+        "Line 2: A user with this username already exists.",
+        "Line 3: Invalid role selected.",
+        "Line 5: Username appears more than once in the file.",
+        "Line 6: Username is invalid. Use 3-20 characters: letters, numbers, underscores.",
+    ]
+
+
+def test_provision_users_creates_users_and_tokens(bulk_db):
+    # Test that users and their activation tokens are created together
+    rows = parse_users_csv(CSV)
+    assert validate_bulk_users(rows, db=bulk_db) == []
+
+    users = provision_users(rows, db=bulk_db)
+
+    assert [u["full_name"] for u in users] == ["Jane Doe", "John Roe"]
+    assert all(u["token"] for u in users)
+    count = bulk_db.execute(
+        "SELECT COUNT(*) FROM activation_tokens WHERE used_at IS NULL"
+    ).fetchone()[0]
+    assert count == 2
+
+
+def test_provision_users_is_all_or_nothing(bulk_db):
+    # Test that a conflicting username rolls back the whole import
+    rows = parse_users_csv(CSV + "taken_name,Taken Again,clinician\n")
+
+    with pytest.raises(ValueError):
+        provision_users(rows, db=bulk_db)
+
+    assert bulk_db.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
+    assert bulk_db.execute("SELECT COUNT(*) FROM activation_tokens").fetchone()[0] == 0
@@ -0,0 +1,60 @@
+import pytest
+from config import Config
+from models.db_sqlite import get_db, init_sqlite_db
+from models.users import role_registry
+from models.users.role_registry import get_role_id, get_role_name, get_roles, invalidate_roles
+
+
+@pytest.fixture
+def roles_db(tmp_path, monkeypatch):
+    # File-backed database with the admin and clinician roles
+    monkeypatch.setattr(Config, "DB_PATH", str(tmp_path / "roles.db"))
+    init_sqlite_db()
+
+    conn = get_db()
+    conn.execute("INSERT INTO roles (name, description) VALUES ('admin', ''), ('clinician', '')")
+    conn.commit()
+    conn.close()
+
+
+def _add_role(name):
+    conn = get_db()
+    conn.execute("INSERT INTO roles (name, description) VALUES (?, '')", (name,))
+    conn.commit()
+    conn.close()
+
+
+def test_roles_are_loaded_once(roles_db, monkeypatch):
+    # Test that repeated lookups are served from the registry
+    calls = []
+    read_roles = role_registry._read_roles
+    monkeypatch.setattr(role_registry, "_read_roles", lambda: calls.append(1) or read_roles())
+
+    assert get_role_id("clinician") == 2
+    assert get_role_name(1) == "admin"
+    assert get_roles() == {"admin": 1, "clinician": 2}
+    assert len(calls) == 1
+
+
+def test_invalidate_roles_reloads(roles_db):
+    # Test that bumping the roles generation picks up a new role
+    get_roles()
+    _add_role("auditor")
+    assert "auditor" not in get_roles()
+
+    invalidate_roles()
+    assert get_roles()["auditor"] == 3
+
+
+def test_unknown_role_reloads_once(roles_db):
+    # Test that a role added by another process is found on a cache miss
+    get_roles()
+    _add_role("auditor")
+
+    assert get_role_id("auditor") == 3
+    assert get_role_id("nurse") is None
+
+
+def test_db_override_reads_connection(sqlite_test_db):
+    # Test that an explicit connection bypasses the registry
+    assert get_roles(db=sqlite_test_db) == {"admin": 1}
@@ -0,0 +1,37 @@
+import pytest
+from config import Config
+from models import db_sqlite
+from models.auth.auth import hash_password
+from utils.time_formatter import utc_now
+
+
+@pytest.fixture(scope="session", autouse=True)
+def routes_db(tmp_path_factory):
+    """
+    Point the app at a fresh SQLite file with the roles and an admin user
+    (id 1), since importing the app no longer runs the bootstrap.
+    """
+    db_path = str(tmp_path_factory.mktemp("routes") / "routes.db")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Config, "DB_PATH", db_path)
+        db_sqlite.init_sqlite_db()
+
+        conn = db_sqlite.get_pool().acquire()
+        for name in ("admin", "clinician", "auditor"):
+            conn.execute(
+                "INSERT INTO roles (name, description) VALUES (?, ?)", (name, name)
+            )
+        conn.execute(
+            """
+            INSERT INTO users (id, username, full_name, password_hash, role_id, is_active, created_at)
+            VALUES (1, 'adminUser', 'System Admin', ?, 1, 1, ?)
+            """,
+            (hash_password("Adminpassword123@"), utc_now()),
+        )
+        conn.commit()
+        conn.close()
+
+        yield db_path
+
+        db_sqlite.get_pool(db_path).close_all()
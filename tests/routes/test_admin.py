@@ -13,11 +13,11 @@ class FlaskTemplateRoutesTests(unittest.TestCase):
     def test_dashboard_route(self):
         # Test GET /admin/dashboard renders the dashboard template.
         with patch(
-            "models.patients.mongo_models.get_patient_admin_stats"
+            "routes.admin.get_patient_admin_stats"
         ) as mock_patient_stats, patch(
-            "models.admin.admin_models.get_user_admin_stats"
+            "routes.admin.get_user_admin_stats"
         ) as mock_user_stats, patch(
-            "models.admin.admin_models.get_all_users"
+            "routes.admin.get_recent_users"
         ) as mock_get_users:
 
             with self.client.session_transaction() as sess:
@@ -26,7 +26,9 @@ class FlaskTemplateRoutesTests(unittest.TestCase):
 
             mock_patient_stats.return_value = {"total": 5}
             mock_user_stats.return_value = {"total_users": 3}
-            mock_get_users.return_value = [{"id": 1, "username": "admin"}]
+            mock_get_users.return_value = [
+                {"user_id": 1, "full_name": "Admin", "role_name": "admin", "is_active": 1}
+            ]
 
             response = self.client.get("/admin/dashboard")
             self.assertEqual(response.status_code, 200)
@@ -41,3 +43,17 @@ class FlaskTemplateRoutesTests(unittest.TestCase):
         response = self.client.get("/admin/users/create")
         self.assertEqual(response.status_code, 200)
         self.assertIn(b"create", response.data)
+
+    def test_search_users_json_route(self):
+        # Test GET /admin/users/search returns matching users as JSON.
+        with self.client.session_transaction() as sess:
+            sess["user_id"] = 1
+            sess["role_name"] = "admin"
+
+        response = self.client.get("/admin/users/search?q=adminuser&limit=5")
+        self.assertEqual(response.status_code, 200)
+
+        data = response.get_json()
+        self.assertEqual(data["results"][0]["username"], "adminUser")
+        self.assertEqual(data["results"][0]["url"], "/admin/users/1")
+        self.assertIsNone(data["next"])
@@ -0,0 +1,44 @@
+import threading
+import pytest
+from config import Config
+from models.auth.auth import hash_password, password_needs_rehash, verify_password
+from services.hashing_pool import HashingPool, HashingPoolSaturated
+
+
+def test_pool_rejects_work_when_saturated():
+    # Test that work beyond workers + queue depth is rejected immediately
+    pool = HashingPool(workers=1, max_pending=0, timeout=5)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait()
+        return "done"
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(pool.run(blocking)))
+    worker.start()
+    started.wait()
+
+    assert pool.depth == 1
+    with pytest.raises(HashingPoolSaturated):
+        pool.run(lambda: "rejected")
+
+    release.set()
+    worker.join()
+    assert results == ["done"]
+    assert pool.run(lambda: "accepted") == "accepted"
+
+
+def test_hash_and_verify_use_configured_work_factor(monkeypatch):
+    # Test that hashes carry the configured cost and are flagged for rehash when it changes
+    monkeypatch.setattr(Config, "BCRYPT_ROUNDS", 4)
+    password_hash = hash_password("StrongP@ssw0rd1")
+
+    assert password_hash.startswith("$2b$04$")
+    assert verify_password("StrongP@ssw0rd1", password_hash)
+    assert not password_needs_rehash(password_hash)
+
+    monkeypatch.setattr(Config, "BCRYPT_ROUNDS", 5)
+    assert password_needs_rehash(password_hash)
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous ceiling for importing the app in a fresh interpreter; the
+# bootstrap and seed used to run here and took several seconds
+IMPORT_BUDGET_SECONDS = 3.0
+
+# Modules that must only be imported when they are actually used
+LAZY_MODULES = ("faker", "pymongo", "models.patients.import_stroke_data")
+
+
+def test_app_import_is_fast_and_lazy(tmp_path):
+    script = textwrap.dedent(
+        f"""
+        import json, sys, time
+        start = time.perf_counter()
+        import app
+        elapsed = time.perf_counter() - start
+        print(json.dumps({{
+            "elapsed": elapsed,
+            "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+        }}))
+        """
+    )
+    # Config.BASE_DIR is the working directory, so the SQLite file lands in tmp_path
+    env = dict(os.environ, PYTHONPATH=ROOT)
+
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report["loaded"] == []
+    assert report["elapsed"] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,154 @@
+import gzip
+from flask import Flask, Response, flash, render_template_string
+from config import Config
+from utils import assets
+from utils.assets import build_assets
+
+
+def _write_static(tmp_path):
+    static_dir = tmp_path / "static"
+    (static_dir / "css").mkdir(parents=True, exist_ok=True)
+    (static_dir / "css" / "style.css").write_text("body { color: red; }\n" * 50)
+    (static_dir / "notes.txt").write_text("not an asset")
+    return static_dir
+
+
+def _app(tmp_path, monkeypatch):
+    static_dir = _write_static(tmp_path)
+    monkeypatch.setattr(Config, "ASSETS_BUILD_DIR", str(tmp_path / "build"))
+
+    app = Flask(__name__, static_folder=str(static_dir))
+    assets.init_app(app)
+
+    @app.route("/page")
+    def page():
+        return render_template_string("<p>{{ text }}</p>", text="x" * Config.HTML_COMPRESS_MIN_BYTES)
+
+    @app.route("/small")
+    def small():
+        return "<p>small</p>"
+
+    @app.route("/streamed")
+    def streamed():
+        return Response((f"<p>{i}</p>" for i in range(3)), mimetype="text/html")
+
+    return app
+
+
+def test_build_assets_hashes_and_precompresses(tmp_path):
+    # Test that only CSS/JS are built, under content-hashed names with a gzip variant
+    static_dir = tmp_path / "static"
+    static_dir.mkdir()
+    (static_dir / "app.js").write_text("console.log(1);")
+    (static_dir / "readme.txt").write_text("skip")
+
+    manifest = build_assets(str(static_dir), str(tmp_path / "build"))
+
+    assert list(manifest) == ["app.js"]
+    hashed = manifest["app.js"]
+    assert hashed.startswith("app.") and hashed.endswith(".js") and hashed != "app.js"
+    assert gzip.decompress((tmp_path / "build" / f"{hashed}.gz").read_bytes()) == b"console.log(1);"
+
+    (static_dir / "app.js").write_text("console.log(2);")
+    assert build_assets(str(static_dir), str(tmp_path / "build"))["app.js"] != hashed
+
+
+def test_prebuilt_manifest_is_used_when_build_fails(tmp_path, monkeypatch):
+    # Test that a deploy prepared with build-assets keeps hashed URLs if building fails
+    build_assets(str(_write_static(tmp_path)), str(tmp_path / "build"))
+    prebuilt = assets.read_manifest(str(tmp_path / "build"))
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(assets, "build_assets", read_only)
+    app = _app(tmp_path, monkeypatch)
+
+    with app.test_request_context():
+        url = render_template_string("{{ asset_url('css/style.css') }}")
+    assert url == f"/assets/{prebuilt['css/style.css']}"
+    assert app.test_client().get(url).status_code == 200
+
+
+def test_hashed_assets_are_served_compressed_and_immutable(tmp_path, monkeypatch):
+    # Test that asset_url points at the hashed file and it is served with long-lived headers
+    app = _app(tmp_path, monkeypatch)
+    client = app.test_client()
+
+    with app.test_request_context():
+        url = render_template_string("{{ asset_url('css/style.css') }}")
+        assert render_template_string("{{ asset_url('missing.css') }}") == "/static/missing.css"
+    assert url.startswith("/assets/css/style.") and url != "/assets/css/style.css"
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert gzip.decompress(response.data).startswith(b"body { color: red; }")
+
+    plain = client.get(url)
+    assert "Content-Encoding" not in plain.headers
+    assert plain.data.startswith(b"body")
+
+    assert client.get("/assets/css/style.css").status_code == 404
+
+
+def test_html_is_gzipped_above_threshold(tmp_path, monkeypatch):
+    # Test that large and streamed HTML is compressed and small HTML is not
+    client = _app(tmp_path, monkeypatch).test_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    large = client.get("/page", headers=headers)
+    assert large.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(large.data).startswith(b"<p>xxx")
+    assert "Accept-Encoding" in large.headers["Vary"]
+
+    assert "Content-Encoding" not in client.get("/small", headers=headers).headers
+    assert "Content-Encoding" not in client.get("/page").headers
+
+    streamed = client.get("/streamed", headers=headers)
+    assert gzip.decompress(streamed.data) == b"<p>0</p><p>1</p><p>2</p>"
+
+
+def test_html_reflecting_request_input_is_not_compressed(tmp_path, monkeypatch):
+    # Test that pages requested with query or form values are sent uncompressed (BREACH)
+    app = _app(tmp_path, monkeypatch)
+
+    @app.route("/search", methods=["GET", "POST"])
+    def search():
+        return "<p>" + "x" * Config.HTML_COMPRESS_MIN_BYTES + "</p>"
+
+    client = app.test_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    assert client.get("/search", headers=headers).headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in client.get("/search?q=jo", headers=headers).headers
+    assert "Content-Encoding" not in client.post("/search", data={"q": "jo"}, headers=headers).headers
+
+
+def test_html_with_url_values_or_flashes_is_not_compressed(tmp_path, monkeypatch):
+    # Test that pages with URL values or flashed messages are sent uncompressed (BREACH)
+    app = _app(tmp_path, monkeypatch)
+    app.config["SECRET_KEY"] = "test"
+    body = "<p>" + "x" * Config.HTML_COMPRESS_MIN_BYTES + "</p>"
+
+    @app.route("/activate/<token>")
+    def activate(token):
+        return body
+
+    @app.route("/fail")
+    def fail():
+        flash("Unknown error occurred! jo")
+        return body
+
+    @app.route("/shown")
+    def shown():
+        return render_template_string("{{ get_flashed_messages() }}") + body
+
+    client = app.test_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    assert "Content-Encoding" not in client.get("/activate/abc", headers=headers).headers
+    assert "Content-Encoding" not in client.get("/fail", headers=headers).headers
+    assert "Content-Encoding" not in client.get("/shown", headers=headers).headers
+    assert client.get("/shown", headers=headers).headers["Content-Encoding"] == "gzip"
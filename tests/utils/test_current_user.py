@@ -0,0 +1,31 @@
+from unittest.mock import patch
+from flask import Flask, session
+from utils.current_user import get_current_user
+
+
+def test_current_user_resolved_once_per_request():
+    # Test that repeated lookups in one request hit SQLite only once
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test"
+
+    with patch("utils.current_user.get_user_by_id") as mock_get_user:
+        mock_get_user.return_value = {"id": 7, "username": "mary"}
+
+        with app.test_request_context("/"):
+            session["user_id"] = 7
+            assert get_current_user()["username"] == "mary"
+            assert get_current_user()["username"] == "mary"
+
+        with app.test_request_context("/"):
+            session["user_id"] = 7
+            get_current_user()
+
+    assert mock_get_user.call_count == 2
+
+
+def test_current_user_none_when_logged_out():
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test"
+
+    with app.test_request_context("/"):
+        assert get_current_user() is None
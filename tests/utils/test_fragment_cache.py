@@ -0,0 +1,76 @@
+import pytest
+from flask import Flask, render_template_string
+from utils import fragment_cache
+from utils.cache import bump_generation
+from utils.fragment_cache import FragmentCache, invalidate_fragments
+
+TEMPLATE = '{% cache "counter", "fragment_test", key %}{{ render() }}{% endcache %}'
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    fragment_cache.init_app(app)
+    invalidate_fragments()
+    yield app
+    invalidate_fragments()
+
+
+def _renderer():
+    calls = []
+
+    def render():
+        calls.append(1)
+        return f"render {len(calls)}"
+
+    return render, calls
+
+
+def test_fragment_is_reused_until_generation_bump(app):
+    # Test that the body only renders again after its generation changes
+    render, calls = _renderer()
+    with app.app_context():
+        first = render_template_string(TEMPLATE, render=render, key="a")
+        second = render_template_string(TEMPLATE, render=render, key="a")
+        bump_generation("fragment_test")
+        third = render_template_string(TEMPLATE, render=render, key="a")
+
+    assert first == second == "render 1"
+    assert third == "render 2"
+    assert len(calls) == 2
+
+
+def test_fragment_varies_on_extra_arguments(app):
+    # Test that different vary values are cached separately
+    render, calls = _renderer()
+    with app.app_context():
+        render_template_string(TEMPLATE, render=render, key="a")
+        render_template_string(TEMPLATE, render=render, key="b")
+        render_template_string(TEMPLATE, render=render, key="b")
+
+    assert len(calls) == 2
+
+
+def test_fragments_with_csrf_tokens_are_not_cached(app):
+    # Test that per-session form content is rendered every time
+    template = '{% cache "form", "fragment_test" %}<input name="csrf_token" value="{{ render() }}">{% endcache %}'
+    render, calls = _renderer()
+    with app.app_context():
+        render_template_string(template, render=render)
+        render_template_string(template, render=render)
+
+    assert len(calls) == 2
+
+
+def test_fragment_cache_is_bounded():
+    # Test that the oldest fragments are evicted by count and by size
+    cache = FragmentCache(max_entries=2, max_bytes=10, ttl=60)
+    cache.set(("a",), "1234")
+    cache.set(("b",), "1234")
+    cache.set(("c",), "1234")
+    assert cache.get(("a",)) is None
+    assert len(cache) == 2
+
+    cache.set(("d",), "12345678")
+    assert cache.get(("c",)) is None
+    assert cache.get(("d",)) == "12345678"
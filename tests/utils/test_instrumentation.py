@@ -0,0 +1,67 @@
+import sqlite3
+from flask import Flask, render_template_string
+from pymongo import MongoClient
+from models.db_sqlite import PooledConnection
+from utils import instrumentation
+from utils.instrumentation import current_timings, record, timed
+from utils.mongo_listeners import MongoTimingListener
+
+
+def _app():
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test"
+    instrumentation.init_app(app)
+
+    @app.route("/work")
+    def work():
+        conn = sqlite3.connect(":memory:", factory=PooledConnection)
+        conn.execute("SELECT 1").fetchall()
+        conn.close_physical()
+
+        with timed("crypto"):
+            pass
+        MongoTimingListener().succeeded(
+            type("Event", (), {"duration_micros": 1500, "command_name": "find"})()
+        )
+        return render_template_string("{{ value }}", value=current_timings())
+
+    return app
+
+
+def test_server_timing_header_lists_subsystems():
+    # Test that an admin request reports the time spent per subsystem
+    client = _app().test_client()
+    with client.session_transaction() as sess:
+        sess["role_name"] = "admin"
+    response = client.get("/work")
+    header = response.headers["Server-Timing"]
+
+    assert 'sqlite;dur=' in header and '"1 calls"' in header
+    assert "mongo;dur=1.50" in header
+    assert "crypto;dur=" in header
+    assert "template;dur=" in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+
+
+def test_server_timing_header_is_not_sent_to_other_sessions():
+    # Test that anonymous and non-admin clients cannot see internal timings
+    client = _app().test_client()
+    assert "Server-Timing" not in client.get("/work").headers
+
+    with client.session_transaction() as sess:
+        sess["role_name"] = "clinician"
+    assert "Server-Timing" not in client.get("/work").headers
+
+
+def test_record_outside_request_is_noop():
+    # Test that instrumented code can run outside a request
+    record("sqlite", 1.0)
+    assert current_timings() == {}
+
+
+def test_mongo_timing_listener_is_accepted_by_pymongo():
+    # Test that pymongo accepts the listener when building a client
+    client = MongoClient(
+        "mongodb://localhost:1", connect=False, event_listeners=[MongoTimingListener()]
+    )
+    client.close()
@@ -0,0 +1,113 @@
+import json
+import sqlite3
+import threading
+from flask import Flask
+from config import Config
+from models.db_sqlite import PooledConnection
+from utils import metrics
+from utils.metrics import Counter, Histogram, merge_snapshots, render_prometheus
+
+
+def test_histogram_adds_up_thread_shards():
+    # Test that observations from many threads are all counted
+    histogram = Histogram("test_latency_seconds", "Test.", ["endpoint"], buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            histogram.observe(0.05, "a")
+            histogram.observe(5.0, "a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    totals = histogram.collect()[("a",)]
+    assert totals[:3] == [4000, 0, 4000]
+    assert round(totals[-1]) == 4000 * 5.05
+
+
+def test_render_prometheus_cumulative_buckets():
+    # Test the text exposition of a histogram and a counter
+    histogram = Histogram("test_render_seconds", "Render test.", buckets=(0.1, 1.0))
+    counter = Counter("test_render_total", "Render test.", ["cache", "result"])
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    counter.inc("users", "hit", amount=3)
+
+    text = render_prometheus(merge_snapshots([metrics.snapshot()]))
+
+    assert "# TYPE test_render_seconds histogram" in text
+    assert 'test_render_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_render_seconds_bucket{le="+Inf"} 2' in text
+    assert "test_render_seconds_count 2" in text
+    assert 'test_render_total{cache="users",result="hit"} 3' in text
+
+
+def test_merge_snapshots_sums_processes_and_drops_dead_gauges():
+    # Test that counters add up across processes and gauges of exited ones are ignored
+    snapshots = [
+        {"pid": 1 << 30, "metrics": {"stroke_bcrypt_queue_depth": [[[], [7]]], "c": [[["x"], [2]]]}},
+        {"pid": metrics.os.getpid(), "metrics": {"stroke_bcrypt_queue_depth": [[[], [1]]], "c": [[["x"], [3]]]}},
+    ]
+    merged = merge_snapshots(snapshots)
+
+    assert merged["stroke_bcrypt_queue_depth"] == {(): [1]}
+    assert merged["c"] == {("x",): [5]}
+
+
+def test_snapshots_of_exited_processes_are_pruned(tmp_path, monkeypatch):
+    # Test that only live processes' snapshots are merged and dead ones are deleted
+    monkeypatch.setattr(Config, "METRICS_DIR", str(tmp_path))
+    live_pid = metrics.os.getppid()
+    dead_pid = 1 << 30
+    for pid in (live_pid, dead_pid):
+        (tmp_path / f"{pid}.json").write_text(json.dumps({"pid": pid, "metrics": {}}))
+
+    assert [snap["pid"] for snap in metrics._read_snapshots()] == [live_pid]
+    assert not (tmp_path / f"{dead_pid}.json").exists()
+
+
+def test_metrics_endpoint_access(monkeypatch):
+    # Test that /metrics is only served to admins and allowed addresses
+    monkeypatch.setattr(Config, "METRICS_ALLOWED_ADDRS", ["10.0.0.5"])
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test"
+    metrics.init_app(app)
+    client = app.test_client()
+
+    assert client.get("/metrics").status_code == 404
+
+    response = client.get("/metrics", environ_base={"REMOTE_ADDR": "10.0.0.5"})
+    assert response.status_code == 200
+    assert b"stroke_request_duration_seconds_bucket" in response.data
+
+    with client.session_transaction() as sess:
+        sess["role_name"] = "admin"
+    assert client.get("/metrics").status_code == 200
+
+
+def test_exited_thread_shards_are_folded():
+    # Test that shards of finished threads are merged so their number stays bounded
+    counter = Counter("test_threads_total", "Thread test.")
+    threads = [threading.Thread(target=counter.inc) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    child = counter.labels()
+    assert len(child._shards) <= 1
+    assert counter.collect()[()] == [50]
+
+
+def test_sqlite_statement_is_observed_once():
+    # Test that executing and fetching one statement is a single latency sample
+    histogram = metrics.SQLITE_SECONDS
+    before = sum(histogram.collect().get((), [0])[:-1])
+
+    conn = sqlite3.connect(":memory:", factory=PooledConnection)
+    conn.execute("SELECT 1").fetchall()
+    conn.close_physical()
+
+    assert sum(histogram.collect()[()][:-1]) == before + 1
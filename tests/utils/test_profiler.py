@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import Counter
+from flask import Flask
+from config import Config
+from utils import profiler
+from utils.profiler import SamplingProfiler, list_profiles, load_folded, save_profile
+
+
+def _busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profiler_collects_collapsed_stacks():
+    # Test that the sampled thread's stacks are counted in collapsed form
+    sampler = SamplingProfiler(0.001)
+    sampler.start(threading.get_ident())
+    _busy_wait(0.1)
+    stacks = sampler.stop(threading.get_ident())
+
+    assert sum(stacks.values()) > 5
+    assert any(
+        stack.endswith("tests/utils/test_profiler.py:_busy_wait") for stack in stacks
+    )
+
+
+def test_profile_store_is_bounded(tmp_path, monkeypatch):
+    # Test that only the newest profiles are kept
+    monkeypatch.setattr(Config, "PROFILER_MAX_PROFILES", 2)
+    ids = [
+        save_profile({"path": f"/p{i}"}, Counter({"a;b": i + 1}), directory=str(tmp_path))
+        for i in range(3)
+    ]
+
+    stored = list_profiles(directory=str(tmp_path))
+    assert [p["id"] for p in stored] == ids[:0:-1]
+    assert load_folded(ids[2], directory=str(tmp_path)) == "a;b 3\n"
+
+
+def test_debug_header_profiles_admin_requests(tmp_path, monkeypatch):
+    # Test that an admin request with the debug header is always stored
+    monkeypatch.setattr(Config, "PROFILER_DIR", str(tmp_path))
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test"
+    profiler.init_app(app)
+
+    @app.route("/slow")
+    def slow():
+        _busy_wait(0.05)
+        return "ok"
+
+    client = app.test_client()
+    headers = {Config.PROFILER_DEBUG_HEADER: "1"}
+
+    # Ignored for non-admins
+    assert "X-Profile-Id" not in client.get("/slow", headers=headers).headers
+
+    with client.session_transaction() as sess:
+        sess["role_name"] = "admin"
+    profile_id = client.get("/slow", headers=headers).headers["X-Profile-Id"]
+
+    assert "_busy_wait" in load_folded(profile_id, directory=str(tmp_path))
+
+
+def test_unsampled_slow_requests_are_captured(tmp_path, monkeypatch):
+    # Test that a request missed by the sample rate is profiled once it is slow
+    monkeypatch.setattr(Config, "PROFILER_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "PROFILER_ENABLED", True)
+    monkeypatch.setattr(Config, "PROFILER_SAMPLE_RATE", 0)
+    monkeypatch.setattr(Config, "PROFILER_SLOW_REQUEST_MS", 30)
+    app = Flask(__name__)
+    profiler.init_app(app)
+
+    @app.route("/fast")
+    def fast():
+        return "ok"
+
+    @app.route("/slow")
+    def slow():
+        _busy_wait(0.15)
+        return "ok"
+
+    client = app.test_client()
+    client.get("/fast")
+    assert list_profiles(directory=str(tmp_path)) == []
+
+    client.get("/slow")
+    (stored,) = list_profiles(directory=str(tmp_path))
+    assert stored["reason"] == "slow"
+    assert stored["sampled_from_ms"] == 30
+    assert "_busy_wait" in load_folded(stored["id"], directory=str(tmp_path))
@@ -0,0 +1,63 @@
+from utils.rate_limiter import TokenBucketLimiter, SQLiteTokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    # Test that a key can burst up to capacity and regains tokens over time
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(capacity=3, refill_per_second=1, max_keys=10, clock=clock)
+
+    assert [limiter.allow("user:mary") for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 1
+    assert limiter.allow("user:mary")
+    assert not limiter.allow("user:mary")
+
+
+def test_buckets_are_bounded_and_evicted():
+    # Test that refilled buckets are evicted and the key count stays bounded
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(capacity=2, refill_per_second=1, max_keys=3, clock=clock)
+
+    for i in range(10):
+        limiter.allow(f"ip:{i}")
+    assert len(limiter) == 3
+
+    clock.now += 5
+    limiter.allow("ip:new")
+    assert len(limiter) == 1
+
+
+def test_sqlite_buckets_are_shared_between_instances(tmp_path):
+    # Test that two limiters on the same file (e.g. two workers) share state
+    clock = FakeClock()
+    db_path = str(tmp_path / "limits.db")
+    first = SQLiteTokenBucketLimiter(db_path, 2, 1, 100, clock=clock)
+    second = SQLiteTokenBucketLimiter(db_path, 2, 1, 100, clock=clock)
+
+    assert first.allow("user:mary")
+    assert second.allow("user:mary")
+    assert not first.allow("user:mary")
+
+
+def test_sqlite_limiters_purge_only_their_own_table(tmp_path):
+    # Test that a fast-refilling limiter does not purge a slower one's buckets
+    clock = FakeClock()
+    db_path = str(tmp_path / "limits.db")
+    user = SQLiteTokenBucketLimiter(db_path, 2, 0.01, 100, table="user_buckets", clock=clock)
+    ip = SQLiteTokenBucketLimiter(db_path, 2, 1, 100, table="ip_buckets", clock=clock)
+    ip.PURGE_EVERY = 1
+
+    assert user.allow("user:mary")
+    assert user.allow("user:mary")
+    clock.now += 10
+    assert ip.allow("ip:1")
+
+    assert not user.allow("user:mary")
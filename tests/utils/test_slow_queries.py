@@ -0,0 +1,89 @@
+import sqlite3
+from types import SimpleNamespace
+from pymongo import MongoClient
+from config import Config
+from models.db_sqlite import PooledConnection
+from utils import slow_queries
+from utils.mongo_listeners import MongoTimingListener, SlowQueryListener
+from utils.slow_queries import (
+    normalize_mongo,
+    normalize_sql,
+    slow_query_report,
+    summarize_plan,
+)
+
+
+def setup_function():
+    slow_queries.clear_slow_queries()
+
+
+def test_normalize_sql_removes_literals():
+    # Test that statements differing only in values share one shape
+    sql = "SELECT * FROM users  WHERE name LIKE '%jo%' AND id IN (?, ?, ?) LIMIT 25"
+    assert normalize_sql(sql) == "SELECT * FROM users WHERE name LIKE ? AND id IN (...) LIMIT ?"
+
+
+def test_normalize_mongo_keeps_operators_only():
+    # Test that filter values are replaced but keys and operators kept
+    shape = normalize_mongo({"first_name": {"$regex": "jane", "$options": "i"}, "age": {"$in": [1, 2, 3]}})
+    assert shape == {"first_name": {"$regex": "?", "$options": "?"}, "age": {"$in": ["?"]}}
+
+
+def test_slow_sqlite_statement_is_logged_with_call_site(monkeypatch):
+    # Test that a statement over the threshold is captured with its caller
+    monkeypatch.setattr(Config, "SLOW_QUERY_THRESHOLD_MS", 0)
+    conn = sqlite3.connect(":memory:", factory=PooledConnection)
+    conn.execute("SELECT 42").fetchall()
+    conn.close_physical()
+
+    report = slow_query_report()
+    assert report[0]["shape"] == "SELECT ?"
+    assert report[0]["count"] == 1
+    assert report[0]["call_site"].startswith("tests/utils/test_slow_queries.py:")
+
+
+def test_fast_statements_are_ignored(monkeypatch):
+    # Test that statements under the threshold are not recorded
+    monkeypatch.setattr(Config, "SLOW_QUERY_THRESHOLD_MS", 10_000)
+    conn = sqlite3.connect(":memory:", factory=PooledConnection)
+    conn.execute("SELECT 1").fetchall()
+    conn.close_physical()
+
+    assert slow_query_report() == []
+
+
+def test_slow_mongo_command_is_logged(monkeypatch):
+    # Test that the listener records the shape of a slow Mongo command
+    monkeypatch.setattr(Config, "SLOW_QUERY_EXPLAIN", False)
+    listener = SlowQueryListener()
+    command = {"find": "patients", "filter": {"last_name": {"$regex": "smith"}}, "lsid": {}}
+    listener.started(
+        SimpleNamespace(
+            command_name="find", connection_id=1, request_id=7, database_name="db", command=command
+        )
+    )
+    listener.succeeded(
+        SimpleNamespace(command_name="find", connection_id=1, request_id=7, duration_micros=500_000)
+    )
+
+    group = slow_query_report()[0]
+    assert group["collection"] == "patients"
+    assert group["shape"] == "find {'filter': {'last_name': {'$regex': '?'}}}"
+    assert group["max_ms"] == 500.0
+
+
+def test_mongo_listeners_are_accepted_by_pymongo():
+    # Test that pymongo accepts the listeners the Mongo client is created with
+    client = MongoClient(
+        "mongodb://localhost:1",
+        connect=False,
+        event_listeners=[MongoTimingListener(), SlowQueryListener()],
+    )
+    client.close()
+
+
+def test_summarize_plan():
+    # Test the plan summary of a nested winning plan
+    plan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "created_by_1"}}
+    assert summarize_plan(plan) == "FETCH > IXSCAN created_by_1"
+    assert summarize_plan({"stage": "COLLSCAN"}) == "COLLSCAN"
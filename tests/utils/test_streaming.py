@@ -0,0 +1,54 @@
+from flask import Flask, flash, redirect
+from jinja2 import DictLoader
+from utils.streaming import stream_page
+
+TEMPLATE = """
+{% for message in get_flashed_messages() %}<p>{{ message }}</p>{% endfor %}
+<ul>{% for row in rows %}<li>{{ row }}</li>{% else %}<li>No rows</li>{% endfor %}</ul>
+"""
+
+
+def _app():
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test"
+    app.jinja_loader = DictLoader({"list.html": TEMPLATE})
+
+    @app.route("/flash")
+    def flash_then_redirect():
+        flash("Saved")
+        return redirect("/list")
+
+    @app.route("/list")
+    def listing():
+        return stream_page("list.html", rows=(f"row {i}" for i in range(3)))
+
+    @app.route("/empty")
+    def empty():
+        return stream_page("list.html", rows=iter(()))
+
+    return app
+
+
+def test_stream_page_streams_generator_rows():
+    # Test that the response is streamed and rows come from the generator
+    client = _app().test_client()
+    response = client.get("/list")
+
+    assert response.is_streamed
+    body = response.get_data(as_text=True)
+    assert "<li>row 0</li><li>row 1</li><li>row 2</li>" in body
+
+
+def test_stream_page_renders_empty_generators():
+    # Test that an empty generator renders the empty state
+    client = _app().test_client()
+    assert "<li>No rows</li>" in client.get("/empty").get_data(as_text=True)
+
+
+def test_flashed_messages_are_consumed_before_streaming():
+    # Test that a flashed message is shown once even though the body streams
+    client = _app().test_client()
+    client.get("/flash")
+
+    assert "<p>Saved</p>" in client.get("/list").get_data(as_text=True)
+    assert "<p>Saved</p>" not in client.get("/list").get_data(as_text=True)
@@ -0,0 +1,237 @@
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import zlib
+from flask import abort, request, send_file, session, url_for
+from flask.globals import request_ctx
+from werkzeug.security import safe_join
+from config import Config
+
+"""
+Fingerprinted, precompressed static assets and compressed HTML.
+
+At startup (or with `flask build-assets`) every CSS and JS file under the
+static folder is copied to ASSETS_BUILD_DIR under a content-hashed name,
+e.g. css/style.3f2a1b4c5d6e.css, next to gzip and (when the optional
+brotli package is installed) brotli variants. `asset_url()` in templates
+returns the hashed URL; because the name changes with the content, those
+responses are cached by browsers as immutable. HTML responses are gzipped
+on the fly above HTML_COMPRESS_MIN_BYTES.
+
+Every page embeds the session's CSRF token, so HTML is not compressed
+when the request carries query, form or URL values, or has flashed
+messages, that the page may echo:
+an attacker who controls such a value could otherwise recover the token
+byte by byte from the compressed sizes (BREACH). Searches, later list
+pages, re-rendered forms, token links such as /auth/activate/<token>
+and pages showing a flash are therefore sent uncompressed; compressing
+them safely needs the token masked per response, which Flask-WTF does
+not do.
+"""
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={Config.ASSETS_MAX_AGE}, immutable"
+
+# Logical name (e.g. "css/style.css") -> hashed name, and the reverse set
+_manifest = {}
+_hashed_names = set()
+
+
+def _brotli():
+    # Optional dependency: assets are still served gzipped without it
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def hashed_name(relative_path, digest):
+    root, ext = os.path.splitext(relative_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _write_atomic(path, data):
+    # Several workers may build at once; readers only ever see whole files
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_assets(static_dir, build_dir=None):
+    """
+    Write content-hashed, precompressed copies of the static CSS and JS
+    files and a manifest.json mapping logical to hashed names. Outputs
+    that already exist are skipped, since their names are their content.
+    Returns:
+        dict: The manifest.
+    """
+    build_dir = build_dir or Config.ASSETS_BUILD_DIR
+    brotli = _brotli()
+    manifest = {}
+
+    for dirpath, _, filenames in os.walk(static_dir):
+        for filename in sorted(filenames):
+            if not filename.endswith(Config.ASSETS_EXTENSIONS):
+                continue
+
+            source = os.path.join(dirpath, filename)
+            relative = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                data = f.read()
+
+            name = hashed_name(relative, hashlib.sha256(data).hexdigest()[:12])
+            manifest[relative] = name
+
+            target = os.path.join(build_dir, name)
+            if os.path.exists(target):
+                continue
+
+            # Variants first, so a visible asset always has them
+            _write_atomic(f"{target}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write_atomic(f"{target}.br", brotli.compress(data))
+            _write_atomic(target, data)
+
+    # Unchanged builds leave the manifest alone, so a prebuilt deploy can be read-only
+    if read_manifest(build_dir) != manifest:
+        _write_atomic(
+            os.path.join(build_dir, "manifest.json"),
+            json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"),
+        )
+    return manifest
+
+
+def read_manifest(build_dir=None):
+    """
+    Read the manifest written by build_assets.
+    Returns:
+        dict: The manifest, or None if there is no readable manifest.
+    """
+    path = os.path.join(build_dir or Config.ASSETS_BUILD_DIR, "manifest.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_manifest(manifest):
+    _manifest.clear()
+    _manifest.update(manifest)
+    _hashed_names.clear()
+    _hashed_names.update(manifest.values())
+
+
+def asset_url(filename):
+    # Hashed URL of a static asset, or the plain static URL if it was not built
+    hashed = _manifest.get(filename)
+    if hashed is None:
+        return url_for("static", filename=filename)
+    return url_for("assets", filename=hashed)
+
+
+def _encoded_variant(path):
+    # Best precompressed variant the client accepts
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if request.accept_encodings[encoding] and os.path.isfile(path + suffix):
+            return encoding, path + suffix
+    return None, path
+
+
+def _gzip_stream(chunks, level):
+    # Flush after every chunk so a streamed page still arrives progressively
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _reflects_input():
+    # Query, form and URL values and flashed messages (which may quote an
+    # error or user input) can be echoed next to the CSRF token (BREACH).
+    # Flashes rendered by this request have already left the session.
+    return (
+        bool(request.args)
+        or bool(request.form)
+        or bool(request.view_args)
+        or bool(session.get("_flashes"))
+        or bool(request_ctx.flashes)
+    )
+
+
+def compress_html(response):
+    """
+    Gzip an HTML response for clients that accept it, unless the request
+    has input the page may reflect. Streamed responses are compressed
+    chunk by chunk since their size is not known upfront.
+    """
+    if response.mimetype != "text/html" or response.direct_passthrough:
+        return response
+    if response.status_code in (204, 304) or "Content-Encoding" in response.headers:
+        return response
+    if _reflects_input():
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if not request.accept_encodings["gzip"]:
+        return response
+
+    if response.is_streamed:
+        response.response = _gzip_stream(response.iter_encoded(), Config.HTML_COMPRESS_LEVEL)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < Config.HTML_COMPRESS_MIN_BYTES:
+            return response
+        response.set_data(gzip.compress(data, compresslevel=Config.HTML_COMPRESS_LEVEL))
+
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def init_app(app):
+    """Build the assets, serve them under /assets and compress HTML."""
+    try:
+        load_manifest(build_assets(app.static_folder))
+    except OSError as e:
+        # Use the manifest of a `flask build-assets` run, if there was one;
+        # without it asset_url falls back to /static
+        manifest = read_manifest()
+        if manifest is None:
+            logger.warning("Could not build static assets: %s", e)
+        else:
+            logger.info("Using prebuilt static assets: %s", e)
+            load_manifest(manifest)
+
+    app.jinja_env.globals["asset_url"] = asset_url
+
+    @app.route("/assets/<path:filename>", methods=["GET"])
+    def assets(filename):
+        if filename not in _hashed_names:
+            abort(404)
+
+        path = safe_join(Config.ASSETS_BUILD_DIR, filename)
+        encoding, path = _encoded_variant(path)
+        response = send_file(
+            path,
+            mimetype=mimetypes.guess_type(filename)[0],
+            conditional=True,
+            max_age=Config.ASSETS_MAX_AGE,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    if Config.HTML_COMPRESSION_ENABLED:
+        app.after_request(compress_html)
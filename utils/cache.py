@@ -0,0 +1,58 @@
+import threading
+import time
+from utils.metrics import CACHE_REQUESTS
+
+"""In-process data generations and the caches keyed on them."""
+
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def bump_generation(name):
+    """
+    Mark a dataset (e.g. "users" or "patients") as changed so every cache
+    keyed on its generation is invalidated.
+    """
+    with _generations_lock:
+        _generations[name] = _generations.get(name, 0) + 1
+
+
+def get_generation(name):
+    # Current generation counter of a dataset
+    return _generations.get(name, 0)
+
+
+class GenerationCache:
+    """
+    Holds a single computed value for as long as the dataset generation it
+    was computed from is current. Generations only change in the process
+    that made the write, so `ttl` bounds how stale other worker processes
+    can get.
+    """
+
+    def __init__(self, generation_name, ttl):
+        self.generation_name = generation_name
+        self.ttl = ttl
+        self._entry = None
+
+    def get(self, compute):
+        # Return the cached value, recomputing it if stale
+        generation = get_generation(self.generation_name)
+        entry = self._entry
+
+        if entry is not None:
+            value, cached_generation, cached_at = entry
+            if cached_generation == generation and time.monotonic() - cached_at < self.ttl:
+                CACHE_REQUESTS.inc(self.generation_name, "hit")
+                return value
+
+        CACHE_REQUESTS.inc(self.generation_name, "miss")
+
+        # Read the generation before computing so a concurrent write
+        # invalidates this result rather than being masked by it
+        value = compute()
+        self._entry = (value, generation, time.monotonic())
+        return value
+
+    def clear(self):
+        self._entry = None
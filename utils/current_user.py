@@ -1,8 +1,20 @@
-from flask import session
+from flask import session, g
 from models.auth.auth import get_user_by_id
 
+
 def get_current_user():
+    """
+    Return the logged-in user, resolved at most once per request.
+    The row is memoized on flask.g together with the session user id, so
+    the before-request check, context processor and views share one query.
+    """
     user_id = session.get("user_id")
     if not user_id:
         return None
-    return get_user_by_id(user_id)
+
+    cached = g.get("current_user")
+    if cached is None or cached[0] != user_id:
+        cached = (user_id, get_user_by_id(user_id))
+        g.current_user = cached
+
+    return cached[1]
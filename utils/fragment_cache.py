@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from config import Config
+from utils.cache import get_generation
+from utils.metrics import CACHE_REQUESTS
+
+"""
+Template fragment cache keyed on data generations.
+
+    {% cache "admin_user_table", "users", search_query, after %}
+        ...
+    {% endcache %}
+
+The first argument names the fragment, the second is the generation (or
+tuple of generations, see utils.cache.bump_generation) the fragment is
+rendered from, and any further arguments are the values it varies on.
+A fragment is rendered again once one of its generations is bumped or
+it is older than FRAGMENT_CACHE_SECONDS, which bounds how stale other
+worker processes can get. The cache is an LRU bounded by
+FRAGMENT_CACHE_MAX_ENTRIES and FRAGMENT_CACHE_MAX_BYTES.
+
+Fragments must not depend on the current user: anything rendered with
+a CSRF token is never stored.
+"""
+
+
+class FragmentCache:
+    """LRU of rendered fragments, bounded by entry count and total size."""
+
+    def __init__(self, max_entries, max_bytes, ttl):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            html, cached_at = entry
+            if time.monotonic() - cached_at >= self.ttl:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return html
+
+    def set(self, key, html):
+        size = len(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (html, time.monotonic())
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        html, _ = self._entries.pop(key)
+        self._size -= len(html)
+
+    def clear(self, name=None):
+        # Drop every fragment, or only those with the given name
+        with self._lock:
+            for key in [k for k in self._entries if name is None or k[0] == name]:
+                self._remove(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = FragmentCache(
+    Config.FRAGMENT_CACHE_MAX_ENTRIES,
+    Config.FRAGMENT_CACHE_MAX_BYTES,
+    Config.FRAGMENT_CACHE_SECONDS,
+)
+
+
+def invalidate_fragments(name=None):
+    """
+    Explicitly drop cached fragments. Writes normally only need
+    bump_generation, which makes every dependent fragment stale.
+    """
+    _cache.clear(name)
+
+
+def _fragment_key(name, generations, vary):
+    if isinstance(generations, str):
+        generations = (generations,)
+    versions = tuple((g, get_generation(g)) for g in generations)
+    return (name, versions, tuple(repr(value) for value in vary))
+
+
+def render_fragment(name, generations, vary, render):
+    """
+    Return the cached fragment for the current generations, rendering and
+    storing it on a miss.
+    Args:
+        render (callable): Renders the fragment body.
+    """
+    if not Config.FRAGMENT_CACHE_ENABLED:
+        return render()
+
+    key = _fragment_key(name, generations, vary)
+    html = _cache.get(key)
+    if html is not None:
+        CACHE_REQUESTS.inc("fragment", "hit")
+        return Markup(html)
+
+    CACHE_REQUESTS.inc("fragment", "miss")
+    html = render()
+    # Per-session content must never be served to another user
+    if 'name="csrf_token"' not in html:
+        _cache.set(key, str(html))
+    return Markup(html)
+
+
+class FragmentCacheExtension(Extension):
+    """Adds the {% cache name, generations, *vary %} ... {% endcache %} tag."""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        if len(args) < 2:
+            parser.fail("cache needs a fragment name and a generation", lineno)
+
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        call = self.call_method(
+            "_render", [args[0], args[1], nodes.List(args[2:])]
+        )
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, name, generations, vary, caller):
+        return render_fragment(name, generations, vary, caller)
+
+
+def init_app(app):
+    """Enable the {% cache %} tag in the app's templates."""
+    app.jinja_env.add_extension(FragmentCacheExtension)
@@ -0,0 +1,174 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from flask import before_render_template, request, session, template_rendered
+from config import Config
+
+"""
+Per-request timing of the slow subsystems (SQLite, Mongo, crypto, bcrypt
+and template rendering).
+
+Timings are accumulated in a context variable that only exists while a
+request is being handled, so recording outside a request is a no-op and
+inside one costs a perf_counter() call and a dict update. The breakdown
+is logged as one JSON line and returned to admin sessions as a
+Server-Timing header.
+"""
+
+SUBSYSTEMS = ("sqlite", "mongo", "crypto", "bcrypt", "template")
+
+_timings = ContextVar("request_timings", default=None)
+_request_start = ContextVar("request_start", default=None)
+_template_starts = ContextVar("template_starts", default=None)
+
+timing_logger = logging.getLogger("request_timing")
+
+# Callables notified of every timing, in or outside a request
+_observers = ()
+
+
+def add_observer(observer):
+    """
+    Register `observer(subsystem, duration, detail)` to be called for every
+    recorded timing. `detail` is the SQL statement, Mongo command name or
+    function name when known.
+    """
+    global _observers
+    if observer not in _observers:
+        _observers = _observers + (observer,)
+
+
+def remove_observer(observer):
+    global _observers
+    _observers = tuple(o for o in _observers if o is not observer)
+
+
+def record(subsystem, duration, detail=None):
+    """
+    Add `duration` seconds spent in a subsystem to the current request and
+    notify the observers. Request timings are skipped outside a request.
+    """
+    for observer in _observers:
+        observer(subsystem, duration, detail)
+
+    timings = _timings.get()
+    if timings is None:
+        return
+
+    entry = timings.get(subsystem)
+    if entry is None:
+        timings[subsystem] = [duration, 1]
+    else:
+        entry[0] += duration
+        entry[1] += 1
+
+
+@contextmanager
+def timed(subsystem, detail=None):
+    # Time the enclosed block against a subsystem
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(subsystem, time.perf_counter() - start, detail)
+
+
+def timed_call(subsystem):
+    # Decorator form of timed()
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(subsystem, time.perf_counter() - start, fn.__name__)
+
+        return wrapper
+
+    return decorator
+
+
+def current_timings():
+    # {subsystem: (seconds, calls)} recorded so far in this request
+    timings = _timings.get() or {}
+    return {name: tuple(entry) for name, entry in timings.items()}
+
+
+def server_timing_header(timings, total):
+    # Format timings as a Server-Timing header value (durations in ms)
+    parts = [
+        f'{name};dur={seconds * 1000:.2f};desc="{calls} calls"'
+        for name, (seconds, calls) in timings.items()
+    ]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _template_started(sender, template, context, **extra):
+    starts = _template_starts.get()
+    if starts is not None:
+        starts.append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    starts = _template_starts.get()
+    if starts:
+        record("template", time.perf_counter() - starts.pop())
+
+
+def _timing_header_allowed():
+    # Timings reveal e.g. whether a login reached bcrypt, so only admins see them
+    return Config.SERVER_TIMING_ENABLED and session.get("role_name") == "admin"
+
+
+def init_app(app):
+    """
+    Start and report per-request timings for a Flask app. Every request is
+    logged; the Server-Timing header is only sent to admin sessions.
+    """
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+
+    @app.before_request
+    def start_request_timing():
+        _timings.set({})
+        _template_starts.set([])
+        _request_start.set(time.perf_counter())
+
+    @app.after_request
+    def emit_request_timing(response):
+        start = _request_start.get()
+        if start is None:
+            return response
+
+        total = time.perf_counter() - start
+        timings = current_timings()
+        if _timing_header_allowed():
+            response.headers["Server-Timing"] = server_timing_header(timings, total)
+
+        if timing_logger.isEnabledFor(logging.INFO):
+            timing_logger.info(
+                json.dumps(
+                    {
+                        "endpoint": request.endpoint,
+                        "method": request.method,
+                        "status": response.status_code,
+                        "total_ms": round(total * 1000, 2),
+                        "timings_ms": {
+                            name: round(seconds * 1000, 2)
+                            for name, (seconds, _) in timings.items()
+                        },
+                    }
+                )
+            )
+        return response
+
+    @app.teardown_request
+    def reset_request_timing(exception=None):
+        _timings.set(None)
+        _template_starts.set(None)
+        _request_start.set(None)
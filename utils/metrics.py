@@ -0,0 +1,402 @@
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from flask import Response, abort, g, request, session
+from config import Config
+from utils.instrumentation import add_observer
+
+"""
+Prometheus metrics for the hot paths.
+
+Every metric child (one label combination) keeps a small list of counts
+per live thread, so observing a value never takes a lock: the thread
+bumps its own preallocated bucket slot and the scrape adds the shards
+up. Counts of exited threads are folded into one base shard. Under
+a multi-process server each process periodically writes a JSON snapshot
+to METRICS_DIR and /metrics merges the snapshots of all processes.
+"""
+
+# Latency buckets in seconds, shared by every histogram
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_registry = []
+
+
+class _ShardOwner:
+    """Thread-local marker whose collection signals that its thread has exited."""
+
+
+class _Child:
+    """
+    Counts for one label combination, sharded per live thread. When a
+    thread exits its counts are folded into a base shard, so the number
+    of shards stays bounded under thread-per-request servers.
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._base = [0] * size
+        self._shards = {}
+        # Reentrant: a thread's finalizer may run while this thread holds it
+        self._lock = threading.RLock()
+
+    def shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = [0] * self._size
+            owner = _ShardOwner()
+            with self._lock:
+                self._shards[id(owner)] = shard
+            weakref.finalize(owner, self._retire, id(owner))
+            self._local.owner = owner
+            self._local.shard = shard
+        return shard
+
+    def _retire(self, key):
+        # The owning thread has exited: keep its counts, drop its shard
+        with self._lock:
+            shard = self._shards.pop(key, None)
+            if shard is not None:
+                for i, value in enumerate(shard):
+                    self._base[i] += value
+
+    def totals(self):
+        with self._lock:
+            shards = [self._base] + list(self._shards.values())
+            totals = [0] * self._size
+            for shard in shards:
+                for i, value in enumerate(shard):
+                    totals[i] += value
+        return totals
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _slots(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        # Child for a label combination, created once
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, _Child(self._slots()))
+        return child
+
+    def collect(self):
+        # {label values: totals} for every child
+        return {values: child.totals() for values, child in list(self._children.items())}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _slots(self):
+        return 1
+
+    def inc(self, *labels, amount=1):
+        self.labels(*labels).shard()[0] += amount
+
+
+class Histogram(_Metric):
+    """
+    Histogram with fixed, preallocated buckets. Slots are the per-bucket
+    (non-cumulative) counts, the +Inf bucket, then the sum.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _slots(self):
+        return len(self.buckets) + 2
+
+    def observe(self, value, *labels):
+        shard = self.labels(*labels).shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+
+class Gauge:
+    """Gauge read from a callback when metrics are collected."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, read):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = ()
+        self._read = read
+        _registry.append(self)
+
+    def collect(self):
+        return {(): [self._read()]}
+
+
+def _hashing_queue_depth():
+    # Read without creating the pool in processes that never hash
+    from services import hashing_pool
+
+    pool = hashing_pool._pool
+    return pool.depth if pool is not None else 0
+
+
+REQUEST_SECONDS = Histogram(
+    "stroke_request_duration_seconds", "Request latency per endpoint.", ["endpoint"]
+)
+SQLITE_SECONDS = Histogram(
+    "stroke_sqlite_query_duration_seconds", "SQLite statement latency, execute and fetch."
+)
+MONGO_SECONDS = Histogram(
+    "stroke_mongo_command_duration_seconds", "MongoDB command latency.", ["command"]
+)
+CRYPTO_OPERATIONS = Counter(
+    "stroke_crypto_operations_total", "Field encryptions and decryptions.", ["operation"]
+)
+CRYPTO_SECONDS = Counter(
+    "stroke_crypto_seconds_total", "Time spent encrypting and decrypting fields.", ["operation"]
+)
+AUDIT_LOG_SECONDS = Histogram(
+    "stroke_audit_log_write_duration_seconds", "Audit log write latency."
+)
+CACHE_REQUESTS = Counter(
+    "stroke_cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"]
+)
+BCRYPT_QUEUE_DEPTH = Gauge(
+    "stroke_bcrypt_queue_depth", "Password hashing jobs running or queued.", _hashing_queue_depth
+)
+
+_CRYPTO_OPERATIONS = {"encrypt_value": "encrypt", "decrypt_value": "decrypt"}
+
+
+def _observe_subsystem(subsystem, duration, detail):
+    # Instrumentation observer feeding the subsystem metrics
+    if subsystem == "sqlite":
+        SQLITE_SECONDS.observe(duration)
+    elif subsystem == "mongo":
+        MONGO_SECONDS.observe(duration, detail or "unknown")
+    elif subsystem == "crypto":
+        operation = _CRYPTO_OPERATIONS.get(detail, detail or "unknown")
+        CRYPTO_OPERATIONS.inc(operation)
+        CRYPTO_SECONDS.inc(operation, amount=duration)
+
+
+add_observer(_observe_subsystem)
+
+
+def snapshot():
+    # JSON-friendly totals of every metric in this process
+    return {
+        "pid": os.getpid(),
+        "metrics": {
+            metric.name: [[list(values), totals] for values, totals in metric.collect().items()]
+            for metric in _registry
+        },
+    }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_snapshots():
+    """
+    Snapshots written by the other live processes sharing METRICS_DIR.
+    Files of exited processes are deleted, so their counts are dropped
+    (Prometheus treats that as a counter reset) and a reused pid never
+    inherits them.
+    """
+    if not Config.METRICS_DIR or not os.path.isdir(Config.METRICS_DIR):
+        return []
+
+    snapshots = []
+    for filename in os.listdir(Config.METRICS_DIR):
+        pid, ext = os.path.splitext(filename)
+        if ext != ".json" or not pid.isdigit() or int(pid) == os.getpid():
+            continue
+
+        path = os.path.join(Config.METRICS_DIR, filename)
+        if not _pid_alive(int(pid)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def merge_snapshots(snapshots):
+    """
+    Add up counters and histograms from every process. Gauges only count
+    processes that are still running.
+    Returns:
+        dict: {metric name: {label values tuple: totals}}
+    """
+    kinds = {metric.name: metric.kind for metric in _registry}
+    merged = {}
+
+    for snap in snapshots:
+        alive = snap["pid"] == os.getpid() or _pid_alive(snap["pid"])
+        for name, children in snap["metrics"].items():
+            if kinds.get(name) == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {})
+            for values, totals in children:
+                key = tuple(values)
+                current = target.get(key)
+                if current is None:
+                    target[key] = list(totals)
+                else:
+                    target[key] = [a + b for a, b in zip(current, totals)]
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render_prometheus(merged):
+    # Prometheus text exposition format (version 0.0.4)
+    lines = []
+    for metric in _registry:
+        children = merged.get(metric.name)
+        if not children:
+            continue
+
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+        for values, totals in sorted(children.items()):
+            if metric.kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(metric.buckets + ("+Inf",), totals[:-1]):
+                    cumulative += count
+                    labels = _format_labels(metric.labelnames, values, ("le", bound))
+                    lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(metric.labelnames, values)
+                lines.append(f"{metric.name}_sum{labels} {totals[-1]}")
+                lines.append(f"{metric.name}_count{labels} {cumulative}")
+            else:
+                labels = _format_labels(metric.labelnames, values)
+                lines.append(f"{metric.name}{labels} {totals[0]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_snapshot():
+    # Atomically replace this process's snapshot file
+    path = os.path.join(Config.METRICS_DIR, f"{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+_writer_started = False
+_writer_lock = threading.Lock()
+
+
+def start_snapshot_writer():
+    """
+    Write this process's snapshot every METRICS_FLUSH_SECONDS (and at
+    exit) when METRICS_DIR is configured.
+    """
+    global _writer_started
+    if not Config.METRICS_DIR:
+        return
+
+    with _writer_lock:
+        if _writer_started:
+            return
+        _writer_started = True
+
+    os.makedirs(Config.METRICS_DIR, exist_ok=True)
+
+    def run():
+        while True:
+            time.sleep(Config.METRICS_FLUSH_SECONDS)
+            try:
+                write_snapshot()
+            except OSError:
+                pass
+
+    threading.Thread(target=run, name="metrics-snapshot", daemon=True).start()
+    atexit.register(write_snapshot)
+
+
+def _metrics_allowed():
+    # Admins, or scrapers from a configured address
+    return (
+        session.get("role_name") == "admin"
+        or request.remote_addr in Config.METRICS_ALLOWED_ADDRS
+    )
+
+
+def init_app(app):
+    """Record request latency and serve /metrics."""
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request_metrics(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            # Unmatched URLs share one label to keep cardinality bounded
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start, request.endpoint or "unmatched"
+            )
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        if not _metrics_allowed():
+            abort(404)
+
+        merged = merge_snapshots([snapshot()] + _read_snapshots())
+        return Response(
+            render_prometheus(merged), mimetype="text/plain; version=0.0.4"
+        )
+
+    start_snapshot_writer()
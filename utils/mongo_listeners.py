@@ -0,0 +1,60 @@
+from pymongo import monitoring
+from utils.instrumentation import record
+from utils.slow_queries import LOGGED_MONGO_COMMANDS, log_mongo_command
+
+"""
+pymongo command listeners that feed the request timings and the
+slow-query log.
+
+pymongo only accepts subclasses of its listener base classes, so this
+module imports pymongo and is itself only imported when the Mongo client
+is created (see models.mongo_client).
+"""
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    """
+    Records each command's server round trip. pymongo calls it on the
+    thread that issued the command, so the duration lands in that
+    request's timings.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        record("mongo", event.duration_micros / 1_000_000, event.command_name)
+
+    def failed(self, event):
+        record("mongo", event.duration_micros / 1_000_000, event.command_name)
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """
+    Logs slow commands. The command is kept from `started` until it
+    finishes so its shape can be recorded.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        if event.command_name in LOGGED_MONGO_COMMANDS:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.database_name,
+                event.command,
+            )
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is not None:
+            database, command = pending
+            log_mongo_command(
+                database, event.command_name, command, event.duration_micros / 1_000_000
+            )
@@ -0,0 +1,265 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from flask import g, request, session
+from config import Config
+from utils.time_formatter import utc_now
+
+"""
+Opt-in sampling profiler for slow requests.
+
+A fraction of requests (PROFILER_SAMPLE_RATE, when PROFILER_ENABLED) and
+every admin request carrying the PROFILER_DEBUG_HEADER have their thread's
+stack sampled every PROFILER_INTERVAL_MS by one background thread. Every
+other request is only watched while PROFILER_ENABLED: if it is still
+running after PROFILER_SLOW_REQUEST_MS, sampling starts then, so slow
+requests are always captured, from the threshold on. When the request
+finishes the samples are discarded, unless it was slower than
+PROFILER_SLOW_REQUEST_MS or explicitly requested; then the collapsed
+stacks are saved to PROFILER_DIR, which keeps at most
+PROFILER_MAX_PROFILES profiles. The .folded files can be fed to
+flamegraph.pl or speedscope.
+"""
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROFILE_ID = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+
+def _frame_label(frame):
+    # "models/patients/mongo_models.py:get_patient_clinician_stats"
+    filename = frame.f_code.co_filename
+    if filename.startswith(_PACKAGE_ROOT):
+        filename = os.path.relpath(filename, _PACKAGE_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{frame.f_code.co_name}"
+
+
+def collapse_stack(frame):
+    # Root-first, semicolon separated stack in the collapsed format
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of registered threads from a single background
+    thread, which sleeps while no thread is registered or due.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _ensure_thread(self):
+        # Called with the lock held
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+
+    def start(self, thread_id):
+        with self._lock:
+            self._active[thread_id] = Counter()
+            self._ensure_thread()
+        self._wake.set()
+
+    def watch(self, thread_id, delay):
+        # Start sampling a thread after `delay` seconds unless it stops first
+        with self._lock:
+            self._watched[thread_id] = time.monotonic() + delay
+            self._ensure_thread()
+        self._wake.set()
+
+    def stop(self, thread_id):
+        # Stop sampling or watching a thread and return its stack counts
+        with self._lock:
+            self._watched.pop(thread_id, None)
+            return self._active.pop(thread_id, Counter())
+
+    def _promote_due(self):
+        # Move watched threads past their delay to the sampled set
+        with self._lock:
+            now = time.monotonic()
+            for thread_id, due in list(self._watched.items()):
+                if due <= now:
+                    del self._watched[thread_id]
+                    self._active[thread_id] = Counter()
+            next_due = min(self._watched.values(), default=None)
+            idle = not self._active
+        return idle, None if next_due is None else max(0.0, next_due - now)
+
+    def _run(self):
+        while True:
+            idle, until_due = self._promote_due()
+            if idle:
+                self._wake.wait(until_due)
+                self._wake.clear()
+                continue
+
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[collapse_stack(frame)] += 1
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler():
+    # Process-wide profiler, created on first use
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = SamplingProfiler(Config.PROFILER_INTERVAL_MS / 1000)
+    return _profiler
+
+
+def save_profile(meta, stacks, directory=None):
+    """
+    Write a profile's metadata and collapsed stacks, then drop the oldest
+    profiles beyond PROFILER_MAX_PROFILES.
+    Returns:
+        str: The profile id.
+    """
+    directory = directory or Config.PROFILER_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    profile_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    meta = dict(meta, id=profile_id, samples=sum(stacks.values()))
+
+    with open(os.path.join(directory, f"{profile_id}.folded"), "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(os.path.join(directory, f"{profile_id}.json"), "w") as f:
+        json.dump(meta, f)
+
+    _prune(directory)
+    return profile_id
+
+
+def _prune(directory):
+    ids = sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".json"))
+    for profile_id in ids[: max(0, len(ids) - Config.PROFILER_MAX_PROFILES)]:
+        for ext in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(directory, profile_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory=None):
+    # Stored profile metadata, newest first
+    directory = directory or Config.PROFILER_DIR
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def load_folded(profile_id, directory=None):
+    """
+    Return the collapsed stacks of a stored profile.
+    Raises:
+        ValueError: If the id is malformed.
+        FileNotFoundError: If the profile no longer exists.
+    """
+    if not _PROFILE_ID.fullmatch(profile_id or ""):
+        raise ValueError("Invalid profile id.")
+    directory = directory or Config.PROFILER_DIR
+    with open(os.path.join(directory, f"{profile_id}.folded")) as f:
+        return f.read()
+
+
+def _should_profile():
+    if request.headers.get(Config.PROFILER_DEBUG_HEADER) and session.get("role_name") == "admin":
+        return "debug"
+    if Config.PROFILER_ENABLED and random.random() < Config.PROFILER_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def init_app(app):
+    """Profile sampled, slow and explicitly requested requests."""
+
+    @app.before_request
+    def start_profiling():
+        reason = _should_profile()
+        if reason is None and not Config.PROFILER_ENABLED:
+            return
+
+        thread_id = threading.get_ident()
+        if reason is None:
+            # Only sampled if it is still running at the slow threshold
+            reason = "slow"
+            get_profiler().watch(thread_id, Config.PROFILER_SLOW_REQUEST_MS / 1000)
+        else:
+            get_profiler().start(thread_id)
+        g._profile = (reason, time.perf_counter(), thread_id)
+
+    @app.after_request
+    def finish_profiling(response):
+        profile = g.pop("_profile", None)
+        if profile is None:
+            return response
+
+        reason, start, thread_id = profile
+        stacks = get_profiler().stop(thread_id)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if reason == "debug" or duration_ms >= Config.PROFILER_SLOW_REQUEST_MS:
+            profile_id = save_profile(
+                {
+                    "ts": utc_now(),
+                    "reason": reason,
+                    "method": request.method,
+                    "path": request.path,
+                    "endpoint": request.endpoint,
+                    "status": response.status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "interval_ms": Config.PROFILER_INTERVAL_MS,
+                    # Slow requests are only sampled from the threshold on
+                    "sampled_from_ms": (
+                        Config.PROFILER_SLOW_REQUEST_MS if reason == "slow" else 0
+                    ),
+                },
+                stacks,
+            )
+            if reason == "debug":
+                response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @app.teardown_request
+    def abandon_profiling(exception=None):
+        # Requests that failed before after_request still stop sampling
+        profile = g.pop("_profile", None)
+        if profile is not None:
+            get_profiler().stop(profile[2])
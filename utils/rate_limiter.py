@@ -0,0 +1,212 @@
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from models.db_sqlite import get_pool
+
+
+class TokenBucketLimiter:
+    """
+    In-memory token buckets keyed by an arbitrary string.
+
+    Each key may spend up to `capacity` tokens in a burst and regains
+    `refill_per_second` tokens per second. Buckets are kept in least
+    recently used order, so buckets that have refilled completely (and
+    are therefore indistinguishable from a new one) are evicted from the
+    front, and the total number of keys never exceeds `max_keys`.
+    """
+
+    def __init__(self, capacity, refill_per_second, max_keys, clock=time.monotonic):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def allow(self, key, cost=1):
+        # Spend `cost` tokens from the key's bucket; False if it is empty
+        now = self._clock()
+
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(
+                self.capacity, tokens + (now - updated) * self.refill_per_second
+            )
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+
+            self._buckets[key] = (tokens, now)
+            self._evict(now)
+
+        return allowed
+
+    def _evict(self, now):
+        refill_time = self.capacity / self.refill_per_second
+
+        while self._buckets:
+            _, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < refill_time and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+
+
+class SQLiteTokenBucketLimiter:
+    """
+    Token buckets stored in a SQLite file so every worker process on one
+    host shares the same limits. Each check is a single short
+    BEGIN IMMEDIATE transaction; full buckets are purged periodically.
+    Limiters with different refill rates need their own `table`, since
+    the purge and `max_keys` apply to every bucket in it.
+    """
+
+    PURGE_EVERY = 200
+
+    def __init__(
+        self, db_path, capacity, refill_per_second, max_keys,
+        table="rate_limit_buckets", clock=time.time,
+    ):
+        # The table name is interpolated into SQL, so only plain identifiers
+        if not table.isidentifier():
+            raise ValueError(f"Invalid rate limit table name: {table!r}")
+
+        self.db_path = db_path
+        self.table = table
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._clock = clock
+        self._calls = 0
+
+        conn = get_pool(db_path).acquire()
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.table}_updated_at
+            ON {self.table}(updated_at)
+            """
+        )
+        conn.commit()
+        conn.close()
+
+    def allow(self, key, cost=1):
+        # Spend `cost` tokens from the key's bucket; False if it is empty
+        now = self._clock()
+        conn = get_pool(self.db_path).acquire()
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT tokens, updated_at FROM {self.table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            tokens, updated = (row["tokens"], row["updated_at"]) if row else (self.capacity, now)
+            tokens = min(
+                self.capacity, tokens + max(0.0, now - updated) * self.refill_per_second
+            )
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+
+            conn.execute(
+                f"""
+                INSERT INTO {self.table} (key, tokens, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+                """,
+                (key, tokens, now),
+            )
+
+            self._calls += 1
+            if self._calls % self.PURGE_EVERY == 0:
+                self._purge(conn, now)
+
+            conn.commit()
+        finally:
+            conn.close()
+
+        return allowed
+
+    def _purge(self, conn, now):
+        # Drop refilled buckets, then the oldest ones beyond max_keys
+        refill_time = self.capacity / self.refill_per_second
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE updated_at < ?", (now - refill_time,)
+        )
+        conn.execute(
+            f"""
+            DELETE FROM {self.table} WHERE key IN (
+                SELECT key FROM {self.table}
+                ORDER BY updated_at DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_keys,),
+        )
+
+
+_limiters = None
+_limiters_lock = threading.Lock()
+
+
+def _build_limiter(name, capacity, per_minute):
+    refill_per_second = per_minute / 60
+    if Config.LOGIN_RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteTokenBucketLimiter(
+            Config.RATE_LIMIT_DB_PATH,
+            capacity,
+            refill_per_second,
+            Config.LOGIN_RATE_LIMIT_MAX_KEYS,
+            table=f"rate_limit_{name}_buckets",
+        )
+    return TokenBucketLimiter(
+        capacity, refill_per_second, Config.LOGIN_RATE_LIMIT_MAX_KEYS
+    )
+
+
+def _get_login_limiters():
+    # Username and client-address limiters, created on first use and
+    # published together so no caller sees only one of them
+    global _limiters
+    if _limiters is None:
+        with _limiters_lock:
+            if _limiters is None:
+                _limiters = {
+                    "user": _build_limiter(
+                        "user",
+                        Config.LOGIN_USER_BUCKET_CAPACITY,
+                        Config.LOGIN_USER_REFILL_PER_MINUTE,
+                    ),
+                    "ip": _build_limiter(
+                        "ip",
+                        Config.LOGIN_IP_BUCKET_CAPACITY,
+                        Config.LOGIN_IP_REFILL_PER_MINUTE,
+                    ),
+                }
+    return _limiters
+
+
+def allow_login_attempt(username, client_addr):
+    """
+    Check the login rate limits before any password hashing happens.
+    Returns:
+        bool: False if either the username or the client address is over its limit.
+    """
+    limiters = _get_login_limiters()
+    user_ok = limiters["user"].allow(f"user:{username.lower()}")
+    ip_ok = limiters["ip"].allow(f"ip:{client_addr}")
+    return user_ok and ip_ok
@@ -1,10 +1,8 @@
+import time
 from utils.time_formatter import utc_now
-from pymongo import MongoClient
-from config import Config
-
-_client = MongoClient(Config.MONGO_URI)
-_mdb = _client[Config.MONGO_DB]
-logs_collection = _mdb[Config.MONGO_LOGS_COL]
+from utils.metrics import AUDIT_LOG_SECONDS
+from models.mongo_client import get_logs_collection
+from models.auditor.audit_rollups import record_rollup, record_rollups
 
 
 def log_action(action, user_id, details=None):
@@ -15,4 +13,34 @@ def log_action(action, user_id, details=None):
         "ts": utc_now(),
     }
 
-    logs_collection.insert_one(doc)
+    start = time.perf_counter()
+    get_logs_collection().insert_one(doc)
+
+    # Keep the auditor summary rollups in step with the raw events
+    record_rollup(action, user_id, doc["ts"])
+    AUDIT_LOG_SECONDS.observe(time.perf_counter() - start)
+
+
+def log_actions(entries):
+    """
+    Write several audit events with one insert and one rollup update.
+    Args:
+        entries (list): (action, user_id, details) tuples.
+    """
+    ts = utc_now()
+    docs = [
+        {
+            "action": action,
+            "user_id": user_id,
+            "details": details or {},
+            "ts": ts,
+        }
+        for action, user_id, details in entries
+    ]
+    if not docs:
+        return
+
+    start = time.perf_counter()
+    get_logs_collection().insert_many(docs, ordered=False)
+    record_rollups(docs)
+    AUDIT_LOG_SECONDS.observe(time.perf_counter() - start)
@@ -0,0 +1,228 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from config import Config
+from utils.instrumentation import add_observer
+from utils.time_formatter import utc_now
+
+"""
+Slow-query log for SQLite and MongoDB.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are kept in a bounded ring
+buffer with their normalized shape (literal values removed, so no patient
+data is stored), duration and the application call site. Slow Mongo
+reads are explained once per shape in the background to record a plan
+summary such as "COLLSCAN". The log is per process.
+"""
+
+_entries = deque(maxlen=Config.SLOW_QUERY_LOG_SIZE)
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that run queries on behalf of the caller, skipped for call sites
+_INTERNAL_PATHS = tuple(
+    os.path.join(_PACKAGE_ROOT, path)
+    for path in (
+        "utils/instrumentation.py",
+        "utils/slow_queries.py",
+        "utils/mongo_listeners.py",
+        "models/db_sqlite.py",
+    )
+)
+
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SQL_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    # Strip literals and collapse IN lists and whitespace
+    shape = _SQL_STRING.sub("?", sql)
+    shape = _SQL_NUMBER.sub("?", shape)
+    shape = _SQL_IN_LIST.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def normalize_mongo(value):
+    # Replace every value in a filter or pipeline with "?", keeping keys and operators
+    if isinstance(value, dict):
+        return {key: normalize_mongo(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [normalize_mongo(item) for item in value]
+        # A list of literals is one shape regardless of its length
+        return shapes[:1] if all(shape == "?" for shape in shapes) else shapes
+    return "?"
+
+
+def _call_site():
+    # First frame in application code outside the query plumbing
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PACKAGE_ROOT) and not filename.startswith(_INTERNAL_PATHS):
+            path = os.path.relpath(filename, _PACKAGE_ROOT)
+            return f"{path}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _add_entry(source, shape, duration, **extra):
+    entry = {
+        "ts": utc_now(),
+        "source": source,
+        "shape": shape,
+        "duration_ms": round(duration * 1000, 2),
+        "call_site": _call_site(),
+        "collection": None,
+        "plan": None,
+    }
+    entry.update(extra)
+    _entries.append(entry)
+    return entry
+
+
+def _observe_sqlite(subsystem, duration, detail):
+    # Instrumentation observer for slow SQLite statements
+    if subsystem != "sqlite" or not detail:
+        return
+    if duration * 1000 < Config.SLOW_QUERY_THRESHOLD_MS:
+        return
+    _add_entry("sqlite", normalize_sql(detail), duration)
+
+
+# Commands whose shapes are logged, and those whose plans can be explained
+LOGGED_MONGO_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete"}
+_EXPLAINABLE = {"find", "aggregate", "count", "distinct"}
+_explained = {}
+_explained_lock = threading.Lock()
+
+
+def summarize_plan(plan):
+    # "FETCH > IXSCAN idx_name" style summary of a winning plan
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage = f"{stage} {plan['indexName']}"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " > ".join(stages)
+
+
+def _explain(database, command, entry, shape_key):
+    # Background explain of a slow Mongo command; only the summary is kept
+    from models.mongo_client import get_mongo_client
+
+    try:
+        result = get_mongo_client()[database].command(
+            {"explain": command, "verbosity": "queryPlanner"}
+        )
+        planner = result.get("queryPlanner")
+        if planner is None:
+            # Aggregations nest the planner output in their first stage
+            first_stage = (result.get("stages") or [{}])[0]
+            planner = first_stage.get("$cursor", {}).get("queryPlanner", {})
+        summary = summarize_plan(planner.get("winningPlan", {})) or None
+    except Exception:
+        summary = None
+
+    entry["plan"] = summary
+    with _explained_lock:
+        _explained[shape_key] = (summary, time.monotonic())
+
+
+def log_mongo_command(database, name, command, duration):
+    """
+    Record a finished Mongo command if it was slow. Called by the pymongo
+    listener in utils.mongo_listeners with the command it saw start.
+    Args:
+        duration (float): Server round trip in seconds.
+    """
+    if duration * 1000 < Config.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    collection = command.get(name)
+    body = {
+        key: value
+        for key, value in command.items()
+        if key in ("filter", "query", "pipeline", "sort", "key", "updates", "deletes")
+    }
+    shape = f"{name} {normalize_mongo(body)}"
+    entry = _add_entry("mongo", shape, duration, collection=collection)
+
+    if name in _EXPLAINABLE and Config.SLOW_QUERY_EXPLAIN:
+        _schedule_explain(database, command, entry, (collection, shape))
+
+
+def _schedule_explain(database, command, entry, shape_key):
+    # Reuse a recent plan for the same shape rather than explaining again
+    with _explained_lock:
+        known = _explained.get(shape_key)
+        if known and time.monotonic() - known[1] < Config.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+            entry["plan"] = known[0]
+            return
+        _explained[shape_key] = (None, time.monotonic())
+
+    # Session and cluster fields are not allowed inside explain
+    explain_command = {
+        key: value
+        for key, value in command.items()
+        if not key.startswith("$") and key not in ("lsid", "txnNumber")
+    }
+    threading.Thread(
+        target=_explain,
+        args=(database, explain_command, entry, shape_key),
+        name="slow-query-explain",
+        daemon=True,
+    ).start()
+
+
+def recent_slow_queries(limit=100):
+    # Most recent slow queries first
+    return list(reversed(_entries))[:limit]
+
+
+def slow_query_report(limit=20):
+    """
+    Aggregate the ring buffer by source and query shape.
+    Returns:
+        list: Dicts with count, total/mean/max ms, last call site and plan,
+              sorted by total time.
+    """
+    groups = {}
+    for entry in list(_entries):
+        key = (entry["source"], entry["collection"], entry["shape"])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "source": entry["source"],
+                "collection": entry["collection"],
+                "shape": entry["shape"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "call_site": entry["call_site"],
+                "plan": entry["plan"],
+            }
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+        group["call_site"] = entry["call_site"]
+        group["plan"] = entry["plan"] or group["plan"]
+
+    report = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)[:limit]
+    for group in report:
+        group["total_ms"] = round(group["total_ms"], 2)
+        group["mean_ms"] = round(group["total_ms"] / group["count"], 2)
+    return report
+
+
+def clear_slow_queries():
+    _entries.clear()
+
+
+add_observer(_observe_sqlite)
@@ -0,0 +1,38 @@
+from flask import Response, get_flashed_messages, stream_template
+from flask_wtf.csrf import generate_csrf
+from config import Config
+
+"""Streamed HTML responses for long listings."""
+
+
+def _buffered(chunks, size):
+    # Jinja yields a chunk per output statement; send them in larger writes
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_page(template_name, **context):
+    """
+    Render a template as a streamed response, so rows are sent while the
+    cursor behind a generator in the context is still being read.
+
+    The session cookie is written before the body, so anything the
+    template would store in the session (flashed messages being consumed,
+    a new CSRF token) is done up front.
+    Returns:
+        Response: A streamed text/html response.
+    """
+    get_flashed_messages(with_categories=True)
+    generate_csrf()
+
+    chunks = stream_template(template_name, **context)
+    return Response(_buffered(chunks, Config.STREAM_BUFFER_BYTES), mimetype="text/html")